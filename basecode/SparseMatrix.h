@@ -631,6 +631,41 @@ public:
         tripletFill( row, col, z );
     }
 
+    /**
+     * Fills the whole matrix from its compressed sparse row form, as
+     * returned by rowStart(), colIndex() and matrixEntry(). The columns
+     * of each row must not decrease. A column may repeat, as it does when
+     * a source has several synapses on one target. The size of the matrix
+     * is not changed. Returns false, leaving the matrix as it was, if
+     * the arrays do not fit it.
+     */
+    bool csrFill( const vector< unsigned int >& rowStart,
+                  const vector< unsigned int >& colIndex,
+                  const vector< T >& entry )
+    {
+        if ( rowStart.size() != nrows_ + 1 || rowStart[0] != 0 ||
+                rowStart.back() != colIndex.size() ||
+                entry.size() != colIndex.size() )
+            return false;
+        for ( unsigned int i = 0; i < nrows_; ++i )
+            if ( rowStart[i + 1] < rowStart[i] )
+                return false;
+        for ( unsigned int i = 0; i < nrows_; ++i )
+        {
+            for ( unsigned int j = rowStart[i]; j < rowStart[i + 1]; ++j )
+            {
+                if ( colIndex[j] >= ncolumns_ )
+                    return false;
+                if ( j > rowStart[i] && colIndex[j] < colIndex[j - 1] )
+                    return false;
+            }
+        }
+        N_ = entry;
+        colIndex_ = colIndex;
+        rowStart_ = rowStart;
+        return true;
+    }
+
     //////////////////////////////////////////////////////////////////
     // Printing operations.
     //////////////////////////////////////////////////////////////////
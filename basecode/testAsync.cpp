@@ -767,6 +767,52 @@ void testSparseMatrixFill()
     cout << "." << flush;
 }
 
+void testSparseMatrixCSR()
+{
+    SparseMatrix<unsigned int> m(3, 5);
+    m.set(0, 0, 1);
+    m.set(0, 4, 2);
+    m.set(2, 1, 3);
+    m.set(2, 3, 4);
+
+    SparseMatrix<unsigned int> n(3, 5);
+    assert(n.csrFill(m.rowStart(), m.colIndex(), m.matrixEntry()));
+    assert(n.nEntries() == 4);
+    for(unsigned int i = 0; i < 3; ++i)
+        for(unsigned int j = 0; j < 5; ++j)
+            assert(n.get(i, j) == m.get(i, j));
+
+    // Arrays that do not fit leave the matrix as it was.
+    vector<unsigned int> rowStart = {0, 1, 1, 2};
+    vector<unsigned int> cols = {0, 5};
+    vector<unsigned int> vals = {7, 8};
+    assert(!n.csrFill(rowStart, cols, vals));
+    cols[1] = 2;
+    rowStart.pop_back();
+    assert(!n.csrFill(rowStart, cols, vals));
+    rowStart = {0, 2, 2, 2};
+    cols = {3, 1};
+    assert(!n.csrFill(rowStart, cols, vals));
+    assert(n.nEntries() == 4 && n.get(2, 3) == 4);
+
+    cols = {1, 3};
+    assert(n.csrFill(rowStart, cols, vals));
+    assert(n.nEntries() == 2 && n.get(0, 3) == 8 && n.get(2, 3) == 0);
+
+    // Repeated columns, from several synapses on one target, round trip.
+    SparseMatrix<unsigned int> r(2, 3);
+    vector<unsigned int> src = {0, 0, 0, 1};
+    vector<unsigned int> dest = {2, 2, 1, 2};
+    vector<unsigned int> field = {0, 1, 0, 2};
+    r.tripletFill(src, dest, field, true);
+    assert(r.nEntries() == 4);
+    SparseMatrix<unsigned int> q(2, 3);
+    assert(q.csrFill(r.rowStart(), r.colIndex(), r.matrixEntry()));
+    assert(q.rowStart() == r.rowStart() && q.colIndex() == r.colIndex() &&
+           q.matrixEntry() == r.matrixEntry());
+    cout << "." << flush;
+}
+
 void printGrid(Element* e, const string& field, double min, double max)
 {
     static string icon = " .oO@";
@@ -1827,6 +1873,7 @@ void testAsync()
     testSparseMatrix2();
     testSparseMatrixReorder();
     testSparseMatrixFill();
+    testSparseMatrixCSR();
     testSparseMsg();
     testSharedMsg();
     testConvVector();
@@ -691,6 +691,16 @@ vector<double> HHGate::getTableB(const Eref& e) const
     return B_;
 }
 
+const vector<double>& HHGate::tableA() const
+{
+    return A_;
+}
+
+const vector<double>& HHGate::tableB() const
+{
+    return B_;
+}
+
 void HHGate::setTableB(const Eref& e, vector<double> v)
 {
     if(checkOriginal(e.id(), "tableB")) {
@@ -112,6 +112,10 @@ public:
     void setTableB(const Eref& e, vector<double> v);
     vector<double> getTableB(const Eref& e) const;
 
+    /// The A and B tables themselves, for reading without a copy.
+    const vector<double>& tableA() const;
+    const vector<double>& tableB() const;
+
     void setUseInterpolation(const Eref& e, bool val);
     bool getUseInterpolation(const Eref& e) const;
 
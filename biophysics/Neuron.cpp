@@ -7,6 +7,7 @@
 ** See the file COPYING.LIB for the full notice.
 **********************************************************************/
 
+#include <unordered_set>
 #include "../basecode/header.h"
 #include "../basecode/ElementValueFinfo.h"
 #include "../basecode/LookupElementValueFinfo.h"
@@ -17,6 +18,7 @@
 
 #include "ReadCell.h"
 #include "../utility/Vec.h"
+#include "CompartmentBase.h"
 
 #include "SwcSegment.h"
 #include "Spine.h"
@@ -1402,6 +1404,21 @@ void Neuron::updateSegmentLengths()
         double L = segs_[i].getElecDistFromSoma();
         if ( maxL_ < L ) maxL_ = L;
     }
+
+    segArgs_.assign( segs_.size() * nuParser::numVal, 0.0 );
+    for ( unsigned int i = 0; i < segs_.size(); ++i )
+    {
+        vector< double >::iterator arg = segArgs_.begin() + i * nuParser::numVal;
+        arg[nuParser::P] = segs_[i].getPathDistFromSoma();
+        arg[nuParser::G] = segs_[i].getGeomDistFromSoma();
+        arg[nuParser::EL] = segs_[i].getElecDistFromSoma();
+        arg[nuParser::MAXP] = maxP_;
+        arg[nuParser::MAXG] = maxG_;
+        arg[nuParser::MAXL] = maxL_;
+        arg[nuParser::X] = segs_[i].vec().a0();
+        arg[nuParser::Y] = segs_[i].vec().a1();
+        arg[nuParser::Z] = segs_[i].vec().a2();
+    }
 }
 
 /// Fills up vector of segments. First entry is soma.
@@ -1523,67 +1540,69 @@ void Neuron::setSpineAndPsdDsolve( ObjId spineDsolve, ObjId psdDsolve )
 /**
  * Evaluates expn for every CompartmentBase entry in elist. Pushes
  * value, length and dia for each elist entry into the 'val' vector.
+ * The arguments of all the compartments are filled in first, mostly
+ * copied from segArgs_, and the expression is then evaluated over them
+ * in one pass.
  */
 void Neuron::evalExprForElist( const vector< ObjId >& elist,
                                const string& expn, vector< double >& val ) const
 {
     val.clear();
     val.resize( elist.size() * nuParser::numVal );
-    // Build the function
-    double len = 0; // Length of compt in metres
-    double dia = 0; // Diameter of compt in metres
-    unsigned int valIndex = 0;
-    try
+    vector< unsigned int > comptIndex; // Index in val of each compartment.
+    comptIndex.reserve( elist.size() );
+    const moose::CompartmentBase* soma = 0;
+    for ( unsigned int i = 0; i < elist.size(); ++i )
     {
-        nuParser parser( expn );
-        for ( vector< ObjId >::const_iterator
-                i = elist.begin(); i != elist.end(); ++i )
+        if ( !elist[i].element()->cinfo()->isA( "CompartmentBase" ) )
+            continue;
+        unsigned int valIndex = i * nuParser::numVal;
+        vector< double >::iterator arg = val.begin() + valIndex;
+        const moose::CompartmentBase* cptr =
+            reinterpret_cast< const moose::CompartmentBase* >(
+                elist[i].eref().data() );
+        map< Id, unsigned int >::const_iterator j =
+            segIndex_.find( elist[i].id );
+        if ( j != segIndex_.end() )
         {
-            if ( i->element()->cinfo()->isA( "CompartmentBase" ) )
-            {
-                map< Id, unsigned int >:: const_iterator j =
-                    segIndex_.find( *i );
-                if ( j != segIndex_.end() )
-                {
-                    assert( j->second < segs_.size() );
-                    val[valIndex + nuParser::P] =
-                        segs_[j->second].getPathDistFromSoma();
-                    val[valIndex + nuParser::G] =
-                        segs_[j->second].getGeomDistFromSoma();
-                    val[valIndex + nuParser::EL] =
-                        segs_[j->second].getElecDistFromSoma();
-                } else {
-					double somaX0 = Field<double>::get( soma_, "x0" );
-					double somaY0 = Field<double>::get( soma_, "y0" );
-					double somaZ0 = Field<double>::get( soma_, "z0" );
-					double comptX0 = Field<double>::get( *i, "x0" );
-					double comptY0 = Field<double>::get( *i, "y0" );
-					double comptZ0 = Field<double>::get( *i, "z0" );
-					Vec temp( somaX0-comptX0, somaY0-comptY0, somaZ0-comptZ0 );
-					double geomDistFromSoma = temp.length();
-                    val[valIndex + nuParser::G] = geomDistFromSoma;
-                    val[valIndex + nuParser::P] = geomDistFromSoma; //dummy
-					// Dummy, using typical lambda of 0.5 mm
-                    val[valIndex + nuParser::EL] = geomDistFromSoma * 2e3;
-				}
-                dia = Field< double >::get( *i, "diameter" );
-                len = Field< double >::get( *i, "length" );
-                val[valIndex + nuParser::LEN] = len;
-                val[valIndex + nuParser::DIA] = dia;
-                val[valIndex + nuParser::MAXP] = maxP_;
-                val[valIndex + nuParser::MAXG] = maxG_;
-                val[valIndex + nuParser::MAXL] = maxL_;
-                val[valIndex + nuParser::X] = segs_[j->second].vec().a0();
-                val[valIndex + nuParser::Y] = segs_[j->second].vec().a1();
-                val[valIndex + nuParser::Z] = segs_[j->second].vec().a2();
-                // Can't assign oldVal on first arg
-                val[valIndex + nuParser::OLDVAL] = 0.0;
-
-                val[valIndex + nuParser::EXPR] = parser.eval(
-                                             val.begin() + valIndex );
-            }
-            valIndex += nuParser::numVal;
+            assert( ( j->second + 1 ) * nuParser::numVal <= segArgs_.size() );
+            vector< double >::const_iterator seg =
+                segArgs_.begin() + j->second * nuParser::numVal;
+            copy( seg, seg + nuParser::numVal, arg );
+        }
+        else     // Typically a spine compartment.
+        {
+            if ( !soma )
+                soma = reinterpret_cast< const moose::CompartmentBase* >(
+                           soma_.eref().data() );
+            Vec temp( soma->getX0() - cptr->getX0(),
+                      soma->getY0() - cptr->getY0(),
+                      soma->getZ0() - cptr->getZ0() );
+            double geomDistFromSoma = temp.length();
+            arg[nuParser::G] = geomDistFromSoma;
+            arg[nuParser::P] = geomDistFromSoma; //dummy
+            // Dummy, using typical lambda of 0.5 mm
+            arg[nuParser::EL] = geomDistFromSoma * 2e3;
+            arg[nuParser::MAXP] = maxP_;
+            arg[nuParser::MAXG] = maxG_;
+            arg[nuParser::MAXL] = maxL_;
+            arg[nuParser::X] = cptr->getX();
+            arg[nuParser::Y] = cptr->getY();
+            arg[nuParser::Z] = cptr->getZ();
         }
+        arg[nuParser::LEN] = cptr->getLength();
+        arg[nuParser::DIA] = cptr->getDiameter();
+        // Can't assign oldVal on first arg
+        arg[nuParser::OLDVAL] = 0.0;
+        comptIndex.push_back( valIndex );
+    }
+
+    try
+    {
+        nuParser parser( expn );
+        for ( vector< unsigned int >::const_iterator
+                i = comptIndex.begin(); i != comptIndex.end(); ++i )
+            val[*i + nuParser::EXPR] = parser.eval( val.begin() + *i );
     }
     catch ( moose::Parser::exception_type& err )
     {
@@ -1675,16 +1694,39 @@ static void reorientSpine( vector< Id >& spineCompts,
     for ( unsigned int i = 0; i < spineCompts.size(); ++i )
     {
         unsigned int j = 2 * i;
-        Field< double >::set( spineCompts[i], "x0", ret[j].a0() );
-        Field< double >::set( spineCompts[i], "y0", ret[j].a1() );
-        Field< double >::set( spineCompts[i], "z0", ret[j].a2() );
-        // cout << "(" << ret[j].a0() << ", " << ret[j].a1() << ", " << ret[j].a2() << ")";
+        moose::CompartmentBase* cptr =
+            reinterpret_cast< moose::CompartmentBase* >(
+                spineCompts[i].eref().data() );
+        cptr->setX0( ret[j].a0() );
+        cptr->setY0( ret[j].a1() );
+        cptr->setZ0( ret[j].a2() );
         j = j + 1;
-        Field< double >::set( spineCompts[i], "x", ret[j].a0() );
-        Field< double >::set( spineCompts[i], "y", ret[j].a1() );
-        Field< double >::set( spineCompts[i], "z", ret[j].a2() );
-        // cout << "(" << ret[j].a0() << ", " << ret[j].a1() << ", " << ret[j].a2() << ")\n";
+        cptr->setX( ret[j].a0() );
+        cptr->setY( ret[j].a1() );
+        cptr->setZ( ret[j].a2() );
+    }
+}
+
+/**
+ * Names of the children of the elements that spine compartments are
+ * moved to. They are looked up once per element, rather than searching
+ * all the children for each move as Shell::doMove does, which made cells
+ * with many thousands of spines very slow to build.
+ */
+typedef map< Id, unordered_set< string > > ChildNames;
+
+static bool isNameFree( Id parent, const string& name, ChildNames& names )
+{
+    ChildNames::iterator i = names.find( parent );
+    if ( i == names.end() )
+    {
+        i = names.insert( make_pair( parent, unordered_set< string >() ) ).first;
+        vector< Id > kids;
+        Neutral::children( parent.eref(), kids );
+        for ( vector< Id >::iterator j = kids.begin(); j != kids.end(); ++j )
+            i->second.insert( j->element()->getName() );
     }
+    return i->second.insert( name ).second;
 }
 
 /**
@@ -1692,6 +1734,7 @@ static void reorientSpine( vector< Id >& spineCompts,
  * Returns vector of added spine contents.
  * parent is parent compartment for this spine.
  * spineProto is just that.
+ * holder is a scratch element to make the copy of the prototype on.
  * pos is position (in metres ) along parent compartment
  * angle is angle (in radians) to rotate spine wrt x in plane xy.
  * Size is size scaling factor, 1 leaves as is.
@@ -1705,26 +1748,26 @@ static void reorientSpine( vector< Id >& spineCompts,
  * k is index of this spine.
  */
 
-static vector< Id > addSpine( Id parentCompt, Id spineProto,
+static vector< Id > addSpine( Id parentCompt, Id spineProto, Id holder,
                               double pos, double angle,
                               Vec& x, Vec& y, Vec& z,
                               double size,
-                              unsigned int k )
+                              unsigned int k, ChildNames& names )
 {
     Shell* shell = reinterpret_cast< Shell* >( Id().eref().data() );
     Id parentObject = Neutral::parent( parentCompt );
     stringstream sstemp;
     sstemp << k;
     string kstr = sstemp.str();
-    Id spine = shell->doCopy( spineProto, parentObject, "_spine" + kstr,
+    Id spine = shell->doCopy( spineProto, holder, "_spine" + kstr,
                               1, false, false );
     vector< Id > kids;
     Neutral::children( spine.eref(), kids );
-    double x0 = Field< double >::get( parentCompt, "x0" );
-    double y0 = Field< double >::get( parentCompt, "y0" );
-    double z0 = Field< double >::get( parentCompt, "z0" );
-    double parentRadius = Field< double >::get( parentCompt, "diameter" )/2;
-    Vec ppos( x0, y0, z0 );
+    const moose::CompartmentBase* pa =
+        reinterpret_cast< const moose::CompartmentBase* >(
+            parentCompt.eref().data() );
+    double parentRadius = pa->getDiameter() / 2;
+    Vec ppos( pa->getX0(), pa->getY0(), pa->getZ0() );
     // First, build the coordinates vector for the spine. Assume that its
     // major axis is along the unit vector [1,0,0].
     vector< Vec > coords;
@@ -1734,26 +1777,29 @@ static vector< Id > addSpine( Id parentCompt, Id spineProto,
         if ( i->element()->cinfo()->isA( "CompartmentBase" ) )
         {
             i->element()->setName( i->element()->getName() + kstr );
-            x0 = Field< double >::get( *i, "x0" ) * size;
-            y0 = Field< double >::get( *i, "y0" ) * size;
-            z0 = Field< double >::get( *i, "z0" ) * size;
+            moose::CompartmentBase* cptr =
+                reinterpret_cast< moose::CompartmentBase* >(
+                    i->eref().data() );
+            double x0 = cptr->getX0() * size;
+            double y0 = cptr->getY0() * size;
+            double z0 = cptr->getZ0() * size;
             coords.push_back( Vec( x0 + parentRadius, y0, z0 ) );
-            double x = Field< double >::get( *i, "x" ) * size;
-            double y = Field< double >::get( *i, "y" ) * size;
-            double z = Field< double >::get( *i, "z" ) * size;
-            double dia = Field< double >::get( *i, "diameter" ) * size;
-            // Field< double >::set( *i, "diameter", dia );
+            double x = cptr->getX() * size;
+            double y = cptr->getY() * size;
+            double z = cptr->getZ() * size;
+            double dia = cptr->getDiameter() * size;
 
             double len = sqrt(
                              (x-x0)*(x-x0) +
                              (y-y0)*(y-y0) +
                              (z-z0)*(z-z0) );
-            SetGet2< double, double >::set( *i, "setGeomAndElec", len, dia );
-
+            cptr->setGeomAndElec( i->eref(), len, dia );
 
             coords.push_back( Vec( x + parentRadius, y, z ) );
-            // scaleSpineCompt( *i, size );
-            shell->doMove( *i, parentObject );
+            if ( isNameFree( parentObject, i->element()->getName(), names ) )
+                shell->innerMove( *i, parentObject );
+            else
+                shell->doMove( *i, parentObject ); // Reports the clash.
             ret.push_back( *i );
         }
     }
@@ -2062,16 +2108,34 @@ void Neuron::installSpines( const vector< ObjId >& elist,
     makeAngleDistrib( elist, val, elistIndex, theta, line );
     makeSizeDistrib( elist, val, elistIndex, size, line );
 	unsigned int startNumSpines = spines_.size();
+
+    // The prototype is copied onto a scratch element with no other
+    // children, so that the copy does not have to check for name clashes
+    // with all the compartments of the cell.
+    Shell* shell = reinterpret_cast< Shell* >( Id().eref().data() );
+    Id library = Neutral::parent( spineProto );
+    string holderName = "_spineHolder";
+    while ( Neutral::child( library.eref(), holderName ) != Id() )
+        holderName += "_";
+    Id holder = shell->doCreate( "Neutral", library, holderName, 1 );
+    ChildNames names;
+    spines_.reserve( spines_.size() + localSpineParentSegIndex.size() );
+    unsigned int lastSeg = ~0U;
+    Vec x, y, z;
     for ( unsigned int k = 0; k < localSpineParentSegIndex.size(); ++k )
     {
         unsigned int i = localSpineParentSegIndex[k];
-        Vec x, y, z;
-        coordSystem( soma_, segId_[i], x, y, z );
+        if ( i != lastSeg ) // Spines on a segment come together.
+        {
+            coordSystem( soma_, segId_[i], x, y, z );
+            lastSeg = i;
+        }
         spines_.push_back(
-            addSpine( segId_[i], spineProto, pos[k], theta[k],
-                      x, y, z, size[k], k )
+            addSpine( segId_[i], spineProto, holder, pos[k], theta[k],
+                      x, y, z, size[k], k, names )
         );
     }
+    shell->doDelete( holder );
     // spineToMeshOrdering_.clear();
     spineToMeshOrdering_.resize( spines_.size(), 0 );
     // spineStoich_.clear();
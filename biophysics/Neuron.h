@@ -155,6 +155,14 @@ private:
     vector< SwcSegment > segs_;
     vector< SwcBranch > branches_;
 
+    /**
+     * Arguments of the distribution expressions for each Seg entry, in
+     * the order of nuParser::valArgs, so that they are not looked up
+     * again for every expression. Filled in when the segment tree is
+     * built. The length and diameter are read from the compartments.
+     */
+    vector< double > segArgs_;
+
 };
 
 //
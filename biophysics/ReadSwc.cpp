@@ -17,50 +17,79 @@
 #include "SymCompartment.h"
 #include <fstream>
 #include <iomanip>
+#include <cstring>
+#include <cctype>
+#include <unordered_set>
 
 // Minimum allowed radius of segment, in microns
 // Believe it or not, some otherwise reasonable files do have smaller radii
 static const double MinRadius = 0.04;
 
-bool isWhitespaceOnly(const std::string& s) {
-    if (s.empty()) {
-        return true;
-    }
-    for (char c : s) {
-        if (!std::isspace(static_cast<unsigned char>(c))) {
-            return false; // Found a non-whitespace character
-        }
+/**
+ * Parses one line of the form  n T x y z R P  into seg. Returns false
+ * unless the line has exactly these 7 numbers.
+ */
+static bool parseSwcLine( const char* p, const char* end, SwcSegment& seg )
+{
+    double v[7];
+    char* next;
+    for ( unsigned int i = 0; i < 7; ++i )
+    {
+        v[i] = strtod( p, &next );
+        if ( next == p || next > end )
+            return false;
+        p = next;
     }
-    return true; // All characters were whitespace
+    for ( ; p < end; ++p )
+        if ( !std::isspace( static_cast< unsigned char >( *p ) ) )
+            return false;
+    int pa = static_cast< int >( v[6] );
+    seg = SwcSegment( static_cast< int >( v[0] ),
+                      static_cast< short >( v[1] ),
+                      v[2], v[3], v[4], v[5], pa > 0 ? pa : -1 );
+    return true;
 }
 
 ReadSwc::ReadSwc( const string& fname )
 {
-    ifstream fin( fname.c_str() );
+    ifstream fin( fname.c_str(), ios::binary );
     if ( !fin )
     {
         cerr << "ReadSwc:: could not open file " << fname << endl;
         return;
     }
 
-    string temp;
+    // Read the whole file at once and parse the lines in place.
+    string buf;
+    fin.seekg( 0, ios::end );
+    buf.resize( fin.tellg() );
+    fin.seekg( 0, ios::beg );
+    fin.read( &buf[0], buf.size() );
+
     int badSegs = 0;
-    while( getline( fin, temp ) )
+    const char* p = buf.c_str();
+    const char* bufEnd = p + buf.size();
+    segs_.reserve( buf.size() / 40 );
+    while ( p < bufEnd )
     {
-        if ( isWhitespaceOnly(temp) )
-            continue;
-        auto pos = temp.find_first_not_of( "\t " );
-        if ( pos == string::npos )
-            continue;
-        if ( temp[pos] == '#' )
-            continue;
-
-        SwcSegment t( temp );
-        if ( t.OK() )
-            segs_.push_back( SwcSegment( temp ) );
-        else
-            badSegs++;
+        const char* eol = static_cast< const char* >(
+                              memchr( p, '\n', bufEnd - p ) );
+        if ( !eol )
+            eol = bufEnd;
+        const char* q = p;
+        while ( q < eol && std::isspace( static_cast< unsigned char >( *q ) ) )
+            ++q;
+        if ( q < eol && *q != '#' )
+        {
+            SwcSegment t;
+            if ( parseSwcLine( q, eol, t ) && t.OK() )
+                segs_.push_back( t );
+            else
+                badSegs++;
+        }
+        p = eol + 1;
     }
+    sortSegments();
     bool valid = validate();
     if ( valid )
     {
@@ -76,6 +105,97 @@ ReadSwc::ReadSwc( const string& fname )
     diagnostics();
 }
 
+/**
+ * Renumbers the segments from 1 in the order of a depth-first walk from
+ * the roots, so that every parent comes before its children. Files are
+ * left untouched if they already are in this order, which is the usual
+ * case. Segments whose parent index is not in the file are put at the
+ * end with a parent past the last segment, so that validate() counts
+ * them as orphans.
+ */
+void ReadSwc::sortSegments()
+{
+    bool ordered = true;
+    for ( unsigned int i = 0; i < segs_.size() && ordered; ++i )
+    {
+        const SwcSegment& s = segs_[i];
+        ordered = ( s.myIndex() == i + 1 &&
+                    ( s.parent() == ~0U || s.parent() <= i ) );
+    }
+    if ( ordered )
+        return;
+
+    unordered_map< unsigned int, unsigned int > pos;
+    pos.reserve( segs_.size() );
+    for ( unsigned int i = 0; i < segs_.size(); ++i )
+        pos[ segs_[i].myIndex() ] = i;
+
+    // Children of each segment, with the roots as children of the
+    // extra entry at the end.
+    const unsigned int numSegs = segs_.size();
+    vector< vector< unsigned int > > kids( numSegs + 1 );
+    for ( unsigned int i = 0; i < numSegs; ++i )
+    {
+        unsigned int pa = segs_[i].parent();
+        if ( pa == ~0U )
+        {
+            kids[ numSegs ].push_back( i );
+        }
+        else
+        {
+            auto j = pos.find( pa );
+            if ( j != pos.end() && j->second != i )
+                kids[ j->second ].push_back( i );
+        }
+    }
+
+    vector< unsigned int > order;
+    order.reserve( numSegs );
+    vector< unsigned int > stack( kids[ numSegs ].rbegin(),
+                                  kids[ numSegs ].rend() );
+    vector< bool > seen( numSegs, false );
+    while ( !stack.empty() )
+    {
+        unsigned int i = stack.back();
+        stack.pop_back();
+        if ( seen[i] )
+            continue;
+        seen[i] = true;
+        order.push_back( i );
+        stack.insert( stack.end(), kids[i].rbegin(), kids[i].rend() );
+    }
+    unsigned int numReached = order.size();
+    for ( unsigned int i = 0; i < numSegs; ++i )
+        if ( !seen[i] )
+            order.push_back( i );
+
+    vector< unsigned int > newIndex( numSegs );
+    for ( unsigned int i = 0; i < numSegs; ++i )
+        newIndex[ order[i] ] = i + 1;
+
+    vector< SwcSegment > sorted;
+    sorted.reserve( numSegs );
+    for ( unsigned int i = 0; i < numSegs; ++i )
+    {
+        const SwcSegment& s = segs_[ order[i] ];
+        int pa = -1;
+        if ( s.parent() != ~0U )
+        {
+            auto j = pos.find( s.parent() );
+            if ( i < numReached )
+                pa = newIndex[ j->second ];
+            else
+                pa = numSegs + 1;
+        }
+        sorted.push_back( SwcSegment( i + 1, s.type(), s.vec().a0(),
+                                      s.vec().a1(), s.vec().a2(),
+                                      s.radius(), pa ) );
+    }
+    segs_.swap( sorted );
+    cout << "ReadSwc:: Renumbered segments so that parents come first, " <<
+         numSegs - numReached << " unreachable" << endl;
+}
+
 bool ReadSwc::validate() const
 {
     int numStart = 0;
@@ -138,6 +258,7 @@ void ReadSwc::assignKids()
 void ReadSwc::cleanZeroLength()
 {
     static double EPSILON = 1e-2; // Assume units in microns.
+    unsigned int numCleaned = 0;
     for ( unsigned int i = 1; i < segs_.size(); ++i )
     {
         SwcSegment& s = segs_[i];
@@ -160,9 +281,12 @@ void ReadSwc::cleanZeroLength()
             }
             pa.replaceKids( temp );
             s.setBad();
-            cout << "ReadSwc:: Cleaned zero length " << s.myIndex() << endl;
+            numCleaned++;
         }
     }
+    if ( numCleaned > 0 )
+        cout << "ReadSwc:: Cleaned " << numCleaned <<
+             " zero length segments" << endl;
 }
 
 void ReadSwc::traverseBranch( const SwcSegment& s,
@@ -243,11 +367,29 @@ void ReadSwc::diagnostics() const
 
 }
 
+/**
+ * Makes a child Compartment of parent. The names of the children of
+ * parent are kept in usedNames, rather than looking through all of them
+ * for each new one as Shell::doCreate does, which made large cells slow
+ * to build. Name clashes are left to doCreate to report.
+ */
+static Id createCompt( Id parent, const string& name,
+                       unordered_set< string >& usedNames )
+{
+    Shell* shell = reinterpret_cast< Shell* >( Id().eref().data() );
+    if ( !usedNames.insert( name ).second )
+        return shell->doCreate( "Compartment", parent, name, 1 );
+    Id compt = Id::nextId();
+    NodeBalance nb( 1, MooseBlockBalance, 0 );
+    shell->innerCreate( "Compartment", parent, compt, name, nb, 0 );
+    return compt;
+}
+
 static Id makeCompt( Id parent, const string& __name,
                      const SwcSegment& seg, const SwcSegment& pa,
-                     double RM, double RA, double CM )
+                     double RM, double RA, double CM,
+                     unordered_set< string >& usedNames )
 {
-    Shell* shell = reinterpret_cast< Shell* >( Id().eref().data() );
     double len = seg.radius() * 2.0;
     Id compt;
     double x0, y0, z0;
@@ -265,7 +407,7 @@ static Id makeCompt( Id parent, const string& __name,
         z0 = seg.vec().a2();
     }
     assert( len > 0.0 );
-    compt = shell->doCreate( "Compartment", parent, __name, 1 );
+    compt = createCompt( parent, __name, usedNames );
     Eref er = compt.eref();
     moose::CompartmentBase *cptr = reinterpret_cast< moose::CompartmentBase* >(
                                        compt.eref().data() );
@@ -317,6 +459,11 @@ bool ReadSwc::build( Id parent,
 	string basalName = "basal";
 	if ( testIfOnlyBasalsArePresent() )
 		basalName = "dend";
+	unordered_set< string > usedNames;
+	vector< Id > kids;
+	Neutral::children( parent.eref(), kids );
+	for ( vector< Id >::const_iterator i = kids.begin(); i != kids.end(); ++i )
+		usedNames.insert( i->element()->getName() );
     for ( unsigned int i = 0; i < branches_.size(); ++i )
     {
         SwcBranch& br = branches_[i];
@@ -330,14 +477,16 @@ bool ReadSwc::build( Id parent,
             unsigned int paIndex = seg.parent();
             if ( paIndex == ~0U )   // soma
             {
-                compt = makeCompt( parent, "soma", seg, seg, RM, RA, CM );
+                compt = makeCompt( parent, "soma", seg, seg, RM, RA, CM,
+                                   usedNames );
 				numSomas++;
             }
             else if ( seg.type() == SwcSegment::SOMA) 
             {
    				ss << "soma" << numSomas;
 				segName = ss.str();
-                compt = makeCompt( parent, segName, seg, seg, RM, RA, CM );
+                compt = makeCompt( parent, segName, seg, seg, RM, RA, CM,
+                                   usedNames );
 				numSomas++;
             }
             else
@@ -368,11 +517,12 @@ bool ReadSwc::build( Id parent,
 					ss << paBranchName << "_" << j;
 					segName = ss.str();
 				}
-                compt = makeCompt( parent, segName, seg, pa, RM, RA, CM);
+                compt = makeCompt( parent, segName, seg, pa, RM, RA, CM,
+                                   usedNames );
                 assert( compt != Id() );
                 assert( compts[ paIndex -1 ] != Id() );
-                shell->doAddMsg( "Single",
-                                 compts[paIndex-1], "axial", compt, "raxial" );
+                shell->innerAddMsg( "Single",
+                                 compts[paIndex-1], "axial", compt, "raxial", 0 );
             }
             assert( compt != Id() );
             compts[ seg.myIndex() -1 ] = compt;
@@ -23,6 +23,7 @@ class ReadSwc
 	 */
 	public:
 		ReadSwc( const string& fname );
+		void sortSegments();
 		bool validate() const;
 		void assignKids();
 		void cleanZeroLength();
@@ -1622,6 +1622,14 @@ static void testNeuronBuildTree()
         ASSERT_DOUBLE_EQ(val[i * nuParserNumVal + 12], 0.0, "");
         j++;
     }
+    // Length and diameter set after the tree was built are used.
+    Field<double>::set(dend1, "diameter", 3e-6);
+    n->evalExprForElist(elist, "dia * 1e6 + p * 1e6", val);
+    for(unsigned int i = 0; i < elist.size(); ++i) {
+        if(elist[i] == ObjId(dend1))
+            ASSERT_DOUBLE_EQ(val[i * nuParserNumVal], 103.0, "");
+    }
+    Field<double>::set(dend1, "diameter", dendDia);
     //////////////////////////////////////////////////////////////////
     // Here we test Neuron::makeSpacingDistrib, which uses the muParser
     // n->evalExprForElist( elist, "H(p-50e-6)*5e-6", val );
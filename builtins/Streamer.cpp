@@ -173,6 +173,29 @@ Streamer::~Streamer()
  */
 void Streamer::reinit(const Eref& e, ProcPtr p)
 {
+    // The time column steps by the dt and decimation of the first table,
+    // so the others must have the same decimation. A minmax table has two
+    // entries per block, which do not fit in rows of one time each.
+    vector<ObjId> rejected;
+    for( unsigned int i = 0; i < tables_.size(); i++ )
+    {
+        const Table* t = tables_[i];
+        if( t->getDecimation() > 1 && t->getDecimationMode() == "minmax" )
+        {
+            moose::showWarn( "Table " + tableIds_[i].path() + " has "
+                             "decimationMode 'minmax'. Streamer cannot write "
+                             "it. Removing it from the Streamer." );
+            rejected.push_back( tableIds_[i] );
+        }
+        else if( t->getDecimation() != tables_[0]->getDecimation() )
+        {
+            moose::showWarn( "Table " + tableIds_[i].path() + " has a "
+                             "decimation different from the first table. "
+                             "Removing it from the Streamer." );
+            rejected.push_back( tableIds_[i] );
+        }
+    }
+    removeTables( rejected );
 
     if( tables_.size() == 0 )
     {
@@ -182,6 +205,7 @@ void Streamer::reinit(const Eref& e, ProcPtr p)
     }
 
     Clock* clk = reinterpret_cast<Clock*>( Id(1).eref().data() );
+    tableDt_.clear();
     for (unsigned int i = 0; i < tableIds_.size(); i++)
     {
         int tickNum = tableIds_[i].element()->getTick();
@@ -244,8 +268,7 @@ void Streamer::reinit(const Eref& e, ProcPtr p)
     // write now.
     currTime_ = 0.0;
     zipWithTime( );
-    StreamerBase::writeToOutFile(datafilePath_, format_, WRITE, data_, columns_);
-    data_.clear( );
+    writeData( WRITE );
 }
 
 /**
@@ -255,8 +278,9 @@ void Streamer::reinit(const Eref& e, ProcPtr p)
 void Streamer::cleanUp( )
 {
     zipWithTime( );
-    StreamerBase::writeToOutFile( datafilePath_, format_, APPEND, data_, columns_ );
-    data_.clear( );
+    writeData( APPEND );
+    // The run is over: write the npy header. The next run appends.
+    npyWriter_.close();
 }
 
 /**
@@ -269,11 +293,23 @@ void Streamer::process(const Eref& e, ProcPtr p)
 {
     // LOG( moose::debug, "Writing Streamer data to file." );
     zipWithTime( );
-    StreamerBase::writeToOutFile( datafilePath_, format_, APPEND, data_, columns_ );
-    data_.clear();
+    writeData( APPEND );
     numWriteEvents_ += 1;
 }
 
+void Streamer::writeData( OpenMode openmode )
+{
+    if( "npy" == format_ || "npz" == format_ )
+    {
+        if( openmode == WRITE || ! npyWriter_.isOpen() )
+            npyWriter_.open( datafilePath_, columns_, openmode == APPEND );
+        npyWriter_.append( data_ );
+    }
+    else
+        StreamerBase::writeToOutFile( datafilePath_, format_, openmode, data_, columns_ );
+    data_.clear();
+}
+
 
 /**
  * @brief Add a table to streamer.
@@ -334,7 +370,9 @@ void Streamer::removeTable( ObjId table )
     {
         tableIds_.erase( tableIds_.begin() + matchIndex );
         tables_.erase( tables_.begin() + matchIndex );
-        columns_.erase( columns_.begin() + matchIndex );
+        tableTick_.erase( tableTick_.begin() + matchIndex );
+        // The first column is time.
+        columns_.erase( columns_.begin() + matchIndex + 1 );
     }
 }
 
@@ -380,6 +418,7 @@ string Streamer::getDatafilePath( void ) const
 
 void Streamer::setDatafilePath( string filepath )
 {
+    npyWriter_.close();
     datafilePath_ = filepath;
     isOutfilePathSet_ = true;
     if( ! moose::createParentDirs( filepath ) )
@@ -432,8 +471,8 @@ void Streamer::zipWithTime( )
     }
 
     // Turn it into a table format. Its like taking a transpose of vector<
-    // vector >.
-    double allTableDt = tableDt_[ 0 ];
+    // vector >. A decimated table has one entry per block of steps.
+    double allTableDt = tableDt_[ 0 ] * tables_[ 0 ]->getDecimation( );
     for( unsigned int i = 0; i < collectedData[0].size( ); i++ )
     {
         data_.push_back( currTime_ );
@@ -27,6 +27,7 @@
 
 #include "StreamerBase.h"
 #include "Table.h"
+#include "../utility/cnpy.hpp"
 
 using namespace std;
 
@@ -59,6 +60,9 @@ public:
 
     void zipWithTime( );
 
+    /// Write data_ to the output file, and clear it.
+    void writeData( OpenMode openmode );
+
     /** Dest functions.
      * The process function called by scheduler on every tick
      */
@@ -96,6 +100,10 @@ private:
     /*  Keep data in vector */
     vector<double> data_;
 
+    /* For npy output: the file stays open from reinit to the end of the
+     * run. */
+    cnpy2::NpyWriter npyWriter_;
+
 };
 
 #endif   /* ----- #ifndef Streamer_INC  ----- */
@@ -97,6 +97,26 @@ const Cinfo* Table::initCinfo()
         , &Table::getColumnName
     );
 
+    static ValueFinfo< Table, unsigned int > decimation(
+        "decimation"
+        , "Number of time steps summarized by each entry of the table, to"
+        " record long runs in less memory. Default 1, keeps every sample."
+        " The entries are decimation * dt apart. Not applied in spike mode"
+        " or to values sent to the input message."
+        , &Table::setDecimation
+        , &Table::getDecimation
+    );
+
+    static ValueFinfo< Table, string > decimationMode(
+        "decimationMode"
+        , "How each block of 'decimation' steps is summarized: 'sample'"
+        " keeps its first value (default), 'mean' its mean, and 'minmax'"
+        " its minimum followed by its maximum, which keeps the peaks."
+        " The mean and minmax of a block are added once it is complete."
+        , &Table::setDecimationMode
+        , &Table::getDecimationMode
+    );
+
     //////////////////////////////////////////////////////////////
     // MsgDest Definitions
     //////////////////////////////////////////////////////////////
@@ -147,6 +167,8 @@ const Cinfo* Table::initCinfo()
         &outfile,               // Value
         &useStreamer,           // Value
         &useSpikeMode,          // Value
+        &decimation,            // Value
+        &decimationMode,        // Value
         handleInput(),		// DestFinfo
         &spike,			// DestFinfo
         requestOut(),		// SrcFinfo
@@ -223,6 +245,11 @@ Table::Table() :
     fired_(false),
     useSpikeMode_(false),
     dt_( 0.0 ),
+    tStart_( 0.0 ),
+    decimation_( 1 ),
+    decimationMode_( "sample" ),
+    blockCount_( 0 ),
+    blockStart_( 0.0 ),
     lastN_(0),
     useFileStreamer_(false),
     datafile_(""),
@@ -255,7 +282,6 @@ Table& Table::operator=( const Table& tab )
 void Table::process( const Eref& e, ProcPtr p )
 {
     lastTime_ = p->currTime;
-    tvec_.push_back(lastTime_);
 
     // Copy incoming data to ret and insert into vector.
     vector< double > ret;
@@ -267,7 +293,7 @@ void Table::process( const Eref& e, ProcPtr p )
             spike( *i );
     }
     else
-        vec().insert( vec().end(), ret.begin(), ret.end() );
+        record( ret );
 
     /*  If we are streaming to a file, let's write to a file. And clean the
      *  vector.
@@ -287,10 +313,68 @@ void Table::process( const Eref& e, ProcPtr p )
 void Table::clearAllVecs()
 {
     clearVec();
-    tvec_.clear();
     data_.clear();
 }
 
+void Table::record( const vector< double >& ret )
+{
+    if ( decimation_ <= 1 )
+    {
+        if ( vec().empty() )
+            tStart_ = lastTime_;
+        vec().insert( vec().end(), ret.begin(), ret.end() );
+        return;
+    }
+
+    if ( blockCount_ == 0 )
+    {
+        blockStart_ = lastTime_;
+        blockMin_ = ret;
+        blockMax_ = ret;
+        if ( decimationMode_ == "sample" )
+        {
+            if ( vec().empty() )
+                tStart_ = blockStart_;
+            vec().insert( vec().end(), ret.begin(), ret.end() );
+        }
+    }
+    else if ( ret.size() == blockMin_.size() )
+    {
+        for ( unsigned int i = 0; i < ret.size(); ++i )
+        {
+            if ( decimationMode_ == "mean" )
+            {
+                blockMin_[i] += ret[i];
+            }
+            else
+            {
+                blockMin_[i] = min( blockMin_[i], ret[i] );
+                blockMax_[i] = max( blockMax_[i], ret[i] );
+            }
+        }
+    }
+    if ( ++blockCount_ < decimation_ )
+        return;
+
+    blockCount_ = 0;
+    if ( decimationMode_ == "sample" )
+        return;
+    if ( vec().empty() )
+        tStart_ = blockStart_;
+    for ( unsigned int i = 0; i < blockMin_.size(); ++i )
+    {
+        if ( decimationMode_ == "mean" )
+        {
+            vec().push_back( blockMin_[i] / decimation_ );
+        }
+        else
+        {
+            vec().push_back( blockMin_[i] );
+            vec().push_back( blockMax_[i] );
+        }
+    }
+}
+
 /**
  * @brief Reinitialize
  *
@@ -325,8 +409,10 @@ void Table::reinit( const Eref& e, ProcPtr p )
     }
 
     input_ = 0.0;
-    vec().resize( 0 );
+    clearVec();
     lastTime_ = 0;
+    tStart_ = 0.0;
+    blockCount_ = 0;
     vector< double > ret;
     requestOut()->send( e, &ret );
 
@@ -336,9 +422,7 @@ void Table::reinit( const Eref& e, ProcPtr p )
             spike( *i );
     }
     else
-        vec().insert( vec().end(), ret.begin(), ret.end() );
-
-    tvec_.push_back(lastTime_);
+        record( ret );
 
     if( useFileStreamer_ )
     {
@@ -458,22 +542,58 @@ string Table::getDatafile( void ) const
     return datafile_;
 }
 
+void Table::setDecimation( unsigned int n )
+{
+    decimation_ = max( n, 1u );
+    blockCount_ = 0;
+}
+
+unsigned int Table::getDecimation( void ) const
+{
+    return decimation_;
+}
+
+void Table::setDecimationMode( string mode )
+{
+    if( mode == "sample" || mode == "mean" || mode == "minmax" )
+    {
+        decimationMode_ = mode;
+        blockCount_ = 0;
+    }
+    else
+        cout << "Warning: Table::setDecimationMode: '" << mode <<
+             "' is not one of 'sample', 'mean' or 'minmax'. Ignored.\n";
+}
+
+string Table::getDecimationMode( void ) const
+{
+    return decimationMode_;
+}
+
 // Get the dt_ of this table
 double Table::getDt( void ) const
 {
     return dt_;
 }
 
+double Table::sampleTime( unsigned int i ) const
+{
+    if ( decimation_ > 1 && decimationMode_ == "minmax" )
+        i /= 2;     // The min and max of a block share its time.
+    return tStart_ + i * dt_ * decimation_;
+}
+
 /**
  * @brief Take the vector from table and timestamp it. It must only be called
  * when packing the data for writing.
  */
 void Table::mergeWithTime( vector<double>& data )
 {
-    auto v = vec();
+    const vector< double >& v = TableBase::data();
+    data.reserve( data.size() + 2 * v.size() );
     for (unsigned int i = 0; i < v.size(); i++)
     {
-        data.push_back(tvec_[i]);
+        data.push_back(sampleTime(i));
         data.push_back(v[i]);
     }
 }
@@ -488,14 +608,14 @@ void Table::mergeWithTime( vector<double>& data )
 string Table::toJSON(bool withTime, bool clear)
 {
     stringstream ss;
-    auto v = vec();
+    const vector< double >& v = data();
     if( clear )
         lastN_ = 0;
 
     for (unsigned int i = lastN_; i < v.size(); i++)
     {
         if(withTime)
-            ss << '[' << tvec_[i] << ',' << v[i] << "],";
+            ss << '[' << sampleTime(i) << ',' << v[i] << "],";
         else
             ss << v[i] << ',';
     }
@@ -523,14 +643,14 @@ string Table::toJSON(bool withTime, bool clear)
 /* ----------------------------------------------------------------------------*/
 void Table::collectData(vector<double>& data, bool withTime, bool clear)
 {
-    auto v = vec();
+    const vector< double >& v = TableBase::data();
     if( clear )
         lastN_ = 0;
 
     for (unsigned int i = lastN_; i < v.size(); i++)
     {
         if(withTime)
-            data.push_back(tvec_[i]);
+            data.push_back(sampleTime(i));
         data.push_back(v[i]);
     }
 
@@ -45,9 +45,18 @@ public:
     void setDatafile ( string filepath );
     string getDatafile ( void ) const;
 
+    void setDecimation ( unsigned int n );
+    unsigned int getDecimation ( void ) const;
+
+    void setDecimationMode ( string mode );
+    string getDecimationMode ( void ) const;
+
     // Access the dt_ of table.
     double getDt ( void ) const;
 
+    // Time of entry i of the table.
+    double sampleTime( unsigned int i ) const;
+
     // merge time value among values. e.g. t1, v1, t2, v2, etc.
     void mergeWithTime( vector<double>& data );
 
@@ -58,6 +67,9 @@ public:
 
     void clearAllVecs();
 
+    // Adds the values sampled on one time step, decimated if asked.
+    void record( const vector< double >& ret );
+
     //////////////////////////////////////////////////////////////////
     // Dest funcs
     //////////////////////////////////////////////////////////////////
@@ -83,7 +95,26 @@ private:
     bool useSpikeMode_;
 
     vector<double> data_;
-    vector<double> tvec_;                       /* time data */
+
+    /**
+     * Time of the first entry of the table. The entries are dt_ *
+     * decimation_ apart, so their times are not stored.
+     */
+    double tStart_;
+
+    /**
+     * Number of time steps summarized by each entry. In "sample" mode the
+     * first value of each block is kept, in "mean" mode its mean, and in
+     * "minmax" mode its minimum and then its maximum.
+     */
+    unsigned int decimation_;
+    string decimationMode_;
+
+    // State of the current block of decimation_ steps.
+    unsigned int blockCount_;
+    double blockStart_;
+    vector<double> blockMin_;   // Also holds the sum in "mean" mode.
+    vector<double> blockMax_;
 
     // A table have 2 columns. First is time. We initialize this in reinit().
     vector<string> columns_; 
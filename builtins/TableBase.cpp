@@ -161,7 +161,8 @@ const Cinfo* TableBase::initCinfo()
 
 static const Cinfo* tableBaseCinfo = TableBase::initCinfo();
 
-TableBase::TableBase() : output_( 0 )
+TableBase::TableBase()
+    : output_( 0 ), vec_( std::make_shared< vector< double > >() )
 {
 }
 
@@ -171,8 +172,8 @@ TableBase::TableBase() : output_( 0 )
 
 void TableBase::linearTransform( double scale, double offset )
 {
-    for ( vector< double >::iterator i = vec_.begin(); i != vec_.end(); ++i)
-        *i = *i * scale + offset;
+    for ( double& y : vec() )
+        y = y * scale + offset;
 }
 
 void TableBase::plainPlot( string fname )
@@ -180,8 +181,8 @@ void TableBase::plainPlot( string fname )
     ofstream fout( fname.c_str(), ios_base::out );
     fout.precision( 18 );
     fout.setf( ios::scientific, ios::floatfield );
-    for ( vector< double >::iterator i = vec_.begin(); i != vec_.end(); ++i)
-        fout << *i << endl;
+    for ( double y : *vec_ )
+        fout << y << endl;
     fout << "\n";
 }
 
@@ -190,8 +191,8 @@ void TableBase::xplot( string fname, string plotname )
     ofstream fout( fname.c_str(), ios_base::app );
     fout << "/newplot\n";
     fout << "/plotname " << plotname << "\n";
-    for ( vector< double >::iterator i = vec_.begin(); i != vec_.end(); ++i)
-        fout << *i << endl;
+    for ( double y : *vec_ )
+        fout << y << endl;
     fout << "\n";
 }
 
@@ -314,7 +315,7 @@ bool innerLoadXplot( string fname, string plotname, vector< double >& v )
 
 void TableBase::loadXplot( string fname, string plotname )
 {
-    if ( !innerLoadXplot( fname, plotname, vec_ ) )
+    if ( !innerLoadXplot( fname, plotname, vec() ) )
     {
         cout << "TableBase::loadXplot: unable to load data from file " << fname <<endl;
         return;
@@ -337,8 +338,8 @@ void TableBase::loadXplotRange( string fname, string plotname,
              " from file " << fname << endl;
         return;
     }
-    vec_.clear();
-    vec_.insert( vec_.end(), temp.begin() + start, temp.begin() + end );
+    vec_ = std::make_shared< vector< double > >(
+               temp.begin() + start, temp.begin() + end );
 }
 
 void TableBase::loadCSV(
@@ -408,12 +409,12 @@ void TableBase::compareXplot( string fname, string plotname, string op )
 
     if ( hop == "rmsd" )   // RMSDifference
     {
-        output_ = getRMSDiff( vec_, temp );
+        output_ = getRMSDiff( *vec_, temp );
     }
 
     if ( hop == "rmsr" )   // RMS ratio
     {
-        output_ = getRMSRatio( vec_, temp );
+        output_ = getRMSRatio( *vec_, temp );
     }
 
     if ( hop == "dotp" )
@@ -429,12 +430,12 @@ void TableBase::compareVec( vector< double > temp, string op )
 
     if ( hop == "rmsd" )   // RMSDifference
     {
-        output_ = getRMSDiff( vec_, temp );
+        output_ = getRMSDiff( *vec_, temp );
     }
 
     if ( hop == "rmsr" )   // RMS ratio
     {
-        output_ = getRMSRatio( vec_, temp );
+        output_ = getRMSRatio( *vec_, temp );
     }
 
     if ( hop == "dotp" )
@@ -443,7 +444,7 @@ void TableBase::compareVec( vector< double > temp, string op )
 
 void TableBase::clearVec()
 {
-    vec_.resize(0);
+    vec_ = std::make_shared< vector< double > >();
 }
 
 //////////////////////////////////////////////////////////////
@@ -462,36 +463,38 @@ void TableBase::setOutputValue( double v )
 
 double TableBase::getY( unsigned int index ) const
 {
-    if ( index < vec_.size() )
-        return ( vec_[index] );
+    const vector< double >& v = *vec_;
+    if ( index < v.size() )
+        return ( v[index] );
     return 0;
 }
 
 double TableBase::interpolate( double xmin, double xmax, double input )
 const
 {
-    if ( vec_.size() == 0 )
+    const vector< double >& v = *vec_;
+    if ( v.size() == 0 )
         return 0;
-    if ( vec_.size() == 1 || input < xmin || xmin >= xmax )
-        return vec_[0];
+    if ( v.size() == 1 || input < xmin || xmin >= xmax )
+        return v[0];
     if ( input > xmax )
-        return ( vec_.back() );
+        return ( v.back() );
 
-    unsigned int xdivs = vec_.size() - 1;
+    unsigned int xdivs = v.size() - 1;
 
     double fraction = ( input - xmin ) / ( xmax - xmin );
     if ( fraction < 0 )
-        return vec_[0];
+        return v[0];
 
     unsigned int j = static_cast<unsigned int>(xdivs * fraction);
-    if ( j >= ( vec_.size() - 1 ) )
-        return vec_.back();
+    if ( j >= ( v.size() - 1 ) )
+        return v.back();
 
     double dx = (xmax - xmin ) / xdivs;
     double lowerBound = xmin + j * dx;
     double subFraction = ( input - lowerBound ) / dx;
 
-    double y = vec_[j] + ( vec_[j + 1] - vec_[j] ) * subFraction;
+    double y = v[j] + ( v[j + 1] - v[j] ) * subFraction;
     return y;
 }
 
@@ -501,31 +504,38 @@ const
 
 void TableBase::setVecSize( unsigned int num )
 {
-    vec_.resize( num );
+    vec().resize( num );
 }
 
 unsigned int TableBase::getVecSize() const
 {
-    return vec_.size();
+    return vec_->size();
 }
 
 vector< double > TableBase::getVector() const
 {
-    return vec_;
+    return *vec_;
 }
 
 void TableBase::setVector( vector< double >  val )
 {
-    vec_ = val;
+    vec_ = std::make_shared< vector< double > >( std::move( val ) );
 }
 
 vector< double >& TableBase::vec()
 {
-    return vec_;
+    if ( vec_.use_count() > 1 )
+        vec_ = std::make_shared< vector< double > >( *vec_ );
+    return *vec_;
 }
 
 // Fetch the const copy of table. Used in Streamer class.
 const vector< double >& TableBase::data( )
+{
+    return *vec_;
+}
+
+std::shared_ptr< const vector< double > > TableBase::sharedData() const
 {
     return vec_;
 }
@@ -11,6 +11,8 @@
 #ifndef _TABLE_BASE_H
 #define _TABLE_BASE_H
 
+#include <memory>
+
 /**
  * Base class for table operations. Provides basics for looking up table
  * and interpolation, but no process or messaging. Derived classes
@@ -28,6 +30,10 @@ public:
 
     const vector< double >& data( );
 
+    /// The table itself, for holders that must keep it alive, such as
+    /// numpy views of it. Later changes to the table do not reach them.
+    std::shared_ptr< const vector< double > > sharedData() const;
+
     void setVector( vector< double > val );
 
     double getOutputValue() const;
@@ -67,11 +73,18 @@ public:
     static const Cinfo* initCinfo();
 
 protected:
+    /// Writable table. Makes a private copy first if it is shared.
     vector< double >& vec();
 
 private:
     double output_;
-    vector< double > vec_;
+
+    /**
+     * The table. Copies of the object share it until one of them
+     * changes it, so that copying a cell or network does not duplicate
+     * large tables such as Interpol and StimulusTable vectors.
+     */
+    std::shared_ptr< vector< double > > vec_;
 };
 
 #endif	// _TABLE_BASE_H
@@ -196,9 +196,9 @@ void TimeTable::process(const Eref& e, ProcPtr p)
 
   state_ = 0;
 
-  if ( curPos_ < vec().size() &&
-       p->currTime >= vec()[curPos_] ) {
-      eventOut()->send( e, vec()[curPos_]);
+  if ( curPos_ < data().size() &&
+       p->currTime >= data()[curPos_] ) {
+      eventOut()->send( e, data()[curPos_]);
       curPos_++;
       state_ = 1;
   }
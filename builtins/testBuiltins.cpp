@@ -270,6 +270,39 @@ void testTable()
 	cout << "." << flush;
 }
 
+/**
+ * Copies of a table share its vector until one of them changes it.
+ */
+void testTableCopyShare()
+{
+	Shell* shell = reinterpret_cast< Shell* >( Id().eref().data() );
+	ObjId orig = shell->doCreate( "StimulusTable", ObjId(), "stim", 1 );
+	vector< double > v( 1000 );
+	for ( unsigned int i = 0; i < v.size(); ++i )
+		v[i] = i;
+	Field< vector< double > >::set( orig, "vector", v );
+	Id copy = shell->doCopy( orig, ObjId(), "stimCopy", 3, false, false );
+	TableBase* t0 = reinterpret_cast< TableBase* >( orig.data() );
+	TableBase* t1 = reinterpret_cast< TableBase* >( ObjId( copy, 1 ).data() );
+	TableBase* t2 = reinterpret_cast< TableBase* >( ObjId( copy, 2 ).data() );
+	assert( &t0->data() == &t1->data() );
+	assert( &t1->data() == &t2->data() );
+
+	t1->linearTransform( 2.0, 1.0 );
+	assert( &t0->data() != &t1->data() );
+	assert( &t0->data() == &t2->data() );
+	assert( doubleEq( t0->getY( 10 ), 10.0 ) );
+	assert( doubleEq( t1->getY( 10 ), 21.0 ) );
+	assert( doubleEq( t2->getY( 10 ), 10.0 ) );
+
+	t0->setVecSize( 10 );
+	assert( t0->getVecSize() == 10 );
+	assert( t2->getVecSize() == 1000 );
+	shell->doDelete( orig );
+	shell->doDelete( copy );
+	cout << "." << flush;
+}
+
 /**
  * Tests capacity to send a request for a field value to an object
  */
@@ -429,6 +462,7 @@ void testBuiltins()
 {
 	testArith();
 	testTable();
+	testTableCopyShare();
 #if ENABLE_NSDF
         testNSDF();
 #endif
@@ -0,0 +1,124 @@
+/**********************************************************************
+** This program is part of 'MOOSE', the
+** Messaging Object Oriented Simulation Environment.
+**           Copyright (C) 2003-2014 Upinder S. Bhalla. and NCBS
+** It is made available under the terms of the
+** GNU Lesser General Public License version 2.1
+** See the file COPYING.LIB for the full notice.
+**********************************************************************/
+#include <algorithm>
+#include <vector>
+#include <map>
+#include <cassert>
+#include <string>
+#include <iostream>
+using namespace std;
+
+#include "../basecode/SparseMatrix.h"
+#include "DiffPoolVec.h"
+#include "DiffPoolBatch.h"
+
+DiffPoolBatch::DiffPoolBatch()
+{
+    ;
+}
+
+DiffPoolBatch::DiffPoolBatch( const vector< unsigned int >& poolIndex,
+                              const vector< DiffPoolVec >& pools )
+    : poolIndex_( poolIndex )
+{
+    if ( poolIndex_.empty() )
+        return;
+    const DiffPoolVec& first = pools[ poolIndex_[0] ];
+    const vector< Triplet< double > >& ops = first.ops_;
+    const unsigned int numPools = poolIndex_.size();
+    const unsigned int numVoxels = first.diagVal_.size();
+    const unsigned int unused = ~0U;
+
+    // Number the voxels in the order in which the ops first touch them.
+    newFromOld_.assign( numVoxels, unused );
+    unsigned int next = 0;
+    for ( auto i = ops.cbegin(); i != ops.cend(); ++i )
+    {
+        if ( newFromOld_[ i->b_ ] == unused )
+            newFromOld_[ i->b_ ] = next++;
+        if ( newFromOld_[ i->c_ ] == unused )
+            newFromOld_[ i->c_ ] = next++;
+    }
+    for ( unsigned int v = 0; v < numVoxels; ++v )
+        if ( newFromOld_[ v ] == unused )
+            newFromOld_[ v ] = next++;
+
+    opSrc_.resize( ops.size() );
+    opDest_.resize( ops.size() );
+    for ( unsigned int k = 0; k < ops.size(); ++k )
+    {
+        opSrc_[k] = newFromOld_[ ops[k].b_ ];
+        opDest_[k] = newFromOld_[ ops[k].c_ ];
+    }
+
+    opCoeff_.resize( ops.size() * numPools );
+    diag_.resize( numVoxels * numPools );
+    for ( unsigned int p = 0; p < numPools; ++p )
+    {
+        const DiffPoolVec& pool = pools[ poolIndex_[p] ];
+        assert( sameOps( pool.ops_, ops ) );
+        assert( pool.diagVal_.size() == numVoxels );
+        for ( unsigned int k = 0; k < ops.size(); ++k )
+            opCoeff_[ k * numPools + p ] = pool.ops_[k].a_;
+        for ( unsigned int v = 0; v < numVoxels; ++v )
+            diag_[ newFromOld_[v] * numPools + p ] = pool.diagVal_[v];
+    }
+    y_.resize( diag_.size() );
+}
+
+void DiffPoolBatch::advance( vector< DiffPoolVec >& pools )
+{
+    const unsigned int numPools = poolIndex_.size();
+    const unsigned int numVoxels = newFromOld_.size();
+    if ( numPools == 0 )
+        return;
+
+    for ( unsigned int p = 0; p < numPools; ++p )
+    {
+        const vector< double >& n = pools[ poolIndex_[p] ].n_;
+        for ( unsigned int v = 0; v < numVoxels; ++v )
+            y_[ newFromOld_[v] * numPools + p ] = n[v];
+    }
+
+    const double* coeff = opCoeff_.data();
+    double* y = y_.data();
+    for ( unsigned int k = 0; k < opSrc_.size(); ++k, coeff += numPools )
+    {
+        const double* src = y + opSrc_[k] * numPools;
+        double* dest = y + opDest_[k] * numPools;
+        for ( unsigned int p = 0; p < numPools; ++p )
+            dest[p] -= src[p] * coeff[p];
+    }
+
+    for ( unsigned int i = 0; i < y_.size(); ++i )
+        y[i] *= diag_[i];
+
+    for ( unsigned int p = 0; p < numPools; ++p )
+    {
+        vector< double >& n = pools[ poolIndex_[p] ].n_;
+        for ( unsigned int v = 0; v < numVoxels; ++v )
+            n[v] = y_[ newFromOld_[v] * numPools + p ];
+    }
+}
+
+unsigned int DiffPoolBatch::getNumPools() const
+{
+    return poolIndex_.size();
+}
+
+bool DiffPoolBatch::sameOps( const vector< Triplet< double > >& a,
+                             const vector< Triplet< double > >& b )
+{
+    if ( a.size() != b.size() )
+        return false;
+    for ( unsigned int k = 0; k < a.size(); ++k )
+        if ( a[k].b_ != b[k].b_ || a[k].c_ != b[k].c_ )
+            return false;
+    return true;
+}
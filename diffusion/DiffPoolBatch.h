@@ -0,0 +1,62 @@
+/**********************************************************************
+** This program is part of 'MOOSE', the
+** Messaging Object Oriented Simulation Environment.
+**           Copyright (C) 2003-2014 Upinder S. Bhalla. and NCBS
+** It is made available under the terms of the
+** GNU Lesser General Public License version 2.1
+** See the file COPYING.LIB for the full notice.
+**********************************************************************/
+
+#ifndef _DIFF_POOL_BATCH_H
+#define _DIFF_POOL_BATCH_H
+
+/**
+ * Advances a set of DiffPoolVecs together by one diffusion timestep.
+ * Pools diffusing on the same mesh have elimination ops that visit the
+ * same voxels in the same order: only the coefficients differ, since
+ * they depend on diffConst and motorConst. The batch stores the voxel
+ * indices once, and the coefficients and the 'n' values pool-contiguous
+ * so that each op is applied to all the pools in one tight loop.
+ * Voxels are renumbered in the order in which the ops first use them,
+ * which is the Hines order of the mesh, so the sweep walks through
+ * memory almost sequentially.
+ */
+class DiffPoolBatch
+{
+public:
+    DiffPoolBatch();
+
+    /**
+     * Builds the batch for the pools in poolIndex, which must all have
+     * ops matching those of the first one (see sameOps).
+     */
+    DiffPoolBatch( const vector< unsigned int >& poolIndex,
+                   const vector< DiffPoolVec >& pools );
+
+    /// Advances all the pools of the batch by one timestep.
+    void advance( vector< DiffPoolVec >& pools );
+
+    unsigned int getNumPools() const;
+
+    /// True if both op sequences act on the same voxels in the same order.
+    static bool sameOps( const vector< Triplet< double > >& a,
+                         const vector< Triplet< double > >& b );
+
+private:
+    /// Index of each pool of the batch in the Dsolve's pool vector.
+    vector< unsigned int > poolIndex_;
+    /// Looks up the batch voxel index from the mesh voxel index.
+    vector< unsigned int > newFromOld_;
+    /// Source voxel of each op, in batch numbering.
+    vector< unsigned int > opSrc_;
+    /// Destination voxel of each op, in batch numbering.
+    vector< unsigned int > opDest_;
+    /// Op coefficients, opCoeff_[ op * numPools + pool ].
+    vector< double > opCoeff_;
+    /// Diagonal terms, diag_[ voxel * numPools + pool ].
+    vector< double > diag_;
+    /// Working copy of n, y_[ voxel * numPools + pool ].
+    vector< double > y_;
+};
+
+#endif // _DIFF_POOL_BATCH_H
@@ -141,6 +141,11 @@ void DiffPoolVec::setOps(const vector< Triplet< double > >& ops,
     }
 }
 
+const vector< Triplet< double > >& DiffPoolVec::getOps() const
+{
+    return ops_;
+}
+
 void DiffPoolVec::advance( double dt )
 {
     if ( ops_.size() == 0 ) return;
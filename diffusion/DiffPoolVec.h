@@ -17,6 +17,7 @@
  */
 class DiffPoolVec
 {
+    friend class DiffPoolBatch;
 public:
     DiffPoolVec();
     void process();
@@ -50,6 +51,8 @@ public:
     void setPrevVec(); /// Assigns prev_ = n_
     void setOps( const vector< Triplet< double > >& ops_,
                  const vector< double >& diagVal_ ); /// Assign operations.
+    /// Elimination ops, empty if the pool does not diffuse.
+    const vector< Triplet< double > >& getOps() const;
 
     // static const Cinfo* initCinfo();
 private:
@@ -17,6 +17,7 @@
 #include "../ksolve/KsolveBase.h"
 #include "../kinetics/ConcChan.h"
 #include "DiffPoolVec.h"
+#include "DiffPoolBatch.h"
 #include "ConcChanInfo.h"
 #include "FastMatrixElim.h"
 #include "../mesh/VoxelJunction.h"
@@ -28,8 +29,13 @@
 #include "../shell/Wildcard.h"
 #include "../kinetics/PoolBase.h"
 #include "Dsolve.h"
+#include "../shell/Checkpoint.h"
+#include "../utility/utility.h"
 
 #include <thread>
+#include <future>
+#include <numeric>
+#include <functional>
 
 const Cinfo* Dsolve::initCinfo()
 {
@@ -66,6 +72,23 @@ const Cinfo* Dsolve::initCinfo()
             &Dsolve::getNumVoxels
             );
 
+    static ValueFinfo< Dsolve, unsigned int > numThreads(
+            "numThreads",
+            "Number of threads over which the diffusing pools are "
+            "advanced. Defaults to the environment variable "
+            "MOOSE_NUM_THREADS, or 1.",
+            &Dsolve::setNumThreads,
+            &Dsolve::getNumThreads
+            );
+
+    static ReadOnlyValueFinfo< Dsolve, unsigned int > numBatches(
+            "numBatches",
+            "Number of groups of pools that are advanced together. Pools "
+            "on the same mesh share the voxel ordering of their "
+            "elimination, and are advanced in one sweep over the mesh.",
+            &Dsolve::getNumBatches
+            );
+
     static LookupValueFinfo< Dsolve, unsigned int, vector< double > > nVec(
             "nVec",
             "vector of # of molecules along diffusion length, "
@@ -157,6 +180,8 @@ const Cinfo* Dsolve::initCinfo()
         &compartment,               // Value
         &numVoxels,                 // ReadOnlyValue
         &numAllVoxels,              // ReadOnlyValue
+        &numThreads,                // Value
+        &numBatches,                // ReadOnlyValue
         &nVec,                      // LookupValue
         &numPools,                  // Value
         &diffVol1,                  // LookupValue
@@ -187,8 +212,13 @@ Dsolve::Dsolve() :
     numTotPools_( 0 ),
     numLocalPools_( 0 ),
     poolStartIndex_( 0 ),
-    numVoxels_( 0 )
-{;}
+    numVoxels_( 0 ),
+    numThreads_( 1 ),
+    junctionThreads_( 1 ),
+    isJunctionPartsDirty_( true )
+{
+    numThreads_ = moose::getEnvInt( "MOOSE_NUM_THREADS", 1 );
+}
 
 Dsolve::~Dsolve()
 {;}
@@ -245,6 +275,7 @@ void Dsolve::setDiffVol1( unsigned int voxel, double vol )
     {
         VoxelJunction& vj = junctions_[0].vj[ voxel ];
         vj.firstVol = vol;
+        isJunctionPartsDirty_ = true;
     }
 }
 
@@ -264,6 +295,7 @@ void Dsolve::setDiffVol2( unsigned int voxel, double vol )
     {
         VoxelJunction& vj = junctions_[0].vj[ voxel ];
         vj.secondVol = vol;
+        isJunctionPartsDirty_ = true;
     }
 }
 
@@ -283,6 +315,7 @@ void Dsolve::setDiffScale( unsigned int voxel, double adx )
     {
         VoxelJunction& vj = junctions_[0].vj[ voxel ];
         vj.diffScale = adx;
+        isJunctionPartsDirty_ = true;
     }
 }
 
@@ -550,8 +583,40 @@ void Dsolve::calcJunction( const DiffJunction& jn, double dt )
 
 void Dsolve::process( const Eref& e, ProcPtr p )
 {
-    for ( auto i = pools_.begin(); i != pools_.end(); ++i )
-        i->advance( p->dt );
+    if ( intervals_.size() <= 1 )
+    {
+        for ( auto i = batches_.begin(); i != batches_.end(); ++i )
+            i->advance( pools_ );
+        return;
+    }
+
+    std::vector<std::future<size_t>> vecFutures;
+    for ( auto interval : intervals_ )
+    {
+        vecFutures.push_back(
+                std::async( std::launch::async
+                    , &Dsolve::advanceBatchChunk
+                    , this
+                    , interval.first
+                    , interval.second
+                    )
+                );
+    }
+    size_t tot = 0;
+    for ( auto &v : vecFutures )
+        tot += v.get();
+    assert( tot == batches_.size() );
+}
+
+size_t Dsolve::advanceBatchChunk( size_t begin, size_t end )
+{
+    size_t tot = 0;
+    for ( size_t i = begin; i < min( end, batches_.size() ); i++ )
+    {
+        batches_[i].advance( pools_ );
+        tot += 1;
+    }
+    return tot;
 }
 
 void Dsolve::reinit( const Eref& e, ProcPtr p )
@@ -566,8 +631,149 @@ void Dsolve::reinit( const Eref& e, ProcPtr p )
 void Dsolve::updateJunctions( double dt )
 {
     calcLocalChan( dt );
-    for (auto i = junctions_.begin(); i != junctions_.end(); ++i )
+    if ( isJunctionPartsDirty_ )
+        partitionJunctions();
+
+    if ( junctionParts_.size() <= 1 )
+    {
+        for (auto i = junctions_.begin(); i != junctions_.end(); ++i )
+            calcJunction( *i, dt );
+        return;
+    }
+
+    std::vector<std::future<size_t>> vecFutures;
+    for ( size_t i = 0; i < junctionParts_.size(); ++i )
+    {
+        vecFutures.push_back(
+                std::async( std::launch::async
+                    , &Dsolve::calcJunctionPart
+                    , this
+                    , i
+                    , dt
+                    )
+                );
+    }
+    for ( auto &v : vecFutures )
+        v.get();
+}
+
+size_t Dsolve::calcJunctionPart( size_t part, double dt )
+{
+    size_t tot = 0;
+    for ( auto i = junctionParts_[part].cbegin();
+            i != junctionParts_[part].cend(); ++i )
+    {
         calcJunction( *i, dt );
+        tot += i->vj.size();
+    }
+    return tot;
+}
+
+void Dsolve::setJunctionThreads( unsigned int numThreads )
+{
+    if ( numThreads != junctionThreads_ )
+    {
+        junctionThreads_ = numThreads;
+        isJunctionPartsDirty_ = true;
+    }
+}
+
+/// Finds the root of a voxel in the forest used by partitionJunctions.
+static unsigned int findRoot( vector< unsigned int >& up, unsigned int i )
+{
+    while ( up[i] != i )
+    {
+        up[i] = up[ up[i] ];
+        i = up[i];
+    }
+    return i;
+}
+
+void Dsolve::partitionJunctions()
+{
+    isJunctionPartsDirty_ = false;
+    junctionParts_.clear();
+    if ( junctionThreads_ <= 1 )
+        return;
+
+    // Give a node number to each voxel touched by the junctions, on
+    // this Dsolve and on each of the others.
+    unsigned int numNodes = 0;
+    for ( auto i = junctions_.cbegin(); i != junctions_.cend(); ++i )
+        for ( auto j = i->vj.cbegin(); j != i->vj.cend(); ++j )
+            numNodes = max( numNodes, j->first + 1 );
+    map< unsigned int, unsigned int > otherStart;
+    for ( auto i = junctions_.cbegin(); i != junctions_.cend(); ++i )
+    {
+        if ( otherStart.find( i->otherDsolve ) != otherStart.end() )
+            continue;
+        unsigned int num = 0;
+        for ( auto j = junctions_.cbegin(); j != junctions_.cend(); ++j )
+            if ( j->otherDsolve == i->otherDsolve )
+                for ( auto k = j->vj.cbegin(); k != j->vj.cend(); ++k )
+                    num = max( num, k->second + 1 );
+        otherStart[ i->otherDsolve ] = numNodes;
+        numNodes += num;
+    }
+
+    // Voxels linked by a junction go in the same set.
+    vector< unsigned int > up( numNodes );
+    for ( unsigned int i = 0; i < numNodes; ++i )
+        up[i] = i;
+    unsigned int numVj = 0;
+    for ( auto i = junctions_.cbegin(); i != junctions_.cend(); ++i )
+    {
+        unsigned int start = otherStart[ i->otherDsolve ];
+        for ( auto j = i->vj.cbegin(); j != i->vj.cend(); ++j )
+        {
+            unsigned int a = findRoot( up, j->first );
+            unsigned int b = findRoot( up, start + j->second );
+            up[b] = a;
+        }
+        numVj += i->vj.size();
+    }
+
+    // Assign the sets to threads, biggest first, each to the thread with
+    // the fewest voxel junctions so far.
+    vector< unsigned int > setSize( numNodes, 0 );
+    for ( auto i = junctions_.cbegin(); i != junctions_.cend(); ++i )
+        for ( auto j = i->vj.cbegin(); j != i->vj.cend(); ++j )
+            setSize[ findRoot( up, j->first ) ]++;
+    vector< pair< unsigned int, unsigned int > > sets;
+    for ( unsigned int i = 0; i < numNodes; ++i )
+        if ( setSize[i] > 0 )
+            sets.push_back( make_pair( setSize[i], i ) );
+    unsigned int numParts = min( ( size_t )junctionThreads_, sets.size() );
+    if ( numParts <= 1 )
+        return;
+    sort( sets.begin(), sets.end(),
+            greater< pair< unsigned int, unsigned int > >() );
+    vector< unsigned int > partOfSet( numNodes, 0 );
+    vector< unsigned int > load( numParts, 0 );
+    for ( auto i = sets.cbegin(); i != sets.cend(); ++i )
+    {
+        unsigned int part =
+            min_element( load.begin(), load.end() ) - load.begin();
+        partOfSet[ i->second ] = part;
+        load[ part ] += i->first;
+    }
+
+    // Each part gets a copy of every junction, with only its own voxel
+    // junctions, kept in their original order.
+    junctionParts_.resize( numParts );
+    for ( auto i = junctions_.cbegin(); i != junctions_.cend(); ++i )
+    {
+        DiffJunction empty = *i;
+        empty.vj.clear();
+        for ( unsigned int p = 0; p < numParts; ++p )
+            junctionParts_[p].push_back( empty );
+        for ( auto j = i->vj.cbegin(); j != i->vj.cend(); ++j )
+        {
+            unsigned int part = partOfSet[ findRoot( up, j->first ) ];
+            junctionParts_[part].back().vj.push_back( *j );
+        }
+    }
+    assert( accumulate( load.begin(), load.end(), 0U ) == numVj );
 }
 
 
@@ -795,6 +1001,27 @@ string Dsolve::getPath( const Eref& e ) const
     return path_;
 }
 
+void Dsolve::setNumThreads( unsigned int x )
+{
+    if ( x == 0 )
+    {
+        cout << "Warning: Dsolve::setNumThreads: must be at least 1\n";
+        return;
+    }
+    numThreads_ = x;
+    buildBatches();
+}
+
+unsigned int Dsolve::getNumThreads() const
+{
+    return numThreads_;
+}
+
+unsigned int Dsolve::getNumBatches() const
+{
+    return batches_.size();
+}
+
 /////////////////////////////////////////////////////////////
 // Solver building
 //////////////////////////////////////////////////////////////
@@ -855,6 +1082,49 @@ void Dsolve::build( double dt, const MeshCompt *m )
         }
         pools_[i].setOps( fops, diagVal );
     }
+    buildBatches();
+}
+
+void Dsolve::buildBatches()
+{
+    // Group the pools whose ops visit the same voxels in the same order.
+    vector< vector< unsigned int > > groups;
+    for ( unsigned int i = 0; i < numLocalPools_ && i < pools_.size(); ++i )
+    {
+        const vector< Triplet< double > >& ops = pools_[i].getOps();
+        if ( ops.size() == 0 )
+            continue;
+        bool found = false;
+        for ( auto g = groups.begin(); g != groups.end(); ++g )
+        {
+            if ( DiffPoolBatch::sameOps( pools_[ g->front() ].getOps(), ops ) )
+            {
+                g->push_back( i );
+                found = true;
+                break;
+            }
+        }
+        if ( !found )
+            groups.push_back( vector< unsigned int >( 1, i ) );
+    }
+
+    // Split each group so that every thread gets a share of it.
+    size_t numThreads = max( numThreads_, ( size_t )1 );
+    batches_.clear();
+    for ( auto g = groups.begin(); g != groups.end(); ++g )
+    {
+        size_t chunk = ( g->size() + numThreads - 1 ) / numThreads;
+        for ( size_t j = 0; j < g->size(); j += chunk )
+        {
+            vector< unsigned int > sub( g->begin() + j,
+                    g->begin() + min( j + chunk, g->size() ) );
+            batches_.push_back( DiffPoolBatch( sub, pools_ ) );
+        }
+    }
+
+    intervals_.clear();
+    moose::splitIntervalInNParts( batches_.size(),
+            min( numThreads, batches_.size() ), intervals_ );
 }
 
 /**
@@ -1083,6 +1353,7 @@ void Dsolve::innerBuildMeshJunctions( ObjId self, ObjId other, bool selfIsMembra
 
     // printJunction( self, other, jn );
     dself->junctions_.push_back( jn );
+    dself->isJunctionPartsDirty_ = true;
 }
 
 /////////////////////////////////////////////////////////////
@@ -1239,6 +1510,7 @@ void Dsolve::setNumVarTotPools( unsigned int var, unsigned int tot )
         // pools_[i].setId( reversePoolMap_[i] );
         // pools_[i].setParent( me );
     }
+    buildBatches();
 }
 
 void Dsolve::setNumPools( unsigned int numVarPoolSpecies )
@@ -1255,6 +1527,7 @@ void Dsolve::setNumPools( unsigned int numVarPoolSpecies )
         // pools_[i].setId( reversePoolMap_[i] );
         // pools_[i].setParent( me );
     }
+    buildBatches();
 }
 
 unsigned int Dsolve::getNumPools() const
@@ -1299,6 +1572,29 @@ void Dsolve::setPrev()
     }
 }
 
+void Dsolve::saveState( ostream& os ) const
+{
+    checkpoint::writeValue< unsigned int >( os, pools_.size() );
+    for ( auto i = pools_.cbegin(); i != pools_.cend(); ++i )
+        checkpoint::writeVec( os, i->getNvec() );
+}
+
+bool Dsolve::restoreState( istream& is )
+{
+    unsigned int numPools = checkpoint::readValue< unsigned int >( is );
+    if ( numPools != pools_.size() )
+        return false;
+    for ( auto i = pools_.begin(); i != pools_.end(); ++i )
+    {
+        vector< double > n = checkpoint::readVec< double >( is );
+        if ( !is || n.size() != i->getNvec().size() )
+            return false;
+        i->setNvec( n );
+        i->setPrevVec();
+    }
+    return true;
+}
+
 void Dsolve::setBlock( const vector< double >& values )
 {
     unsigned int startVoxel = static_cast<unsigned int>(values[0]);
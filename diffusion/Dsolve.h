@@ -47,6 +47,10 @@ public:
     string getPath( const Eref& e ) const;
 
     unsigned int getNumVoxels() const;
+    void setNumThreads( unsigned int x );
+    unsigned int getNumThreads() const;
+    /// Number of pool batches advanced together, see DiffPoolBatch.
+    unsigned int getNumBatches() const;
     /// Inherited virtual.
     void setNumAllVoxels( unsigned int numVoxels );
 
@@ -69,6 +73,7 @@ public:
 
     //////////////////////////////////////////////////////////////////
     void updateJunctions( double dt );
+    void setJunctionThreads( unsigned int numThreads );
 
     /**
      * Builds junctions between Dsolves handling NeuroMesh, SpineMesh,
@@ -123,6 +128,18 @@ public:
     /* Multithreaded version */
     void calcJunction_chunk( const size_t begin, const size_t end, double dt );
 
+    /**
+     * Splits the voxel junctions of all the junctions_ into one set per
+     * thread, such that no two sets touch the same voxel on either
+     * side. Voxels linked through junctions, such as a dendrite voxel
+     * with several spines, stay in the same set. The sets are then
+     * independent and can be computed concurrently, with the same
+     * result as the serial calculation.
+     */
+    void partitionJunctions();
+    /// Computes all the junctions of one of the junctionParts_.
+    size_t calcJunctionPart( size_t part, double dt );
+
     //////////////////////////////////////////////////////////////////
     // Inherited virtual funcs from KsolveBase
     //////////////////////////////////////////////////////////////////
@@ -148,6 +165,10 @@ public:
     void setBlock( const vector< double >& values );
     void setPrev();
 
+    /// Checkpoints the pool numbers in all voxels.
+    void saveState( ostream& os ) const;
+    bool restoreState( istream& is );
+
     // This one isn't used in Dsolve, but is defined as a dummy.
     void setupCrossSolverReacs(
         const map< Id, vector< Id > >& xr, Id otherStoich );
@@ -180,6 +201,13 @@ public:
      * Called during the setStoich function.
      */
     void build( double dt, const MeshCompt* m );
+    /**
+     * Groups the diffusing pools into DiffPoolBatches, and the batches
+     * into one chunk per thread. Called at the end of build, and when
+     * numThreads changes.
+     */
+    void buildBatches();
+    size_t advanceBatchChunk( size_t begin, size_t end );
     void rebuildPools();
     void calcJnDiff( const DiffJunction& jn, Dsolve* other, double dt );
     void calcJnXfer( const DiffJunction& jn,
@@ -214,6 +242,12 @@ private:
 
     /// Internal vector, one for each pool species managed by Dsolve.
     vector< DiffPoolVec > pools_;
+    /// Diffusing pools, grouped to be advanced together.
+    vector< DiffPoolBatch > batches_;
+    /// Number of threads to advance the batches on.
+    size_t numThreads_;
+    /// Range [begin, end) of batches_ handled by each thread.
+    vector< pair< size_t, size_t > > intervals_;
     /// Internal vector, one for each ConcChan managed by Dsolve.
     vector< ConcChanInfo > channels_;
 
@@ -229,6 +263,19 @@ private:
      * numerical integration for flux between the Dsolves.
      */
     vector< DiffJunction > junctions_;
+
+    /// Number of threads for updateJunctions, set by the reac solver.
+    unsigned int junctionThreads_;
+
+    /**
+     * Copies of junctions_, each holding a subset of the VoxelJunctions,
+     * one vector for each thread. Empty when the junctions are computed
+     * serially.
+     */
+    vector< vector< DiffJunction > > junctionParts_;
+
+    /// True when junctionParts_ must be rebuilt from junctions_.
+    bool isJunctionPartsDirty_;
 };
 
 
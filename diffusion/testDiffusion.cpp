@@ -22,6 +22,8 @@ using namespace std;
 #include "../basecode/header.h"
 #include "../basecode/SparseMatrix.h"
 #include "FastMatrixElim.h"
+#include "DiffPoolVec.h"
+#include "DiffPoolBatch.h"
 #include "../shell/Shell.h"
 
 
@@ -932,8 +934,84 @@ void testCalcJunction()
     cout << "." << flush;
 }
 
+/**
+ * Checks that a DiffPoolBatch gives the same answer as advancing each of
+ * its DiffPoolVecs on its own, on a branched tree.
+ */
+void testDiffPoolBatch()
+{
+    //          0
+    //          |
+    //          1
+    //         / \
+    //        2   5
+    //       / \   \
+    //      3   4   6
+    const unsigned int numVoxels = 7;
+    static unsigned int parents[] = { ~0U, 0, 1, 2, 2, 1, 5 };
+    vector< unsigned int > parentVoxel( parents, parents + numVoxels );
+    vector< double > volume( numVoxels, 1e-18 );
+    vector< double > area( numVoxels, 1e-12 );
+    vector< double > length( numVoxels, 1e-6 );
+    static double diffConst[] = { 1e-12, 3e-12, 0.5e-12, 0.0 };
+    const unsigned int numPools = 4;
+    const double dt = 0.01;
+
+    vector< DiffPoolVec > pools( numPools );
+    for ( unsigned int i = 0; i < numPools; ++i )
+    {
+        vector< unsigned int > diagIndex;
+        vector< double > diagVal;
+        vector< Triplet< double > > fops;
+        FastMatrixElim elim( numVoxels, numVoxels );
+        if ( elim.buildForDiffusion( parentVoxel, volume, area, length,
+                                     diffConst[i], 0.0, dt ) )
+        {
+            vector< unsigned int > lookupOldRowsFromNew;
+            elim.hinesReorder( parentVoxel, lookupOldRowsFromNew );
+            elim.buildForwardElim( diagIndex, fops );
+            elim.buildBackwardSub( diagIndex, fops, diagVal );
+            elim.opsReorder( lookupOldRowsFromNew, fops, diagVal );
+        }
+        pools[i].setNumVoxels( numVoxels );
+        pools[i].setOps( fops, diagVal );
+        vector< double > n( numVoxels, 0.0 );
+        n[ ( 3 * i ) % numVoxels ] = 1.0 + i;
+        pools[i].setNvec( n );
+    }
+    assert( DiffPoolBatch::sameOps( pools[0].getOps(), pools[1].getOps() ) );
+    assert( DiffPoolBatch::sameOps( pools[0].getOps(), pools[2].getOps() ) );
+    assert( !DiffPoolBatch::sameOps( pools[0].getOps(), pools[3].getOps() ) );
+
+    vector< DiffPoolVec > expected = pools;
+    vector< unsigned int > poolIndex;
+    poolIndex.push_back( 0 );
+    poolIndex.push_back( 1 );
+    poolIndex.push_back( 2 );
+    DiffPoolBatch batch( poolIndex, pools );
+    assert( batch.getNumPools() == 3 );
+    for ( unsigned int t = 0; t < 10; ++t )
+    {
+        for ( unsigned int i = 0; i < numPools; ++i )
+            expected[i].advance( dt );
+        batch.advance( pools );
+    }
+    for ( unsigned int i = 0; i < 3; ++i )
+    {
+        double tot = 0.0;
+        for ( unsigned int j = 0; j < numVoxels; ++j )
+        {
+            assert( doubleEq( pools[i].getN( j ), expected[i].getN( j ) ) );
+            tot += pools[i].getN( j );
+        }
+        assert( doubleEq( tot, 1.0 + i ) );
+    }
+    cout << "." << flush;
+}
+
 void testDiffusion()
 {
+    testDiffPoolBatch();
     testSorting();
     testFastMatrixElim();
     testSetDiffusionAndTransport();
@@ -20,6 +20,7 @@
 #include "../biophysics/CaConcBase.h"
 #include "../biophysics/ChanBase.h"
 #include "ZombieCaConc.h"
+#include "../shell/Checkpoint.h"
 using namespace moose;
 //~ #include "ZombieCompartment.h"
 //~ #include "ZombieCaConc.h"
@@ -43,6 +44,60 @@ HSolveActive::HSolveActive()
 // Solving differential equations
 //////////////////////////////////////////////////////////////////////
 void HSolveActive::step( ProcPtr info )
+{
+    integrate( info );
+    deliver( info );
+}
+
+void HSolveActive::saveState( ostream& os ) const
+{
+    vector< double > caConc( caConc_.size() );
+    for ( unsigned int i = 0; i < caConc_.size(); ++i )
+        caConc[ i ] = caConc_[ i ].c_;
+
+    checkpoint::writeVec( os, V_ );
+    checkpoint::writeVec( os, state_ );
+    checkpoint::writeVec( os, ca_ );
+    checkpoint::writeVec( os, caActivation_ );
+    checkpoint::writeVec( os, caConc );
+    checkpoint::writeVec( os, externalCurrent_ );
+    checkpoint::writeVec( os, prevExtCurr_ );
+}
+
+bool HSolveActive::restoreState( istream& is )
+{
+    vector< double > V = checkpoint::readVec< double >( is );
+    vector< double > state = checkpoint::readVec< double >( is );
+    vector< double > ca = checkpoint::readVec< double >( is );
+    vector< double > caActivation = checkpoint::readVec< double >( is );
+    vector< double > caConc = checkpoint::readVec< double >( is );
+    vector< double > externalCurrent = checkpoint::readVec< double >( is );
+    vector< double > prevExtCurr = checkpoint::readVec< double >( is );
+    if ( !is || V.size() != V_.size() || state.size() != state_.size() ||
+            ca.size() != ca_.size() ||
+            caActivation.size() != caActivation_.size() ||
+            caConc.size() != caConc_.size() ||
+            externalCurrent.size() != externalCurrent_.size() ||
+            prevExtCurr.size() != prevExtCurr_.size() )
+        return false;
+
+    V_ = V;
+    state_ = state;
+    ca_ = ca;
+    caActivation_ = caActivation;
+    for ( unsigned int i = 0; i < caConc_.size(); ++i )
+        caConc_[ i ].c_ = caConc[ i ];
+    externalCurrent_ = externalCurrent;
+    prevExtCurr_ = prevExtCurr;
+    return true;
+}
+
+/**
+ * Advances the cell by one time-step without sending out any messages. This
+ * touches only the solver's own data, so that the integration of different
+ * cells can proceed concurrently (see HSolveNet).
+ */
+void HSolveActive::integrate( ProcPtr info )
 {
     if ( nCompt_ <= 0 )
         return;
@@ -59,6 +114,18 @@ void HSolveActive::step( ProcPtr info )
     HSolvePassive::backwardSubstitute();
     advanceCalcium();
     advanceSynChans( info );
+}
+
+/**
+ * Sends out the values and spikes computed in the last call to integrate,
+ * and clears the external currents accumulated during the step. Message
+ * sends are not thread-safe, so this must be called serially.
+ */
+void HSolveActive::deliver( ProcPtr info )
+{
+    if ( nCompt_ <= 0 )
+        return;
+
     sendValues( info );
     sendSpikes( info );
     prevExtCurr_ = externalCurrent_;
@@ -35,8 +35,15 @@ public:
 
     void setup( Id seed, double dt );
     void step( ProcPtr info );			///< Equivalent to process
+    void integrate( ProcPtr info );		///< Numerics only, no messages
+    void deliver( ProcPtr info );		///< Sends values and spikes
     void reinit( ProcPtr info );
 
+    /// Writes membrane potentials, gate states and calcium to a checkpoint.
+    void saveState( ostream& os ) const;
+    /// Reads back what saveState wrote. False if it does not fit the cell.
+    bool restoreState( istream& is );
+
 protected:
     /**
      * Solver parameters: exposed as fields in MOOSE
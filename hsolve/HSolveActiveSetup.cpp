@@ -488,6 +488,10 @@ void HSolveActive::createLookupTables()
         vTable_.addColumns( ig, A, B );
     }
 
+    // Cells copied from one prototype have identical tables: keep one copy.
+    caTable_.share();
+    vTable_.share();
+
     column_.reserve( gateId_.size() );
     for ( unsigned int ig = 0; ig < gateId_.size(); ++ig )
     {
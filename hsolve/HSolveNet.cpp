@@ -0,0 +1,327 @@
+/**********************************************************************
+** This program is part of 'MOOSE', the
+** Messaging Object Oriented Simulation Environment.
+**   copyright (C) 2003-2007 Upinder S. Bhalla, Niraj Dudani and NCBS
+** It is made available under the terms of the
+** GNU Lesser General Public License version 2.1
+** See the file COPYING.LIB for the full notice.
+**********************************************************************/
+
+#include "../basecode/header.h"
+#include "../basecode/global.h"
+#include "../basecode/ElementValueFinfo.h"
+#include "../utility/utility.h"
+#include "../shell/Wildcard.h"
+#include "../scheduling/Clock.h"
+#include "HSolveStruct.h"
+#include "HinesMatrix.h"
+#include "HSolvePassive.h"
+#include "RateLookup.h"
+#include "HSolveActive.h"
+#include "HSolve.h"
+#include "HSolveNet.h"
+
+#include <chrono>
+#include <future>
+using namespace std::chrono;
+
+const Cinfo* HSolveNet::initCinfo()
+{
+    static DestFinfo process(
+        "process",
+        "Handles 'process' call: Advances all the cells by one time-step.",
+        new ProcOpFunc< HSolveNet >( &HSolveNet::process )
+    );
+
+    static DestFinfo reinit(
+        "reinit",
+        "Handles 'reinit' call: Reinitializes all the cells.",
+        new ProcOpFunc< HSolveNet >( &HSolveNet::reinit )
+    );
+
+    static Finfo* processShared[] =
+    {
+        &process,
+        &reinit
+    };
+
+    static SharedFinfo proc(
+        "proc",
+        "Handles 'reinit' and 'process' calls from a clock.",
+        processShared,
+        sizeof( processShared ) / sizeof( Finfo* )
+    );
+
+    static ElementValueFinfo< HSolveNet, string > path(
+        "path",
+        "Wildcard path to the HSolve objects which are to be advanced "
+        "together, e.g. '/network/##[TYPE=HSolve]'. Each HSolve must "
+        "already have its target set. Once taken over, the HSolves are "
+        "removed from the clock and are advanced only by this object.",
+        &HSolveNet::setPath,
+        &HSolveNet::getPath
+    );
+
+    static ValueFinfo< HSolveNet, unsigned int > numThreads(
+        "numThreads",
+        "Number of threads over which the cells are distributed. "
+        "Defaults to the environment variable MOOSE_NUM_THREADS, or 1.",
+        &HSolveNet::setNumThreads,
+        &HSolveNet::getNumThreads
+    );
+
+    static ReadOnlyValueFinfo< HSolveNet, unsigned int > numCells(
+        "numCells",
+        "Number of cells (HSolve objects) handled by this object.",
+        &HSolveNet::getNumCells
+    );
+
+    static ReadOnlyValueFinfo< HSolveNet, unsigned int > numCompartments(
+        "numCompartments",
+        "Total number of compartments over all the cells.",
+        &HSolveNet::getNumCompartments
+    );
+
+    static Finfo* hsolveNetFinfos[] =
+    {
+        &path,              // Value
+        &numThreads,        // Value
+        &numCells,          // ReadOnlyValue
+        &numCompartments,   // ReadOnlyValue
+        &proc,              // Shared
+    };
+
+    static string doc[] =
+    {
+        "Name",             "HSolveNet",
+        "Author",           "MOOSE team, NCBS",
+        "Description",      "HSolveNet: Advances a network of neurons, each "
+        "handled by its own HSolve, in parallel over several threads. "
+        "Spikes and other outgoing values are sent at the end of each "
+        "time-step.",
+    };
+
+    static Dinfo< HSolveNet > dinfo;
+    static Cinfo hsolveNetCinfo(
+        "HSolveNet",
+        Neutral::initCinfo(),
+        hsolveNetFinfos,
+        sizeof( hsolveNetFinfos ) / sizeof( Finfo* ),
+        &dinfo,
+        doc,
+        sizeof(doc)/sizeof(string)
+    );
+
+    return &hsolveNetCinfo;
+}
+
+static const Cinfo* hsolveNetCinfo = HSolveNet::initCinfo();
+
+HSolveNet::HSolveNet()
+    : numThreads_( 1 )
+{
+    numThreads_ = moose::getEnvInt( "MOOSE_NUM_THREADS", 1 );
+}
+
+HSolveNet::~HSolveNet()
+{
+    // The cells are simulated again on their own.
+    releaseSolvers( vector< Id >() );
+}
+
+///////////////////////////////////////////////////
+// Dest function definitions
+///////////////////////////////////////////////////
+
+void HSolveNet::process( const Eref& e, ProcPtr p )
+{
+    high_resolution_clock::time_point t0 = high_resolution_clock::now();
+
+    if ( intervals_.size() <= 1 )
+    {
+        for ( vector< HSolve* >::iterator i = solver_.begin(); i != solver_.end(); ++i )
+            ( *i )->integrate( p );
+    }
+    else
+    {
+        vector< std::future< size_t > > vecFutures;
+        for ( auto interval : intervals_ )
+        {
+            vecFutures.push_back(
+                std::async( std::launch::async
+                    , &HSolveNet::integrateChunk
+                    , this
+                    , interval.first
+                    , interval.second, p
+                    )
+                );
+        }
+        size_t tot = 0;
+        for ( auto& v : vecFutures )
+            tot += v.get();
+        assert( tot == solver_.size() );
+    }
+
+    // Messages are not thread-safe, so the spikes and values of all the
+    // cells go out here, at the step boundary.
+    for ( vector< HSolve* >::iterator i = solver_.begin(); i != solver_.end(); ++i )
+        ( *i )->deliver( p );
+
+    high_resolution_clock::time_point t1 = high_resolution_clock::now();
+    addSolverProf( "HSolveNet", duration_cast<duration<double>>(t1 - t0).count(), 1 );
+}
+
+size_t HSolveNet::integrateChunk( size_t begin, size_t end, ProcPtr p )
+{
+    size_t tot = 0;
+    for ( size_t i = begin; i < std::min( end, solver_.size() ); ++i )
+    {
+        solver_[ i ]->integrate( p );
+        tot += 1;
+    }
+    return tot;
+}
+
+void HSolveNet::reinit( const Eref& e, ProcPtr p )
+{
+    findSolvers();
+    for ( unsigned int i = 0; i < solver_.size(); ++i )
+        solver_[ i ]->reinit( solverId_[ i ].eref(), p );
+
+    balanceLoad();
+    if ( intervals_.size() > 1 )
+        cout << "Info: Multi-threaded HSolveNet (" << intervals_.size()
+             << " threads, " << solver_.size() << " cells)." << endl;
+}
+
+///////////////////////////////////////////////////
+// Field function definitions
+///////////////////////////////////////////////////
+
+void HSolveNet::setPath( const Eref& e, string path )
+{
+    vector< ObjId > elist;
+    wildcardFind( path, elist );
+
+    vector< Id > claimed;
+    for ( vector< ObjId >::iterator i = elist.begin(); i != elist.end(); ++i )
+        if ( i->element()->cinfo()->isA( "HSolve" ) )
+            claimed.push_back( i->id );
+
+    // Cells dropped from the path go back to the clock, so that they are
+    // still simulated.
+    releaseSolvers( claimed );
+    solverId_ = claimed;
+    // From now on the cells are advanced by this object, not the clock.
+    for ( vector< Id >::iterator i = solverId_.begin(); i != solverId_.end(); ++i )
+        i->element()->setTick( -1 );
+
+    if ( solverId_.empty() )
+        cerr << "Warning: HSolveNet::setPath(): No HSolve found at '"
+             << path << "'.\n";
+
+    path_ = path;
+    findSolvers();
+    balanceLoad();
+}
+
+string HSolveNet::getPath( const Eref& e ) const
+{
+    return path_;
+}
+
+void HSolveNet::setNumThreads( unsigned int x )
+{
+    if ( x == 0 )
+    {
+        cerr << "Error: HSolveNet: 'numThreads' must be at least 1.\n";
+        return;
+    }
+    numThreads_ = x;
+    balanceLoad();
+}
+
+unsigned int HSolveNet::getNumThreads() const
+{
+    return numThreads_;
+}
+
+unsigned int HSolveNet::getNumCells() const
+{
+    return solver_.size();
+}
+
+unsigned int HSolveNet::getNumCompartments() const
+{
+    unsigned int ret = 0;
+    for ( vector< HSolve* >::const_iterator i = solver_.begin(); i != solver_.end(); ++i )
+        ret += ( *i )->getSize();
+    return ret;
+}
+
+///////////////////////////////////////////////////
+// Utility functions
+///////////////////////////////////////////////////
+
+void HSolveNet::findSolvers()
+{
+    vector< Id > alive;
+    solver_.clear();
+    for ( vector< Id >::iterator i = solverId_.begin(); i != solverId_.end(); ++i )
+    {
+        if ( i->element() == 0 )
+            continue;
+        alive.push_back( *i );
+        solver_.push_back( reinterpret_cast< HSolve* >( i->eref().data() ) );
+    }
+    solverId_ = alive;
+}
+
+void HSolveNet::releaseSolvers( const vector< Id >& keep )
+{
+    // At exit the clock may already be gone, and with it the ticks.
+    Element* clock = Id( 1 ).element();
+    if ( clock == 0 || clock->isDoomed() )
+        return;
+    int tick = Clock::lookupDefaultTick( "HSolve" );
+    set< Id > kept( keep.begin(), keep.end() );
+    for ( vector< Id >::iterator i = solverId_.begin(); i != solverId_.end(); ++i )
+    {
+        Element* e = i->element();
+        // Skip solvers being deleted, and those that were given another
+        // tick since they were taken over.
+        if ( e == 0 || e->isDoomed() || e->getTick() != -1 )
+            continue;
+        if ( kept.find( *i ) == kept.end() )
+            e->setTick( tick );
+    }
+}
+
+void HSolveNet::balanceLoad()
+{
+    intervals_.clear();
+    size_t nThreads = std::min( numThreads_, solver_.size() );
+    if ( nThreads <= 1 )
+    {
+        intervals_.push_back( { 0, solver_.size() } );
+        return;
+    }
+
+    // Cells can differ a lot in size, so split on the running total of
+    // compartments rather than on the number of cells.
+    double total = getNumCompartments();
+    double sum = 0.0;
+    size_t begin = 0;
+    for ( size_t i = 0; i < solver_.size(); ++i )
+    {
+        sum += solver_[ i ]->getSize();
+        if ( intervals_.size() + 1 < nThreads &&
+                sum >= total * ( intervals_.size() + 1 ) / nThreads )
+        {
+            intervals_.push_back( { begin, i + 1 } );
+            begin = i + 1;
+        }
+    }
+    if ( begin < solver_.size() )
+        intervals_.push_back( { begin, solver_.size() } );
+}
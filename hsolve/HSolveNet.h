@@ -0,0 +1,69 @@
+/**********************************************************************
+** This program is part of 'MOOSE', the
+** Messaging Object Oriented Simulation Environment.
+**   copyright (C) 2003-2007 Upinder S. Bhalla, Niraj Dudani and NCBS
+** It is made available under the terms of the
+** GNU Lesser General Public License version 2.1
+** See the file COPYING.LIB for the full notice.
+**********************************************************************/
+
+#ifndef _HSOLVE_NET_H
+#define _HSOLVE_NET_H
+
+class HSolve;
+
+/**
+ * HSolveNet advances a network of neurons, each of which has already been
+ * taken over by its own HSolve. The per-cell solvers are removed from the
+ * clock, and HSolveNet integrates them concurrently on a number of threads
+ * every time-step. Values and spikes are then sent out serially from all the
+ * cells at the end of the step, so that spike exchange goes through the
+ * usual SpikeGen messages.
+ */
+class HSolveNet
+{
+public:
+    HSolveNet();
+    ~HSolveNet();
+
+    void process( const Eref& e, ProcPtr p );
+    void reinit( const Eref& e, ProcPtr p );
+
+    void setPath( const Eref& e, string path );
+    string getPath( const Eref& e ) const;
+    /**< Wildcard path to the HSolve objects to be advanced */
+
+    void setNumThreads( unsigned int x );
+    unsigned int getNumThreads() const;
+
+    unsigned int getNumCells() const;
+    unsigned int getNumCompartments() const;
+
+    static const Cinfo* initCinfo();
+
+private:
+    /// Looks up the HSolve data pointers from solverId_.
+    void findSolvers();
+
+    /// Puts the HSolves in solverId_ that are not in keep back on the clock.
+    void releaseSolvers( const vector< Id >& keep );
+
+    /// Splits the cells into numThreads_ chunks of roughly equal size.
+    void balanceLoad();
+
+    size_t integrateChunk( size_t begin, size_t end, ProcPtr p );
+
+    string path_;
+    vector< Id > solverId_;
+    vector< HSolve* > solver_;
+
+    size_t numThreads_;
+
+    /**
+     * Intervals [begin, end) of solver_ handled by each thread. These are
+     * chosen so that each thread gets about the same number of compartments.
+     */
+    vector< pair< size_t, size_t > > intervals_;
+};
+
+#endif // _HSOLVE_NET_H
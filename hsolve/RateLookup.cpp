@@ -8,12 +8,46 @@
 **********************************************************************/
 
 #include <vector>
+#include <map>
+#include <mutex>
+#include <functional>
 #include <iostream>
+#include <cassert>
 
 using namespace std;
 
 #include "RateLookup.h"
 
+namespace {
+	/**
+	 * Process-wide registry of the tables handed out by LookupTable::share,
+	 * keyed by a hash of their contents. Holds weak references only, so a
+	 * table goes away when the last solver using it is deleted.
+	 */
+	typedef map< size_t, vector< weak_ptr< vector< double > > > > TableRegistry;
+
+	TableRegistry& tableRegistry()
+	{
+		static TableRegistry registry;
+		return registry;
+	}
+
+	mutex& tableRegistryMutex()
+	{
+		static mutex m;
+		return m;
+	}
+
+	size_t hashTable( const vector< double >& table )
+	{
+		size_t seed = table.size();
+		hash< double > hasher;
+		for ( vector< double >::const_iterator i = table.begin(); i != table.end(); ++i )
+			seed ^= hasher( *i ) + 0x9e3779b9 + ( seed << 6 ) + ( seed >> 2 );
+		return seed;
+	}
+}
+
 LookupTable::LookupTable(
 	double min, double max, unsigned int nDivs, unsigned int nSpecies )
 {
@@ -27,7 +61,7 @@ LookupTable::LookupTable(
 	nColumns_ = 2 * nSpecies;
 
 	//~ interpolate_.resize( nSpecies );
-	table_.resize( nPts_ * nColumns_ );
+	table_ = make_shared< vector< double > >( nPts_ * nColumns_ );
 }
 
 void LookupTable::addColumns(
@@ -37,9 +71,13 @@ void LookupTable::addColumns(
 	//~ const vector< double >& C2,
 	//~ bool interpolate )
 {
+	// Never write into storage that other tables are reading from.
+	if ( table_.use_count() > 1 )
+		table_ = make_shared< vector< double > >( *table_ );
+
 	vector< double >::const_iterator ic1 = C1.begin();
 	vector< double >::const_iterator ic2 = C2.begin();
-	vector< double >::iterator iTable = table_.begin() + 2 * species;
+	vector< double >::iterator iTable = table_->begin() + 2 * species;
 	// Loop until last but one point
 	for ( unsigned int igrid = 0; igrid < nPts_ - 1 ; ++igrid ) {
 		*( iTable )     = *ic1;
@@ -63,7 +101,7 @@ void LookupTable::column( unsigned int species, LookupColumn& column )
 
 void LookupTable::row( double x, LookupRow& row )
 {
-    if(table_.empty()) {
+    if( empty() ) {
 	cerr << "LookupTable::row : Error: table is empty" << endl;
         return;
     }
@@ -76,7 +114,7 @@ void LookupTable::row( double x, LookupRow& row )
 	unsigned int integer = ( unsigned int )( div );
 
 	row.fraction = div - integer;
-	row.row = &( table_.front() ) + integer * nColumns_;
+	row.row = table_->data() + integer * nColumns_;
 }
 
 void LookupTable::lookup(
@@ -107,3 +145,88 @@ void LookupTable::lookup(
 	b = *( bp + 1 );
 	C2 = a + ( b - a ) * row.fraction;
 }
+
+void LookupTable::share()
+{
+	if ( empty() )
+		return;
+
+	size_t key = hashTable( *table_ );
+	lock_guard< mutex > lock( tableRegistryMutex() );
+	vector< weak_ptr< vector< double > > >& bucket = tableRegistry()[ key ];
+
+	vector< weak_ptr< vector< double > > >::iterator i = bucket.begin();
+	while ( i != bucket.end() ) {
+		shared_ptr< vector< double > > other = i->lock();
+		if ( !other ) {
+			i = bucket.erase( i );
+			continue;
+		}
+		if ( other == table_ )
+			return;
+		if ( *other == *table_ ) {
+			table_ = other;
+			return;
+		}
+		++i;
+	}
+	bucket.push_back( table_ );
+}
+
+long LookupTable::shareCount() const
+{
+	return table_.use_count();
+}
+
+unsigned int LookupTable::numSharedTables()
+{
+	lock_guard< mutex > lock( tableRegistryMutex() );
+	unsigned int ret = 0;
+	TableRegistry& registry = tableRegistry();
+	for ( TableRegistry::iterator i = registry.begin(); i != registry.end(); ++i )
+		for ( unsigned int j = 0; j < i->second.size(); ++j )
+			if ( !i->second[ j ].expired() )
+				++ret;
+	return ret;
+}
+
+#ifdef DO_UNIT_TESTS
+void testRateLookup()
+{
+	vector< double > C1( 11 ), C2( 11 );
+	for ( unsigned int i = 0; i < C1.size(); ++i ) {
+		C1[ i ] = i;
+		C2[ i ] = 2.0 * i + 1.0;
+	}
+
+	LookupTable a( 0.0, 10.0, 10, 1 );
+	a.addColumns( 0, C1, C2 );
+	LookupTable b( 0.0, 10.0, 10, 1 );
+	b.addColumns( 0, C1, C2 );
+	unsigned int numBefore = LookupTable::numSharedTables();
+	a.share();
+	b.share();
+	assert( a.shareCount() == 2 );
+	assert( b.shareCount() == 2 );
+	assert( LookupTable::numSharedTables() == numBefore + 1 );
+
+	LookupColumn column;
+	LookupRow row;
+	double x1, x2;
+	b.column( 0, column );
+	b.row( 4.5, row );
+	b.lookup( column, row, x1, x2 );
+	assert( x1 == 4.5 );
+	assert( x2 == 10.0 );
+
+	// Writing into a shared table must not disturb the other user.
+	C1.assign( C1.size(), 0.0 );
+	b.addColumns( 0, C1, C2 );
+	assert( a.shareCount() == 1 );
+	a.column( 0, column );
+	a.row( 4.5, row );
+	a.lookup( column, row, x1, x2 );
+	assert( x1 == 4.5 );
+	cout << "." << flush;
+}
+#endif // DO_UNIT_TESTS
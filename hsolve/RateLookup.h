@@ -10,6 +10,8 @@
 #ifndef _RATE_LOOKUP_H
 #define _RATE_LOOKUP_H
 
+#include <memory>
+
 struct LookupRow
 {
 	double* row;		///< Pointer to the first column on a row
@@ -63,11 +65,29 @@ public:
 		double& C2 );
 
     bool empty() const {
-	return table_.empty();
+	return !table_ || table_->empty();
     }
+
+	/**
+	 * Makes this table use the storage of an identical table that is
+	 * already in use elsewhere in the process, if there is one; else
+	 * registers this table so that later identical tables can use it.
+	 * Solvers set up on copies of a cell prototype build identical
+	 * tables, so this way only one copy is kept in memory. Call once all
+	 * the columns have been added. Shared storage is read-only: a later
+	 * addColumns makes a private copy first.
+	 */
+	void share();
+
+	/// Number of LookupTables using this table's storage, including itself.
+	long shareCount() const;
+
+	/// Number of distinct shared tables currently alive in the process.
+	static unsigned int numSharedTables();
+
 private:
 	//~ vector< bool >       interpolate_;
-	vector< double >     table_;		///< Flattened table
+	shared_ptr< vector< double > > table_;	///< Flattened table
 	double               min_;			///< min of the voltage / caConc range
 	double               max_;			///< max of the voltage / caConc range
 	unsigned int         nPts_;			///< Number of rows in the table.
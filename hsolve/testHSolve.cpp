@@ -21,6 +21,7 @@ using namespace std;
 extern void testHinesMatrix(); // Defined in HinesMatrix.cpp
 extern void testHSolvePassive(); // Defined in HSolvePassive.cpp
 extern void testHSolveUtils(); // Defined in HSolveUtils.cpp
+extern void testRateLookup(); // Defined in RateLookup.cpp
 extern void runRallpackBenchmarks();                 /* Defined in RallPacks.cpp */
 
 void testHSolve()
@@ -28,6 +29,7 @@ void testHSolve()
 	testHSolveUtils();
 	testHinesMatrix();
 	testHSolvePassive();
+	testRateLookup();
 }
 
 //////////////////////////////////////////////////////////////////////////////
@@ -11,6 +11,8 @@
 
 #include <iomanip>
 #include <fstream>
+#include <future>
+#include <thread>
 #include "../basecode/header.h"
 class Stoich;
 #include "Reac.h"
@@ -21,6 +23,7 @@ class Stoich;
 #include "../shell/Wildcard.h"
 
 #include "../utility/strutil.h"
+#include "../utility/utility.h"
 
 #include "ReadKkit.h"
 
@@ -29,16 +32,59 @@ static const double KKIT_NA = 6.0e23; // Causes all sorts of conversion fun
 
 unsigned int chopLine( const string& line, vector< string >& ret )
 {
+    static const char* ws = " \t\n\v\f\r";
     ret.resize( 0 );
-    stringstream ss( line );
-    string arg;
-    while ( ss >> arg )
+    string::size_type end = 0;
+    while ( true )
     {
-        ret.push_back( moose::trim(arg, "\"") );
+        string::size_type start = line.find_first_not_of( ws, end );
+        if ( start == string::npos )
+            break;
+        end = line.find_first_of( ws, start );
+        ret.push_back( moose::trim(
+            line.substr( start, end == string::npos ? end : end - start ),
+            "\"" ) );
+        if ( end == string::npos )
+            break;
     }
     return ret.size();
 }
 
+/// Below this many statements the model is tokenized on one thread.
+static const size_t MIN_STATEMENTS_PER_THREAD = 2000;
+
+/**
+ * Splits each statement into its arguments. The statements are
+ * independent, so large files are split over threads.
+ */
+static void chopStatements( const vector< string >& lines,
+                            vector< vector< string > >& args )
+{
+    args.resize( lines.size() );
+    size_t numThreads = 1;
+    if ( lines.size() >= 2 * MIN_STATEMENTS_PER_THREAD )
+        numThreads = min< size_t >(
+            max( 1u, std::thread::hardware_concurrency() ),
+            lines.size() / MIN_STATEMENTS_PER_THREAD );
+    auto chop = [&]( size_t begin, size_t end ) {
+        for ( size_t i = begin; i < end; ++i )
+            chopLine( lines[i], args[i] );
+    };
+    if ( numThreads <= 1 )
+    {
+        chop( 0, lines.size() );
+        return;
+    }
+    vector< pair< size_t, size_t > > intervals;
+    moose::splitIntervalInNParts( lines.size(), numThreads, intervals );
+    vector< std::future< void > > jobs;
+    for ( const auto& iv : intervals )
+        jobs.push_back( std::async( std::launch::async, chop,
+                                    iv.first, iv.second ) );
+    for ( auto& j : jobs )
+        j.get();
+}
+
 string lower( const string& input )
 {
     string ret = input;
@@ -466,6 +512,27 @@ void ReadKkit::dumpPlots( const string& filename )
 }
 
 void ReadKkit::innerRead( ifstream& fin )
+{
+    // The file is read in two passes. The first assembles the statements
+    // of the model body, handling the header on the way since it only
+    // sets a few parameters. The statements are then tokenized, which
+    // is independent per statement, and last the model is built from
+    // them in file order.
+    vector< string > statements;
+    readStatements( fin, statements );
+
+    vector< vector< string > > args;
+    chopStatements( statements, args );
+    statements.clear();
+
+    parentIds_.clear();
+    for ( const auto& argv : args )
+        if ( !argv.empty() )
+            readData( argv );
+    parentIds_.clear();
+}
+
+void ReadKkit::readStatements( ifstream& fin, vector< string >& statements )
 {
     string line;
     string temp;
@@ -533,7 +600,7 @@ void ReadKkit::innerRead( ifstream& fin )
         }
 
         if ( parseMode == DATA )
-            readData( line );
+            statements.push_back( line );
         else if ( parseMode == INIT )
         {
             parseMode = readInit( line );
@@ -617,11 +684,8 @@ ReadKkit::ParseMode ReadKkit::readInit( const string& line )
 }
 
 
-void ReadKkit::readData( const string& line )
+void ReadKkit::readData( const vector< string >& argv )
 {
-    vector< string > argv;
-    chopLine( line, argv );
-
     if ( argv[0] == "simundump" )
         undump( argv );
     else if ( argv[0] == "addmsg" )
@@ -636,6 +700,17 @@ void ReadKkit::readData( const string& line )
         loadTab( argv );
 }
 
+Id ReadKkit::findParent( const string& head )
+{
+    auto i = parentIds_.find( head );
+    if ( i != parentIds_.end() )
+        return i->second;
+    Id pa = shell_->doFind( head ).id;
+    if ( pa != Id() )
+        parentIds_[ head ] = pa;
+    return pa;
+}
+
 string ReadKkit::pathTail( const string& path, string& head ) const
 {
     string::size_type pos = path.find_last_of( "/" );
@@ -807,7 +882,7 @@ Id ReadKkit::buildReac( const vector< string >& args )
     string head;
     string clean = cleanPath( args[2] );
     string tail = pathTail( clean, head );
-    Id pa = shell_->doFind( head ).id;
+    Id pa = findParent( head );
     assert( pa != Id() );
 
     double kf = atof( args[ reacMap_[ "kf" ] ].c_str() );
@@ -1021,7 +1096,7 @@ Id ReadKkit::buildEnz( const vector< string >& args )
     string head;
     string clean = cleanPath( args[2] );
     string tail = pathTail( clean, head );
-    Id pa = shell_->doFind( head ).id;
+    Id pa = findParent( head );
     assert ( pa != Id() );
 
     double k1 = atof( args[ enzMap_[ "k1" ] ].c_str() );
@@ -1134,7 +1209,7 @@ Id ReadKkit::buildGroup( const vector< string >& args )
 {
     string head;
     string tail = pathTail( cleanPath( args[2] ), head );
-    Id pa = shell_->doFind( head ).id;
+    Id pa = findParent( head );
     assert( pa != Id() );
     Id group = shell_->doCreate( "Neutral", pa, tail, 1 );
     assert( group != Id() );
@@ -1159,7 +1234,7 @@ Id ReadKkit::buildPool( const vector< string >& args )
     string head;
     string clean = cleanPath( args[2] );
     string tail = pathTail( clean, head );
-    Id pa = shell_->doFind( head ).id;
+    Id pa = findParent( head );
     assert( pa != Id() );
 
     // double nInit = atof( args[ poolMap_[ "nInit" ] ].c_str() );
@@ -1305,7 +1380,7 @@ Id ReadKkit::buildStim( const vector< string >& args )
     string head;
     string clean = cleanPath( args[2] );
     string tail = pathTail( clean, head );
-    Id pa = shell_->doFind( head ).id;
+    Id pa = findParent( head );
     assert( pa != Id() );
 
     double level1 = atof( args[ stimMap_[ "firstLevel" ] ].c_str() );
@@ -1340,7 +1415,7 @@ Id ReadKkit::buildChan( const vector< string >& args )
     string head;
     string clean = cleanPath( args[2] );
     string tail = pathTail( clean, head );
-    Id pa = shell_->doFind( head ).id;
+    Id pa = findParent( head );
     assert( pa != Id() );
 
     // cout << "Warning: Kchan not yet supported in MOOSE, creating dummy:\n" << "	" << clean << "\n";
@@ -1369,7 +1444,7 @@ Id ReadKkit::buildGraph( const vector< string >& args )
     string head;
     string tail = pathTail( cleanPath( args[2] ), head );
 
-    Id pa = shell_->doFind( head ).id;
+    Id pa = findParent( head );
     assert( pa != Id() );
     Id graph = shell_->doCreate( "Neutral", pa, tail, 1 );
     assert( graph != Id() );
@@ -1384,7 +1459,7 @@ Id ReadKkit::buildPlot( const vector< string >& args )
     string temp;
     string graph = pathTail( head, temp ); // Name of graph
 
-    Id pa = shell_->doFind( head ).id;
+    Id pa = findParent( head );
     assert( pa != Id() );
 
     Id plot = shell_->doCreate( "Table2", pa, tail, 1 );
@@ -1407,7 +1482,7 @@ Id ReadKkit::buildTable( const vector< string >& args )
     string clean = cleanPath( args[2] );
     string tail = pathTail( clean, head ); // Name of xtab
 
-    Id pa = shell_->doFind( head ).id;
+    Id pa = findParent( head );
     assert( pa != Id() );
     Id tab;
 
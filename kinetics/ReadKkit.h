@@ -54,10 +54,16 @@ public:
     //////////////////////////////////////////////////////////////////
 
     void innerRead( ifstream& fin );
+    /**
+     * First pass over the file: applies the header lines and collects
+     * the statements of the model body, with continuation lines joined
+     * and comments removed.
+     */
+    void readStatements( ifstream& fin, vector< string >& statements );
     ParseMode readInit( const string& line );
     Id read( const string& filename, const string& cellname,
              Id parent, const string& solverClass = "Stoich" );
-    void readData( const string& line );
+    void readData( const vector< string >& argv );
     void undump( const vector< string >& args );
 	int findCompartmentsFromAnnotation();
 
@@ -169,6 +175,13 @@ public:
      */
     string pathTail( const string& path, string& head ) const;
 
+    /**
+     * Finds the parent element at path head. Lookups are remembered
+     * while the model is being built, since most objects share their
+     * parent with many others.
+     */
+    Id findParent( const string& head );
+
     /**
      * Utility function. Cleans up path strings. In most cases, it
      * replaces things with underscores.
@@ -237,6 +250,7 @@ private:
     map< string, Id > tabIds_;
     map< string, Id > stimIds_;
     map< string, Id > chanIds_;
+    map< string, Id > parentIds_; /// Parents found while building.
 	vector< string > groupPaths_;
 
     /*
@@ -26,6 +26,7 @@
 #include "Stoich.h"
 #include "GssaVoxelPools.h"
 #include "Gsolve.h"
+#include "../shell/Checkpoint.h"
 
 #include <chrono>
 #include <algorithm>
@@ -1103,6 +1104,26 @@ void Gsolve::setBlock( const vector< double >& values )
     }
 }
 
+void Gsolve::saveState( ostream& os ) const
+{
+    checkpoint::writeString( os, rng_.getState() );
+    checkpoint::writeValue< unsigned int >( os, pools_.size() );
+    for ( auto i = pools_.cbegin(); i != pools_.cend(); ++i )
+        i->saveState( os );
+}
+
+bool Gsolve::restoreState( istream& is )
+{
+    rng_.setState( checkpoint::readString( is ) );
+    unsigned int numVoxels = checkpoint::readValue< unsigned int >( is );
+    if ( numVoxels != pools_.size() )
+        return false;
+    for ( auto i = pools_.begin(); i != pools_.end(); ++i )
+        if ( !i->restoreState( is, &sys_ ) )
+            return false;
+    return true;
+}
+
 //////////////////////////////////////////////////////////////////////////
 void Gsolve::updateVoxelVol( vector< double > vols )
 {
@@ -108,6 +108,10 @@ public:
     void getBlock( vector< double >& values ) const;
     void setBlock( const vector< double >& values );
 
+    /// Checkpoints the pool numbers, event times and RNGs of all voxels.
+    void saveState( ostream& os ) const;
+    bool restoreState( istream& is );
+
     /**
      * Rescale specified voxel rate term following rate constant change
      * or volume change. If index == ~0U then does all terms.
@@ -20,6 +20,7 @@
 #include "Stoich.h"
 #include "GssaSystem.h"
 #include "GssaVoxelPools.h"
+#include "../shell/Checkpoint.h"
 
 /**
  * The SAFETY_FACTOR Protects against the total propensity exceeding
@@ -374,3 +375,27 @@ void GssaVoxelPools::xferIn( XferInfo& xf, unsigned int voxelIndex, const GssaSy
     // Does this fix the problem of negative concs?
     refreshAtot( g );
 }
+
+void GssaVoxelPools::saveState( ostream& os ) const
+{
+    checkpoint::writeVec( os, vector< double >( S(), S() + size() ) );
+    checkpoint::writeValue( os, t_ );
+    checkpoint::writeVec( os, numFire_ );
+    checkpoint::writeString( os, rng_.getState() );
+}
+
+bool GssaVoxelPools::restoreState( istream& is, const GssaSystem* g )
+{
+    vector< double > s = checkpoint::readVec< double >( is );
+    double t = checkpoint::readValue< double >( is );
+    vector< unsigned int > numFire = checkpoint::readVec< unsigned int >( is );
+    string rngState = checkpoint::readString( is );
+    if ( !is || s.size() != size() || numFire.size() != numFire_.size() )
+        return false;
+    Svec() = s;
+    t_ = t;
+    numFire_ = numFire;
+    rng_.setState( rngState );
+    refreshAtot( g );
+    return true;
+}
@@ -74,6 +74,15 @@ public:
 
     void setStoich( const Stoich* stoichPtr );
 
+    /// Writes the pool numbers, next event time, fire counts and RNG.
+    void saveState( ostream& os ) const;
+
+    /**
+     * Reads back what saveState wrote, and recomputes the propensities.
+     * Returns false if the state does not fit this voxel.
+     */
+    bool restoreState( istream& is, const GssaSystem* g );
+
 private:
     /// Time at which next event will occur.
     double t_;
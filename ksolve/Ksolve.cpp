@@ -28,6 +28,7 @@
 #include "KinSparseMatrix.h"
 #include "Stoich.h"
 #include "../shell/Shell.h"
+#include "../shell/Checkpoint.h"
 
 #include "../mesh/MeshEntry.h"
 #include "../mesh/Boundary.h"
@@ -680,6 +681,11 @@ void Ksolve::reinit( const Eref& e, ProcPtr p )
     // Recompute the partition of interval.
     intervals_.clear();
     moose::splitIntervalInNParts(pools_.size(), numThreads_, intervals_);
+
+    // The junction fluxes are computed from this solver's process, so
+    // they use the same number of threads.
+    if ( dsolvePtr_ )
+        dsolvePtr_->setJunctionThreads( numThreads_ );
 }
 
 //////////////////////////////////////////////////////////////
@@ -921,6 +927,33 @@ void Ksolve::setBlock( const vector< double >& values )
     }
 }
 
+void Ksolve::saveState( ostream& os ) const
+{
+    checkpoint::writeValue< unsigned int >( os, pools_.size() );
+    for ( auto i = pools_.cbegin(); i != pools_.cend(); ++i )
+    {
+        checkpoint::writeVec( os, vector< double >( i->S(), i->S() + i->size() ) );
+        checkpoint::writeVec( os, vector< double >( i->Cinit(), i->Cinit() + i->size() ) );
+    }
+}
+
+bool Ksolve::restoreState( istream& is )
+{
+    unsigned int numVoxels = checkpoint::readValue< unsigned int >( is );
+    if ( numVoxels != pools_.size() )
+        return false;
+    for ( auto i = pools_.begin(); i != pools_.end(); ++i )
+    {
+        vector< double > s = checkpoint::readVec< double >( is );
+        vector< double > cinit = checkpoint::readVec< double >( is );
+        if ( !is || s.size() != i->size() || cinit.size() != i->size() )
+            return false;
+        i->Svec() = s;
+        copy( cinit.begin(), cinit.end(), i->varCinit() );
+    }
+    return true;
+}
+
 void Ksolve::updateVoxelVol( vector< double > vols )
 {
     // For now we assume identical numbers of voxels. Also assume
@@ -125,6 +125,10 @@ public:
     void getBlock( vector< double >& values ) const;
     void setBlock( const vector< double >& values );
 
+    /// Checkpoints the pool numbers and initial conditions of all voxels.
+    void saveState( ostream& os ) const;
+    bool restoreState( istream& is );
+
     void matchJunctionVols( vector< double >& vols, Id otherCompt )
     const;
 
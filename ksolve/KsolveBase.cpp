@@ -36,9 +36,20 @@ KsolveBase::KsolveBase()
 void KsolveBase::updateJunctions( double dt )
 {;}
 
+void KsolveBase::setJunctionThreads( unsigned int numThreads )
+{;}
+
 void KsolveBase::setPrev()
 {;}
 
+void KsolveBase::saveState( ostream& os ) const
+{;}
+
+bool KsolveBase::restoreState( istream& is )
+{
+    return true;
+}
+
 /////////////////////////////////////////////////////////////////////
 
 Id KsolveBase::getCompartment() const
@@ -46,6 +57,14 @@ Id KsolveBase::getCompartment() const
     return compartment_;
 }
 
+unsigned int KsolveBase::getVoxelIndex( const Eref& e ) const
+{
+    unsigned int ret = e.dataIndex();
+    if ( ret >= getNumLocalVoxels() )
+        return ~0U;
+    return ret;
+}
+
 void KsolveBase::setCompartment( Id compt )
 {
     isBuilt_ = false; // We will have to now rebuild the whole thing.
@@ -123,8 +123,23 @@ public:
     /// Used for telling Dsolver to handle all ops across Junctions
     virtual void updateJunctions( double dt );
 
+    /// Tells the Dsolver how many threads to use for updateJunctions.
+    virtual void setJunctionThreads( unsigned int numThreads );
+
     /// Used to tell Dsolver to assign 'prev' values.
     virtual void setPrev();
+
+    /**
+     * Writes the time-varying state of the solver to a checkpoint.
+     * The default saves nothing.
+     */
+    virtual void saveState( ostream& os ) const;
+
+    /**
+     * Reads back what saveState wrote, into a solver built for the
+     * same model. Returns false if the state does not fit the solver.
+     */
+    virtual bool restoreState( istream& is );
     /**
      * Informs the solver that the rate terms or volumes have changed
      * and that the parameters must be updated.
@@ -136,6 +151,10 @@ public:
     /// Return pool index, using Stoich ptr to do lookup.
     virtual unsigned int getPoolIndex( const Eref& er ) const = 0;
 
+    /// Return index of the voxel of er in this solver, or ~0U if it is
+    /// not here.
+    virtual unsigned int getVoxelIndex( const Eref& er ) const;
+
     //////////////////////////////////////////////////////////////
 protected:
     /**
@@ -1414,6 +1414,50 @@ unsigned int Stoich::convertIdToFuncIndex(Id id) const
     return ~0U;
 }
 
+unsigned int Stoich::lookupPools(const vector<ObjId>& pools,
+                                 vector<unsigned int>& voxel,
+                                 vector<unsigned int>& poolIndex) const
+{
+    voxel.assign(pools.size(), ~0U);
+    poolIndex.assign(pools.size(), ~0U);
+    if(!kinterface_)
+        return 0;
+    unsigned int numFound = 0;
+    for(size_t i = 0; i < pools.size(); ++i) {
+        if(pools[i].bad())
+            continue;
+        unsigned int p = convertIdToPoolIndex(pools[i].id);
+        if(p == ~0U)
+            continue;
+        unsigned int v = kinterface_->getVoxelIndex(pools[i].eref());
+        if(v == ~0U)
+            continue;
+        voxel[i] = v;
+        poolIndex[i] = p;
+        numFound++;
+    }
+    return numFound;
+}
+
+void Stoich::getPoolValues(const vector<unsigned int>& voxel,
+                           const vector<unsigned int>& poolIndex,
+                           bool isConc, double* ret) const
+{
+    if(!kinterface_)
+        return;
+    unsigned int numVoxels = kinterface_->getNumLocalVoxels();
+    for(size_t i = 0; i < voxel.size(); ++i) {
+        if(voxel[i] >= numVoxels)
+            continue;
+        const VoxelPoolsBase* vp = kinterface_->pools(voxel[i]);
+        if(poolIndex[i] >= vp->size())
+            continue;
+        ret[i] = vp->getN(poolIndex[i]);
+        if(isConc)
+            ret[i] /= NA * vp->getVolume();
+    }
+}
+
 ZeroOrder* Stoich::makeHalfReaction(double rate, const vector<Id>& reactants)
 {
     ZeroOrder* rateTerm = 0;
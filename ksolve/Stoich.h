@@ -252,6 +252,26 @@ public:
     unsigned int convertIdToPoolIndex(Id id) const;
     unsigned int convertIdToFuncIndex(Id id) const;
 
+    /**
+     * Looks up where the Ksolve keeps the values of each of the pool
+     * entries: its voxel and its pool index. Pools that this Stoich
+     * does not handle are given ~0U in both. Returns the number found.
+     * Done once for a set of pools, so that getPoolValues can read
+     * them all without a lookup per pool.
+     */
+    unsigned int lookupPools(const vector<ObjId>& pools,
+                             vector<unsigned int>& voxel,
+                             vector<unsigned int>& poolIndex) const;
+
+    /**
+     * Fills in ret[i] with the # of molecules, or the conc if isConc,
+     * of the pool at voxel[i] and poolIndex[i] as from lookupPools.
+     * Entries that are ~0U or out of range are left as they are.
+     */
+    void getPoolValues(const vector<unsigned int>& voxel,
+                       const vector<unsigned int>& poolIndex, bool isConc,
+                       double* ret) const;
+
     /// Utility function to make a half reac and return the rate term.
     ZeroOrder* makeHalfReaction(double rate, const vector<Id>& reactants);
 
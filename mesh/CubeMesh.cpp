@@ -1220,6 +1220,29 @@ unsigned int CubeMesh::spaceToIndex( double x, double y, double z ) const
     return EMPTY;
 }
 
+bool CubeMesh::hasEntriesInBox( double x0, double y0, double z0,
+                                double x1, double y1, double z1 ) const
+{
+    if ( x1 < x0_ || x0 > x1_ || y1 < y0_ || y0 > y1_ || z1 < z0_ || z0 > z1_ )
+        return false;
+    // Clamp the box to the grid, in voxel units.
+    unsigned int ix0 = ( x0 > x0_ ) ? static_cast<unsigned int>(( x0 - x0_ ) / dx_) : 0;
+    unsigned int iy0 = ( y0 > y0_ ) ? static_cast<unsigned int>(( y0 - y0_ ) / dy_) : 0;
+    unsigned int iz0 = ( z0 > z0_ ) ? static_cast<unsigned int>(( z0 - z0_ ) / dz_) : 0;
+    unsigned int ix1 = ( x1 < x1_ ) ? static_cast<unsigned int>(( x1 - x0_ ) / dx_) : nx_ - 1;
+    unsigned int iy1 = ( y1 < y1_ ) ? static_cast<unsigned int>(( y1 - y0_ ) / dy_) : ny_ - 1;
+    unsigned int iz1 = ( z1 < z1_ ) ? static_cast<unsigned int>(( z1 - z0_ ) / dz_) : nz_ - 1;
+    ix1 = min( ix1, nx_ - 1 );
+    iy1 = min( iy1, ny_ - 1 );
+    iz1 = min( iz1, nz_ - 1 );
+    for ( unsigned int iz = iz0; iz <= iz1; ++iz )
+        for ( unsigned int iy = iy0; iy <= iy1; ++iy )
+            for ( unsigned int ix = ix0; ix <= ix1; ++ix )
+                if ( s2m_[ ( iz * ny_ + iy ) * nx_ + ix ] != EMPTY )
+                    return true;
+    return false;
+}
+
 double CubeMesh::nearest( double x, double y, double z,
                           unsigned int& index ) const
 {
@@ -201,6 +201,14 @@ class CubeMesh: public MeshCompt
 		/// Converts the 3-D coords to an index. EMPTY if out of range.
 		unsigned int spaceToIndex( double x, double y, double z ) const;
 
+		/**
+		 * True if any filled voxel of the mesh lies at least partly
+		 * within the box from (x0, y0, z0) to (x1, y1, z1). Used to skip
+		 * geometry that cannot touch the mesh when matching junctions.
+		 */
+		bool hasEntriesInBox( double x0, double y0, double z0,
+						double x1, double y1, double z1 ) const;
+
 		/**
 		 * Virtual function to return the distance and index of nearest
 		 * meshEntry. Places entry at centre of voxel.
@@ -259,7 +259,7 @@ double CylBase::selectGridSize( double h, double dia1,
 
 static void fillPointsOnCircle(
 				const Vec& u, const Vec& v, const Vec& q,
-				double h, double r, vector< double >& area,
+				double h, double r, map< unsigned int, double >& area,
 				const CubeMesh* other
 				)
 {
@@ -287,7 +287,7 @@ static void fillPointsOnCircle(
 
 static void fillPointsOnDisc(
 				const Vec& u, const Vec& v, const Vec& q,
-				double h, double r, vector< double >& area,
+				double h, double r, map< unsigned int, double >& area,
 				const CubeMesh* other
 				)
 {
@@ -336,33 +336,52 @@ void CylBase::matchCubeMeshEntries( const ChemCompt* compt,
 	// March along axis of cylinder.
 	// q is the location of the point along axis.
 	double rSlope = ( dia_ - parent.dia_ ) * 0.5 / length_;
+	double rMax = max( dia_, parent.dia_ ) / 2.0;
 	for ( unsigned int i = 0; i < numDivs_; ++i ) {
-		vector< double >area( other->getNumEntries(), 0.0 );
+		// Only the cube entries that are hit get an area, so accumulate
+		// them sparsely rather than over all the entries of the cube.
+		map< unsigned int, double > area;
 		if ( useCylinderCurve ) {
-			for ( unsigned int j = 0; j < num; ++j ) {
-				unsigned int m = i * num + j;
-				double frac = ( m * h + h/2.0 ) / length_;
-				double q0 = x_ + a.a0() * frac;
-				double q1 = y_ + a.a1() * frac;
-				double q2 = z_ + a.a2() * frac;
-				// get radius of cylinder at this point.
-				double r = dia_/2.0;
-				if ( !isCylinder_ ) // Use the more complicated conic value
-				r = parent.dia_/2.0 + frac * rSlope;
-				fillPointsOnCircle( u, v, Vec( q0, q1, q2 ),
-							h, r, area, other );
+			// Skip the division if its bounding box misses the cube.
+			double f0 = i * num * h / length_;
+			double f1 = ( i + 1 ) * num * h / length_;
+			Vec e0( x_ + a.a0() * f0, y_ + a.a1() * f0, z_ + a.a2() * f0 );
+			Vec e1( x_ + a.a0() * f1, y_ + a.a1() * f1, z_ + a.a2() * f1 );
+			if ( length_ <= 0.0 || other->hasEntriesInBox(
+					min( e0.a0(), e1.a0() ) - rMax,
+					min( e0.a1(), e1.a1() ) - rMax,
+					min( e0.a2(), e1.a2() ) - rMax,
+					max( e0.a0(), e1.a0() ) + rMax,
+					max( e0.a1(), e1.a1() ) + rMax,
+					max( e0.a2(), e1.a2() ) + rMax ) ) {
+				for ( unsigned int j = 0; j < num; ++j ) {
+					unsigned int m = i * num + j;
+					double frac = ( m * h + h/2.0 ) / length_;
+					double q0 = x_ + a.a0() * frac;
+					double q1 = y_ + a.a1() * frac;
+					double q2 = z_ + a.a2() * frac;
+					// get radius of cylinder at this point.
+					double r = dia_/2.0;
+					if ( !isCylinder_ ) // Use the more complicated conic value
+					r = parent.dia_/2.0 + frac * rSlope;
+					fillPointsOnCircle( u, v, Vec( q0, q1, q2 ),
+								h, r, area, other );
+				}
 			}
 		}
 		if ( useCylinderCap && i == numDivs_ - 1 ) {
-			fillPointsOnDisc( u, v, Vec( x_, y_, z_ ),
+			double r = dia_/2.0;
+			if ( other->hasEntriesInBox( x_ - r, y_ - r, z_ - r,
+						x_ + r, y_ + r, z_ + r ) )
+				fillPointsOnDisc( u, v, Vec( x_, y_, z_ ),
 							h, dia_/2.0, area, other );
 		}
-		// Go through all cubeMesh entries and compute diffusion
-		// cross-section. Assume this is through a membrane, so the
-		// only factor relevant is area. Not the distance.
-		for ( unsigned int k = 0; k < area.size(); ++k ) {
-			if ( area[k] > EPSILON ) {
-				ret.push_back( VoxelJunction( i + startIndex, k, area[k] ));
+		// Go through the cubeMesh entries that were hit and compute
+		// diffusion cross-section. Assume this is through a membrane, so
+		// the only factor relevant is area. Not the distance.
+		for ( auto k = area.cbegin(); k != area.cend(); ++k ) {
+			if ( k->second > EPSILON ) {
+				ret.push_back( VoxelJunction( i + startIndex, k->first, k->second ));
 			}
 		}
 	}
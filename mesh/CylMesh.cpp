@@ -982,9 +982,9 @@ double CylMesh::selectGridVolume( double h ) const
     return h;
 }
 
-void fillPointsOnCircle(
+static void fillPointsOnCircle(
         const Vec& u, const Vec& v, const Vec& q,
-        double h, double r, vector< double >& area,
+        double h, double r, map< unsigned int, double >& area,
         const CubeMesh* other
         )
 {
@@ -1022,10 +1022,26 @@ void CylMesh::matchCubeMeshEntries( const CubeMesh* other,
     double h = selectGridVolume( other->getDx() );
 
     unsigned int num = static_cast<unsigned int>(floor( 0.1 + diffLength_ / h ));
+    double rMax = max( r0_, r1_ );
     // March along axis of cylinder.
     // q is the location of the point along axis.
     for ( unsigned int i = 0; i < numEntries_; ++i ) {
-        vector< double >area( other->getNumEntries(), 0.0 );
+        // Skip the voxel if its bounding box misses the cube.
+        double f0 = i * diffLength_ / totLen_;
+        double f1 = ( i + 1 ) * diffLength_ / totLen_;
+        Vec e0( x0_ + a.a0() * f0, y0_ + a.a1() * f0, z0_ + a.a2() * f0 );
+        Vec e1( x0_ + a.a0() * f1, y0_ + a.a1() * f1, z0_ + a.a2() * f1 );
+        if ( !other->hasEntriesInBox(
+                    min( e0.a0(), e1.a0() ) - rMax,
+                    min( e0.a1(), e1.a1() ) - rMax,
+                    min( e0.a2(), e1.a2() ) - rMax,
+                    max( e0.a0(), e1.a0() ) + rMax,
+                    max( e0.a1(), e1.a1() ) + rMax,
+                    max( e0.a2(), e1.a2() ) + rMax ) )
+            continue;
+        // Only the cube entries that are hit get an area, so accumulate
+        // them sparsely rather than over all the entries of the cube.
+        map< unsigned int, double > area;
         for ( unsigned int j = 0; j < num; ++j ) {
             unsigned int m = i * num + j;
             double frac = ( m * h + h/2.0 ) / totLen_;
@@ -1037,12 +1053,12 @@ void CylMesh::matchCubeMeshEntries( const CubeMesh* other,
             fillPointsOnCircle( u, v, Vec( q0, q1, q2 ),
                     h, r, area, other );
         }
-        // Go through all cubeMesh entries and compute diffusion
-        // cross-section. Assume this is through a membrane, so the
-        // only factor relevant is area. Not the distance.
-        for ( unsigned int k = 0; k < area.size(); ++k ) {
-            if ( area[k] > EPSILON ) {
-                ret.push_back( VoxelJunction( i, k, area[k] ) );
+        // Go through the cubeMesh entries that were hit and compute
+        // diffusion cross-section. Assume this is through a membrane, so
+        // the only factor relevant is area. Not the distance.
+        for ( auto k = area.cbegin(); k != area.cend(); ++k ) {
+            if ( k->second > EPSILON ) {
+                ret.push_back( VoxelJunction( i, k->first, k->second ) );
             }
         }
     }
@@ -721,6 +721,56 @@ void testCubeMesh()
 	cout << "." << flush;
 }
 
+void testCubeMeshHasEntriesInBox()
+{
+	CubeMesh cm;
+	cm.setPreserveNumEntries( 0 );
+	vector< double > coords( 9 );
+	coords[0] = 0; coords[1] = 0; coords[2] = 0;
+	coords[3] = 10; coords[4] = 10; coords[5] = 10;
+	coords[6] = 1; coords[7] = 1; coords[8] = 1;
+	cm.innerSetCoords( coords );
+	assert( cm.innerGetNumEntries() == 1000 );
+
+	assert( cm.hasEntriesInBox( 1.5, 1.5, 1.5, 2.5, 2.5, 2.5 ) );
+	assert( cm.hasEntriesInBox( -5, -5, -5, 0.5, 0.5, 0.5 ) );
+	assert( cm.hasEntriesInBox( -5, -5, -5, 15, 15, 15 ) );
+	assert( !cm.hasEntriesInBox( -5, -5, -5, -1, 5, 5 ) );
+	assert( !cm.hasEntriesInBox( 11, 1, 1, 12, 2, 2 ) );
+
+	// Keep only the voxels in the plane z = 0.
+	vector< unsigned int > m2s;
+	for ( unsigned int i = 0; i < 100; ++i )
+		m2s.push_back( i );
+	cm.setMeshToSpace( m2s );
+	assert( cm.innerGetNumEntries() == 100 );
+	assert( cm.hasEntriesInBox( 4.5, 4.5, 0.2, 5.5, 5.5, 0.8 ) );
+	assert( !cm.hasEntriesInBox( 4.5, 4.5, 2.2, 5.5, 5.5, 8.8 ) );
+
+	// A cylinder through the filled plane touches it, one that stays
+	// clear of it has no junctions, as the box test skips it.
+	// CylBase( x, y, z, dia, len, numDivs );
+	CylBase pa( 0.5, 5, 0.5, 0.4, 1, 1 );
+	CylBase cyl( 9.5, 5, 0.5, 0.4, 9, 9 );
+	vector< VoxelJunction > ret;
+	cyl.matchCubeMeshEntries( &cm, pa, 0, 0.1, ret, true, false );
+	assert( ret.size() > 0 );
+	for ( unsigned int i = 0; i < ret.size(); ++i ) {
+		assert( ret[i].first < 9 );
+		assert( ret[i].second < 100 );
+		if ( i > 0 && ret[i].first == ret[i-1].first )
+			assert( ret[i].second > ret[i-1].second );
+	}
+
+	CylBase pa2( 0.5, 5, 5.5, 0.4, 1, 1 );
+	CylBase cyl2( 9.5, 5, 5.5, 0.4, 9, 9 );
+	ret.clear();
+	cyl2.matchCubeMeshEntries( &cm, pa2, 0, 0.1, ret, true, false );
+	assert( ret.size() == 0 );
+
+	cout << "." << flush;
+}
+
 void testCubeMeshExtendStencil()
 {
 	CubeMesh cm0;
@@ -2143,6 +2193,7 @@ void testMesh()
 	// testCylMesh();
 	// testMidLevelCylMesh();
 	testCubeMesh();
+	testCubeMeshHasEntriesInBox();
 	testCubeMeshExtendStencil();
 	// testReMesh(); // Waiting to have pool subdivision propagate.
 	// testNeuroMeshLinear();
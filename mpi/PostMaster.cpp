@@ -28,18 +28,22 @@ PostMaster::PostMaster()
 				setSendBuf_( setRecvBufSize, 0 ),
 				setRecvBuf_( setRecvBufSize, 0 ),
 				sendBuf_( Shell::numNodes() ),
+				inFlightBuf_( Shell::numNodes() ),
 				recvBuf_( Shell::numNodes() ),
 				sendSize_( Shell::numNodes(), 0 ),
+				recvCount_( Shell::numNodes(), 0 ),
 				getHandlerBuf_( TgtInfo::headerSize, 0 ),
 				doneIndices_( Shell::numNodes(), 0 ),
 				isSetSent_( 1 ), // Flag. Have any pending 'set' gone?
 				isSetRecv_( 0 ), // Flag. Has some data come in?
 				setSendSize_( 0 ),
-				numRecvDone_( 0 )
+				minDelay_( 0.0 ),
+				exchangeInterval_( 1 ),
+				stepCount_( 0 ),
+				isExchangePending_( false )
 {
-	for ( unsigned int i = 0; i < Shell::numNodes(); ++i ) {
-		sendBuf_[i].resize( reserveBufSize, 0 );
-	}
+	// The send buffers start empty and grow in addToSendBuf, so that
+	// nodes which get little or no traffic cost little memory.
 #ifdef USE_MPI
 	MPI_Barrier( MPI_COMM_WORLD );
 	// Post recv for set calls
@@ -55,7 +59,7 @@ PostMaster::PostMaster()
 					&getHandlerReq_
 	);
 	recvReq_.resize( Shell::numNodes() );
-	sendReq_.resize( Shell::numNodes() );
+	sendReq_.resize( Shell::numNodes(), MPI_REQUEST_NULL );
 	unsigned int k = 0;
 	for ( unsigned int i = 0; i < Shell::numNodes(); ++i ) {
 		// Set up the Recv already for later sends. This might be a problem
@@ -96,10 +100,32 @@ const Cinfo* PostMaster::initCinfo()
 		);
 		static ValueFinfo< PostMaster, unsigned int > bufferSize(
 			"bufferSize",
-			"Size of the send a receive buffers for each node.",
+			"Size of the send buffers for each node. The buffers grow "
+			"on demand, so this only preallocates them.",
 			&PostMaster::setBufferSize,
 			&PostMaster::getBufferSize
 		);
+		static ValueFinfo< PostMaster, double > minDelay(
+			"minDelay",
+			"Smallest delay, in seconds, of any message between nodes, "
+			"typically the minimum synaptic delay of the network. When "
+			"this is at least twice the PostMaster timestep, data is "
+			"exchanged only once every minDelay/2 and the communication "
+			"overlaps with computation on the following steps, without "
+			"a barrier. Everything sent reaches its target within "
+			"minDelay. This is only safe for messages that carry their "
+			"own timestamp, such as spikes. The default of 0 exchanges "
+			"and waits on every step.",
+			&PostMaster::setMinDelay,
+			&PostMaster::getMinDelay
+		);
+		static ReadOnlyValueFinfo< PostMaster, unsigned int >
+				exchangeInterval(
+			"exchangeInterval",
+			"Number of PostMaster steps between data exchanges. "
+			"Computed from minDelay at reinit.",
+			&PostMaster::getExchangeInterval
+		);
 		//////////////////////////////////////////////////////////////
 		// MsgDest Definitions
 		//////////////////////////////////////////////////////////////
@@ -124,7 +150,9 @@ const Cinfo* PostMaster::initCinfo()
 	static Finfo* postMasterFinfos[] = {
 		&numNodes,	// ReadOnlyValue
 		&myNode,	// ReadOnlyValue
-		&bufferSize,	// ReadOnlyValue
+		&bufferSize,	// Value
+		&minDelay,	// Value
+		&exchangeInterval,	// ReadOnlyValue
 		&proc		// SharedFinfo
 	};
 
@@ -141,74 +169,113 @@ const Cinfo* PostMaster::initCinfo()
 }
 
 /**
- * Finalize all outgoing messages, clear the sendSize vector so that we
- * can handle another round of messages.
+ * Waits for all outgoing messages to go out. The send buffers were
+ * already swapped out in postSends, so sendBuf_ can meanwhile take
+ * another round of messages.
  */
 void PostMaster::finalizeSends()
 {
 #ifdef USE_MPI
 	static vector< MPI_Status > status( Shell::numNodes() );
 	MPI_Waitall( Shell::numNodes() -1, &sendReq_[0], &status[0] );
-	for (unsigned int i = 0; i < Shell::numNodes(); ++i ) {
-		sendSize_[i] = 0;
-	}
 #endif
 }
 
-//
 /**
- * PostMaster class: handles cross-node messaging using MPI.
- * Identical to the Process call: sends out what needs to go, and then
- * waits for any incoming messages and passes them on.
+ * Sends out the contents of the send buffers to every other node. Every
+ * node gets a buffer, possibly empty, so that the receiver knows when
+ * it has everything for this exchange. Does not wait for completion.
  */
-void PostMaster::reinit( const Eref& e, ProcPtr p )
+void PostMaster::postSends()
 {
 #ifdef USE_MPI
-	// MPI_Barrier( MPI_COMM_WORLD );
 	unsigned int reqIndex = 0;
 	for ( unsigned int i = 0; i < Shell::numNodes(); ++i )
 	{
 		if ( i == Shell::myNode() ) continue;
+		sendBuf_[i].swap( inFlightBuf_[i] );
 		// MPI_scatter would have been better but it doesn't allow
 		// one to post larger recvs than the actual data sent.
 		MPI_Isend(
-			&sendBuf_[i][0], sendSize_[i], MPI_DOUBLE,
+			inFlightBuf_[i].data(), sendSize_[i], MPI_DOUBLE,
 			i, 		// Where to send to.
 			MSGTAG, MPI_COMM_WORLD,
 			&sendReq_[ reqIndex++ ]
 		);
+		sendSize_[i] = 0;
 		clearPending(); // Try to interleave communications.
 	}
-	while ( numRecvDone_ < Shell::numNodes() -1 )
-		clearPending();
-	finalizeSends();
-	MPI_Barrier( MPI_COMM_WORLD );
-	numRecvDone_ = 0;
 #endif
 }
 
-void PostMaster::process( const Eref& e, ProcPtr p )
+/**
+ * Handles incoming data till one buffer has come in from every other
+ * node, and then waits for our own sends. A fast node may already have
+ * sent its buffer for the next exchange. This is counted per node, so it
+ * cannot stand in for a slower node.
+ */
+void PostMaster::completeExchange()
 {
 #ifdef USE_MPI
-	unsigned int reqIndex = 0;
-	for ( unsigned int i = 0; i < Shell::numNodes(); ++i )
-	{
+	for ( unsigned int i = 0; i < Shell::numNodes(); ++i ) {
 		if ( i == Shell::myNode() ) continue;
-		// MPI_scatter would have been better but it doesn't allow
-		// one to post larger recvs than the actual data sent.
-		MPI_Isend(
-			&sendBuf_[i][0], sendSize_[i], MPI_DOUBLE,
-			i, 		// Where to send to.
-			MSGTAG, MPI_COMM_WORLD,
-			&sendReq_[ reqIndex++ ]
-		);
-		clearPending(); // Try to interleave communications.
+		while ( recvCount_[i] == 0 )
+			clearPending();
+		recvCount_[i]--;
 	}
-	while ( numRecvDone_ < Shell::numNodes() -1 )
-		clearPending();
 	finalizeSends();
+	isExchangePending_ = false;
+#endif
+}
+
+//
+/**
+ * PostMaster class: handles cross-node messaging using MPI.
+ * Completes any exchange left over from the last run, then sends out
+ * what needs to go and waits for all nodes.
+ */
+void PostMaster::reinit( const Eref& e, ProcPtr p )
+{
+	stepCount_ = 0;
+	exchangeInterval_ = 1;
+	if ( p->dt > 0.0 && minDelay_ >= 2.0 * p->dt )
+		exchangeInterval_ = static_cast< unsigned int >(
+						minDelay_ / ( 2.0 * p->dt ) );
+#ifdef USE_MPI
+	if ( isExchangePending_ )
+		completeExchange();
+	postSends();
+	completeExchange();
 	MPI_Barrier( MPI_COMM_WORLD );
-	numRecvDone_ = 0;
+#endif
+}
+
+/**
+ * Without a minDelay, sends out what needs to go and then waits for
+ * incoming messages and passes them on, on every step.
+ * With a minDelay, the exchange happens every exchangeInterval steps.
+ * It first waits for the data of the previous exchange, which was posted
+ * one interval ago, and then posts the data gathered since then. The
+ * nodes need not wait for each other between exchanges, so there is no
+ * barrier.
+ */
+void PostMaster::process( const Eref& e, ProcPtr p )
+{
+#ifdef USE_MPI
+	if ( ++stepCount_ < exchangeInterval_ ) {
+		clearPending(); // Deliver whatever has already come in.
+		return;
+	}
+	stepCount_ = 0;
+	if ( exchangeInterval_ == 1 && minDelay_ < 2.0 * p->dt ) {
+		postSends();
+		completeExchange();
+	} else {
+		if ( isExchangePending_ )
+			completeExchange();
+		postSends();
+		isExchangePending_ = true;
+	}
 #endif
 }
 
@@ -430,8 +497,8 @@ void PostMaster::clearPendingRecv()
 						&recvReq_[ k ]
 						// Ensure we have contiguous entries in recvReq_
 				 );
+		recvCount_[ recvNode ]++;
 	}
-	numRecvDone_ += done;
 #endif
 }
 
@@ -444,7 +511,8 @@ double* PostMaster::addToSendBuf( const Eref& e, unsigned int bindIndex,
 {
 	unsigned int node = e.fieldIndex(); // nasty evil wicked hack
 	unsigned int end = sendSize_[node];
-	if ( end + TgtInfo::headerSize + size > recvBufSize_ ) {
+	unsigned int needed = end + TgtInfo::headerSize + size;
+	if ( needed > recvBufSize_ ) {
 		// Here we need to activate the fallback second send which will
 		// deal with the big block. Also various routines for tracking
 		// send size so we don't get too big or small.
@@ -453,6 +521,10 @@ double* PostMaster::addToSendBuf( const Eref& e, unsigned int bindIndex,
 				": Data size (" << size << ") goes past end of buffer\n";
 		assert( 0 );
 	}
+	if ( needed > sendBuf_[node].size() ) {
+		size_t newSize = max( needed, 2 * (unsigned int)sendBuf_[node].size() );
+		sendBuf_[node].resize( min( newSize, (size_t)recvBufSize_ ), 0 );
+	}
 	TgtInfo* tgt = reinterpret_cast< TgtInfo* >( &sendBuf_[node][end] );
 	tgt->set( e.objId(), bindIndex, size );
 	end += TgtInfo::headerSize;
@@ -724,3 +796,22 @@ void PostMaster::setBufferSize( unsigned int size )
 	for ( unsigned int i =0; i < sendBuf_.size(); ++i )
 		sendBuf_[i].resize( size );
 }
+
+double PostMaster::getMinDelay() const
+{
+	return minDelay_;
+}
+
+void PostMaster::setMinDelay( double delay )
+{
+	if ( delay < 0.0 ) {
+		cerr << "Error: PostMaster::setMinDelay: delay must be >= 0\n";
+		return;
+	}
+	minDelay_ = delay;
+}
+
+unsigned int PostMaster::getExchangeInterval() const
+{
+	return exchangeInterval_;
+}
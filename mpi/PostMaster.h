@@ -108,6 +108,9 @@ class PostMaster {
 		unsigned int getMyNode() const;
 		unsigned int getBufferSize() const;
 		void setBufferSize( unsigned int size );
+		double getMinDelay() const;
+		void setMinDelay( double delay );
+		unsigned int getExchangeInterval() const;
 		void reinit( const Eref& e, ProcPtr p );
 		void process( const Eref& e, ProcPtr p );
 
@@ -119,6 +122,10 @@ class PostMaster {
 		void clearPendingRecv();
 		/// Checks that all sends have gone out
 		void finalizeSends();
+		/// Posts the send buffers to all other nodes, without waiting.
+		void postSends();
+		/// Waits for one buffer from every other node, and for own sends.
+		void completeExchange();
 
 		/// Handles 'get' calls from another node, to an object on mynode.
 		void handleRemoteGet( const Eref& e,
@@ -159,8 +166,14 @@ class PostMaster {
 		vector< double > setSendBuf_;
 		vector< double > setRecvBuf_;
 		vector< vector< double > > sendBuf_;
+		/// Buffers handed to MPI_Isend. Swapped with sendBuf_ on each
+		/// exchange so that filling can go on while the sends are pending.
+		vector< vector< double > > inFlightBuf_;
 		vector< vector< double > > recvBuf_;
 		vector< unsigned int > sendSize_;
+		/// Number of buffers received from each node and not yet
+		/// accounted for by completeExchange.
+		vector< unsigned int > recvCount_;
 		vector< double > getHandlerBuf_; // Just enough for one TgtInfo.
 #ifdef USE_MPI
 		MPI_Request setSendReq_;
@@ -176,7 +189,17 @@ class PostMaster {
 		int isSetSent_;
 		int isSetRecv_;
 		int setSendSize_;
-		unsigned int numRecvDone_;
+
+		/**
+		 * Smallest delay of any message that crosses nodes, typically
+		 * the minimum synaptic delay. Data need only be exchanged once
+		 * in each such window, and the exchange can overlap with
+		 * computation. Zero means exchange and wait on every step.
+		 */
+		double minDelay_;
+		unsigned int exchangeInterval_;	/// In steps of the PostMaster
+		unsigned int stepCount_;
+		bool isExchangePending_;	/// Sends posted, receives not awaited
 };
 
 #endif	// _POST_MASTER_H
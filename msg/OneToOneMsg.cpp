@@ -115,6 +115,16 @@ Id OneToOneMsg::managerId() const
 	return OneToOneMsg::managerId_;
 }
 
+DataId OneToOneMsg::getI1() const
+{
+	return i1_;
+}
+
+DataId OneToOneMsg::getI2() const
+{
+	return i2_;
+}
+
 ObjId OneToOneMsg::findOtherEnd( ObjId f ) const
 {
 	if ( f.element() == e1() )
@@ -38,6 +38,9 @@ class OneToOneMsg: public Msg
 		Msg* copy( Id origSrc, Id newSrc, Id newTgt,
 			FuncId fid, unsigned int b, unsigned int n ) const;
 
+		DataId getI1() const;
+		DataId getI2() const;
+
 		/// Msg lookup functions
 		static unsigned int numMsg();
 		static char* lookupMsg( unsigned int index );
@@ -143,6 +143,16 @@ const Cinfo* SparseMsg::initCinfo()
             new OpFunc1< SparseMsg, vector< unsigned int > >(
                 &SparseMsg::tripletFill1 ) );
 
+    static DestFinfo csrFill( "csrFill",
+            "Fills entire matrix from its compressed sparse row form, as in "
+            "rowStart, columnIndex and matrixEntry: the start of the entries "
+            "of each src, with one more at the end, and the dest index and "
+            "dest field index of each entry.",
+            new OpFunc3< SparseMsg,
+            vector< unsigned int >, vector< unsigned int>,
+            vector< unsigned int >	>(
+                &SparseMsg::csrFill ) );
+
 
     // Assemble it all.
     static Finfo* sparseMsgFinfos[] =
@@ -164,6 +174,7 @@ const Cinfo* SparseMsg::initCinfo()
         &pairFill,              // dest
         &tripletFill,           // dest
         &tripletFill1,          // dest
+        &csrFill,               // dest
     };
 
     static Dinfo< short > dinfo;
@@ -375,6 +386,29 @@ void SparseMsg::tripletFill1( vector< unsigned int > v )
     tripletFill( src, dest, fieldIndex );
 }
 
+bool SparseMsg::setCSR( const vector< unsigned int >& rowStart,
+                        const vector< unsigned int >& colIndex,
+                        const vector< unsigned int >& fieldIndex )
+{
+    if ( !matrix_.csrFill( rowStart, colIndex, fieldIndex ) )
+    {
+        cout << "Warning: SparseMsg::setCSR: arrays of " <<
+             rowStart.size() << " row starts and " << colIndex.size() <<
+             " entries do not fit a " << matrix_.nRows() << " x " <<
+             matrix_.nColumns() << " matrix. Ignored.\n";
+        return false;
+    }
+    updateAfterFill();
+    return true;
+}
+
+void SparseMsg::csrFill( vector< unsigned int > rowStart,
+                         vector< unsigned int > colIndex,
+                         vector< unsigned int > fieldIndex )
+{
+    setCSR( rowStart, colIndex, fieldIndex );
+}
+
 //////////////////////////////////////////////////////////////////
 //    Here are the actual class functions
 //////////////////////////////////////////////////////////////////
@@ -129,6 +129,23 @@ public:
      */
     void tripletFill1( vector< unsigned int > entries );
 
+    /**
+     * Fills up the entire message from the compressed sparse row form
+     * of its matrix, as in rowStart, columnIndex and matrixEntry: the
+     * start of the entries of each src, with one more at the end, and
+     * the dest data index and dest field index of each entry.
+     * Returns false with a warning, leaving the message as it was, if
+     * the arrays do not fit the src and dest.
+     */
+    bool setCSR( const vector< unsigned int >& rowStart,
+                 const vector< unsigned int >& colIndex,
+                 const vector< unsigned int >& fieldIndex );
+
+    /// setCSR for the csrFill DestFinfo.
+    void csrFill( vector< unsigned int > rowStart,
+                  vector< unsigned int > colIndex,
+                  vector< unsigned int > fieldIndex );
+
     /**
      * Utility function to update all sorts of values after we've
      * rebuilt the matrix.
@@ -42,7 +42,13 @@ py::object getFieldValue(const ObjId &oid, const Finfo *f)
         r = py::float_(getField<double>(oid, fname));
     }
     else if(rttType == "vector<double>") {
-        r = getFieldNumpy<double>(oid, fname);
+        // Copy the data once, rather than once in the getter and again
+        // into the array.
+        const vector<double>* v = vectorFieldData(oid, fname);
+        if(v)
+            r = py::array_t<double>(v->size(), v->data());
+        else
+            r = getFieldNumpy<double>(oid, fname);
     }
     else if(rttType == "vector<unsigned int>") {
         r = getFieldNumpy<unsigned int>(oid, fname);
@@ -132,12 +132,12 @@ vector<ObjId> MooseVec::getItemRange(const py::slice& slice) const
 
 ObjId MooseVec::getDataItem(const size_t i) const
 {
-    return ObjId(oid_.path(), i, oid_.fieldIndex);
+    return ObjId(oid_.id, i, oid_.fieldIndex);
 }
 
 ObjId MooseVec::getFieldItem(const size_t i) const
 {
-    return ObjId(oid_.path(), oid_.dataIndex, i);
+    return ObjId(oid_.id, oid_.dataIndex, i);
 }
 
 py::object MooseVec::getAttribute(const string& name)
@@ -161,7 +161,7 @@ py::object MooseVec::getAttribute(const string& name)
     if(rttType == "unsigned int")
         return getAttributeNumpy<unsigned int>(name);
     if(rttType == "int")
-        return getAttributeNumpy<unsigned int>(name);
+        return getAttributeNumpy<int>(name);
 
     vector<py::object> res(size());
     for(unsigned int i = 0; i < size(); i++)
@@ -193,27 +193,51 @@ bool MooseVec::setAttribute(const string& name, const py::object& val)
 
     auto rttType = finfo->rttiType();
 
-    bool isVector = false;
-    if(py::isinstance<py::iterable>(val) && (!py::isinstance<py::str>(val)))
-        isVector = true;
-
-    if(isVector) {
-        if(rttType == "double")
-            return setAttrOneToOne<double>(name, val.cast<vector<double>>());
-        if(rttType == "unsigned int")
-            return setAttrOneToOne<unsigned int>(
-                name, val.cast<vector<unsigned int>>());
-        if(rttType == "bool")
-            return setAttrOneToOne<bool>(name, val.cast<vector<bool>>());
-    }
-    else {
-        if(rttType == "double")
-            return setAttrOneToAll<double>(name, val.cast<double>());
-        if(rttType == "unsigned int")
-            return setAttrOneToAll<unsigned int>(name,
-                                                 val.cast<unsigned int>());
-        if(rttType == "bool")
-            return setAttrOneToAll<bool>(name, val.cast<bool>());
+    // Ids and ObjIds support indexing, but are single values here.
+    bool isSequence = py::isinstance<py::iterable>(val) &&
+                      !py::isinstance<py::str>(val) &&
+                      !py::isinstance<ObjId>(val) && !py::isinstance<Id>(val);
+
+    if(rttType == "double")
+        return setAttrScalar<double>(name, val, isSequence);
+    if(rttType == "float")
+        return setAttrScalar<float>(name, val, isSequence);
+    if(rttType == "int")
+        return setAttrScalar<int>(name, val, isSequence);
+    if(rttType == "short")
+        return setAttrScalar<short>(name, val, isSequence);
+    if(rttType == "long")
+        return setAttrScalar<long>(name, val, isSequence);
+    if(rttType == "unsigned int")
+        return setAttrScalar<unsigned int>(name, val, isSequence);
+    if(rttType == "unsigned long" || rttType == "size_t")
+        return setAttrScalar<unsigned long>(name, val, isSequence);
+    if(rttType == "bool")
+        return setAttrScalar<bool>(name, val, isSequence);
+    if(rttType == "string")
+        return setAttrScalar<string>(name, val, isSequence);
+    if(rttType == "ObjId")
+        return setAttrScalar<ObjId>(name, val, isSequence);
+    if(rttType == "Id")
+        return setAttrScalar<Id>(name, val, isSequence);
+
+    if(isSequence) {
+        if(rttType == "vector<double>")
+            return setAttrVector<double>(name, val);
+        if(rttType == "vector<float>")
+            return setAttrVector<float>(name, val);
+        if(rttType == "vector<int>")
+            return setAttrVector<int>(name, val);
+        if(rttType == "vector<unsigned int>")
+            return setAttrVector<unsigned int>(name, val);
+        if(rttType == "vector<long>")
+            return setAttrVector<long>(name, val);
+        if(rttType == "vector<string>")
+            return setAttrVector<string>(name, val);
+        if(rttType == "vector<ObjId>")
+            return setAttrVector<ObjId>(name, val);
+        if(rttType == "vector<Id>")
+            return setAttrVector<Id>(name, val);
     }
 
     py::print("MooseVec::setAttribute: Setting vec attributes of type", rttType,
@@ -246,7 +270,7 @@ vector<ObjId> MooseVec::objs() const
 {
     vector<ObjId> items;
     for(size_t i = 0; i < size(); i++)
-        items.push_back(ObjId(oid_.path(), i, 0));
+        items.push_back(ObjId(oid_.id, i, 0));
     return items;
 }
 
@@ -58,95 +58,80 @@ public:
     ObjId getDataItem(const size_t i) const;
     ObjId getFieldItem(const size_t i) const;
 
-    // Set attribute to vector.
-    // void setAttrOneToAll(const string& name, const py::object& val);
-    // void setAttrOneToOne(const string& name, const py::sequence& val);
-
-    template <typename T>
-    inline bool setAttributeAtIndex(size_t i, const string& name, T val,
-                                    const string& rttType)
-    {
-        // Otherwise coerce the type. Be conservative here, please.
-        if (rttType == "double")
-            return Field<double>::set(getItem(i), name, val);
-        if (rttType == "int")
-            return Field<int>::set(getItem(i), name, static_cast<int>(val));
-        if (rttType == "unsigned long")
-            return Field<unsigned long>::set(getItem(i), name, static_cast<unsigned long>(val));
-        if (rttType == "unsigned int")
-            return Field<unsigned int>::set(getItem(i), name, static_cast<unsigned int>(val));
-        if (rttType == "bool")
-            return Field<bool>::set(getItem(i), name, static_cast<bool>(val));
-        return false;
-    }
-
+    // Set the same value on all entries. The SetOpFunc is looked up once and
+    // applied to every entry in C++.
     template <typename T>
     bool setAttrOneToAll(const string& name, const T& val)
     {
-        auto cinfo = oid_.element()->cinfo();
-        auto finfo = cinfo->findFinfo(name);
-        assert(finfo);
-
-        string expectedType(finfo->rttiType());
-        string givenType(Conv<T>::rttiType());
-
-        bool isSameType = (expectedType == givenType);
-
-        bool res = true;
-        for (size_t i = 0; i < size(); i++)
-        {
-            if (isSameType)
-            {
-                res &= Field<T>::set(getItem(i), name, val);
-                continue;
-            }
-
-            // else try coercing the types.
-            if (!setAttributeAtIndex<T>(i, name, val, expectedType))
-                throw py::value_error("Unexpected type '" + givenType +
-                                      "', MOOSE could not convert to '" +
-                                      expectedType + "'.");
-        }
-        return res;
+        if (size() == 0)
+            return true;
+        return Field<T>::setRepeat(oid_, name, val);
     }
 
+    // Set one value per entry.
     template <typename T>
     bool setAttrOneToOne(const string& name, const vector<T>& val)
     {
-        auto cinfo = oid_.element()->cinfo();
-        auto finfo = cinfo->findFinfo(name);
-        assert(finfo);
-
-        string expectedType(finfo->rttiType());
-        string recievedType(Conv<T>::rttiType());
-
-        bool isSameType = expectedType == recievedType;
-
         if (val.size() != size())
             throw runtime_error(
                 "Length of sequence on the right hand side "
                 "does not match size of vector. "
                 "Expected " +
                 to_string(size()) + ", got " + to_string(val.size()));
+        if (val.empty())
+            return true;
+        return Field<T>::setVec(oid_, name, val);
+    }
 
-        bool res = true;
-        for (size_t i = 0; i < size(); i++)
-        {
-            if (isSameType)
-            {
-                res &= Field<T>::set(getItem(i), name, val[i]);
-                continue;
+    // Convert a python sequence to vector<T>. Numpy arrays of numbers are
+    // copied from their buffer rather than element by element.
+    template <typename T>
+    static vector<T> toVector(const py::handle& val)
+    {
+        if constexpr (std::is_arithmetic<T>::value &&
+                      !std::is_same<T, bool>::value) {
+            if (py::isinstance<py::array>(val)) {
+                auto arr = py::array_t<T, py::array::c_style |
+                                              py::array::forcecast>::ensure(val);
+                if (arr && arr.ndim() == 1)
+                    return vector<T>(arr.data(), arr.data() + arr.size());
             }
-
-            // Else conservatively coerse value. Required for int -> double
-            // etc.
-            if (!setAttributeAtIndex<T>(i, name, val[i], expectedType))
-                throw py::value_error("Unexpected type '" + recievedType +
-                                      "', MOOSE could not convert to '" +
-                                      expectedType + "'.");
         }
+        return val.cast<vector<T>>();
+    }
 
-        return res;
+    // Scalar fields: a sequence gives one value per entry, anything else is
+    // set on all entries.
+    template <typename T>
+    bool setAttrScalar(const string& name, const py::object& val,
+                       bool isSequence)
+    {
+        if (isSequence)
+            return setAttrOneToOne<T>(name, toVector<T>(val));
+        return setAttrOneToAll<T>(name, val.cast<T>());
+    }
+
+    // Vector-valued fields: a flat sequence is set on all entries, a sequence
+    // of sequences (or a 2-D array) gives one vector per entry.
+    template <typename T>
+    bool setAttrVector(const string& name, const py::object& val)
+    {
+        bool nested = false;
+        if (py::isinstance<py::array>(val))
+            nested = (val.cast<py::array>().ndim() == 2);
+        else if (py::len(val) > 0) {
+            py::object first = val[py::int_(0)];
+            nested = py::isinstance<py::iterable>(first) &&
+                     !py::isinstance<py::str>(first);
+        }
+        if (!nested)
+            return setAttrOneToAll<vector<T>>(name, toVector<T>(val));
+
+        vector<vector<T>> rows;
+        rows.reserve(py::len(val));
+        for (auto row : val)
+            rows.push_back(toVector<T>(row));
+        return setAttrOneToOne<vector<T>>(name, rows);
     }
 
     // Get attributes.
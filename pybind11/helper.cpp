@@ -16,6 +16,7 @@
 
 #include <memory>
 #include <stdexcept>
+#include <unordered_map>
 #include <unordered_set>
 #include <csignal>
 #include <algorithm>
@@ -40,12 +41,22 @@ namespace py = pybind11;
 #include "../msg/DiagonalMsg.h"
 
 #include "../builtins/Variable.h"
+#include "../builtins/TableBase.h"
+#include "../biophysics/HHGate.h"
+#include "../basecode/SparseMatrix.h"
+#include "../ksolve/RateTerm.h"
+#include "../ksolve/KinSparseMatrix.h"
+#include "../ksolve/VoxelPoolsBase.h"
+#include "../ksolve/KsolveBase.h"
+#include "../ksolve/Stoich.h"
 #include "../mpi/PostMaster.h"
 #include "../scheduling/Clock.h"
 #include "../shell/Neutral.h"
 #include "../shell/Shell.h"
 #include "../shell/Wildcard.h"
+#include "../shell/ModelCache.h"
 #include "../utility/strutil.h"
+#include "../utility/cnpy.hpp"
 #include "../randnum/randnum.h"
 
 #include "helper.h"
@@ -218,6 +229,57 @@ ObjId getElementFieldItem(const ObjId& objid, const string& fname,
     return ObjId(oid.id, oid.dataIndex, index);
 }
 
+/**
+ * The vector<double> that holds a field, for the fields whose getter just
+ * returns a copy of it. Returns nullptr for other fields, which have to
+ * go through their getter.
+ */
+const vector<double>* vectorFieldData(const ObjId& oid, const string& fname)
+{
+    const Cinfo* cinfo = oid.element()->cinfo();
+    if(fname == "vector" && cinfo->isA("TableBase"))
+        return &reinterpret_cast<TableBase*>(oid.data())->data();
+    if(cinfo->isA("HHGate")) {
+        const HHGate* gate = reinterpret_cast<const HHGate*>(oid.data());
+        if(fname == "tableA")
+            return &gate->tableA();
+        if(fname == "tableB")
+            return &gate->tableB();
+    }
+    return nullptr;
+}
+
+py::array_t<double> mooseFieldView(const ObjId& oid, const string& fname)
+{
+    const vector<double>* v = vectorFieldData(oid, fname);
+    if(!v)
+        throw py::value_error("fieldView: '" + fname + "' of " + oid.path() +
+                              " cannot be viewed without a copy.");
+    if(v->empty())
+        return py::array_t<double>(0);
+
+    py::array_t<double> ret;
+    if(oid.element()->cinfo()->isA("TableBase")) {
+        // The array owns a reference to the table's vector. When the
+        // object writes to the table, or is deleted, it moves to a new
+        // vector or drops its reference, and the view keeps the old one.
+        using SharedVec = std::shared_ptr<const vector<double>>;
+        SharedVec* data = new SharedVec(
+            reinterpret_cast<const TableBase*>(oid.data())->sharedData());
+        py::capsule owner(data, [](void* p) {
+            delete reinterpret_cast<SharedVec*>(p);
+        });
+        ret = py::array_t<double>((*data)->size(), (*data)->data(), owner);
+    }
+    else {
+        // HHGate tables are changed in place, so a view could not outlive
+        // them safely. These tables are small: copy them.
+        ret = py::array_t<double>(v->size(), v->data());
+    }
+    ret.attr("setflags")(py::arg("write") = false);
+    return ret;
+}
+
 ObjId shellConnect(const ObjId& src, const string& srcField, const ObjId& tgt,
                    const string& tgtField, const string& msgType)
 {
@@ -231,6 +293,198 @@ ObjId shellConnectToVec(const ObjId& src, const string& srcField,
     return getShellPtr()->doAddMsg(msgType, src, srcField, tgt.obj(), tgtField);
 }
 
+/**
+ * Connects entry i of src to tgts[i], for all the tgts, in one call.
+ * Targets that are entries of the same array element are connected by a
+ * single message: OneToOne if entry i goes to entry i of a target array
+ * of the same size, otherwise Sparse. Other targets get a Single message
+ * each. Returns the messages made.
+ */
+vector<ObjId> shellConnectMany(const MooseVec& src, const string& srcField,
+                               const vector<ObjId>& tgts,
+                               const string& tgtField)
+{
+    Element* srcElm = src.obj().element();
+    if(tgts.size() > srcElm->numData())
+        throw runtime_error("connectMany: " + to_string(tgts.size()) +
+                            " targets but only " +
+                            to_string(srcElm->numData()) + " sources in " +
+                            src.path());
+
+    // Group the targets by element, in order of first appearance.
+    vector<Element*> elms;
+    vector<vector<unsigned int>> groups;
+    unordered_map<Element*, size_t> groupIndex;
+    for(unsigned int i = 0; i < tgts.size(); ++i) {
+        Element* e = tgts[i].element();
+        if(!e)
+            throw runtime_error("connectMany: target " + to_string(i) +
+                                " does not exist");
+        auto ins = groupIndex.insert(make_pair(e, elms.size()));
+        if(ins.second) {
+            elms.push_back(e);
+            groups.push_back(vector<unsigned int>());
+        }
+        groups[ins.first->second].push_back(i);
+    }
+
+    Shell* shell = getShellPtr();
+    vector<ObjId> ret;
+    auto check = [&](const ObjId& mid, const ObjId& tgt) {
+        if(mid.id == Id())
+            throw runtime_error("connectMany: could not connect " +
+                                src.path() + "." + srcField + " to " +
+                                tgt.path() + "." + tgtField);
+        ret.push_back(mid);
+    };
+    for(size_t g = 0; g < groups.size(); ++g) {
+        const vector<unsigned int>& group = groups[g];
+        Element* e = elms[g];
+        if(group.size() == 1 || e->hasFields()) {
+            for(unsigned int i : group)
+                check(shell->doAddMsg("Single", ObjId(src.obj().id, i),
+                                      srcField, tgts[i], tgtField),
+                      tgts[i]);
+            continue;
+        }
+        vector<unsigned int> srcIndex(group.begin(), group.end());
+        vector<unsigned int> tgtIndex;
+        tgtIndex.reserve(group.size());
+        bool oneToOne = (group.size() == srcElm->numData() &&
+                         group.size() == e->numData());
+        for(unsigned int i : group) {
+            tgtIndex.push_back(tgts[i].dataIndex);
+            oneToOne = oneToOne && (tgts[i].dataIndex == i);
+        }
+        ObjId tgt(e->id(), 0);
+        if(oneToOne) {
+            check(shell->doAddMsg("OneToOne", ObjId(src.obj().id, 0),
+                                  srcField, tgt, tgtField),
+                  tgt);
+        } else {
+            ObjId mid = shell->doAddMsg("Sparse", ObjId(src.obj().id, 0),
+                                        srcField, tgt, tgtField);
+            check(mid, tgt);
+            SetGet2<vector<unsigned int>, vector<unsigned int>>::set(
+                mid, "pairFill", srcIndex, tgtIndex);
+        }
+    }
+    return ret;
+}
+
+static SparseMsg* sparseMsgPtr(const ObjId& msg)
+{
+    if(msg.bad() || !msg.element()->cinfo()->isA("SparseMsg"))
+        throw py::value_error(msg.path() + " is not a SparseMsg.");
+    return reinterpret_cast<SparseMsg*>(msg.data());
+}
+
+static vector<unsigned int> toIndexVector(const py::object& arg)
+{
+    auto arr = py::array_t<unsigned int,
+                           py::array::c_style | py::array::forcecast>::ensure(arg);
+    if(!arr || arr.ndim() != 1)
+        throw py::value_error("Expected a 1-D array of indices.");
+    return vector<unsigned int>(arr.data(), arr.data() + arr.size());
+}
+
+/**
+ * The matrix of a SparseMsg in compressed sparse row form: the start of
+ * the entries of each src (with one more at the end), and the dest index
+ * and dest field index of each entry.
+ */
+py::tuple sparseMsgCSR(const ObjId& msg)
+{
+    const SparseMatrix<unsigned int>& m = sparseMsgPtr(msg)->getMatrix();
+    const vector<unsigned int>& rowStart = m.rowStart();
+    const vector<unsigned int>& colIndex = m.colIndex();
+    const vector<unsigned int>& fieldIndex = m.matrixEntry();
+    return py::make_tuple(
+        py::array_t<unsigned int>(rowStart.size(), rowStart.data()),
+        py::array_t<unsigned int>(colIndex.size(), colIndex.data()),
+        py::array_t<unsigned int>(fieldIndex.size(), fieldIndex.data()));
+}
+
+void setSparseMsgCSR(const ObjId& msg, const py::object& rowStart,
+                     const py::object& colIndex, const py::object& fieldIndex)
+{
+    SparseMsg* sm = sparseMsgPtr(msg);
+    if(!sm->setCSR(toIndexVector(rowStart), toIndexVector(colIndex),
+                   toIndexVector(fieldIndex)))
+        throw py::value_error("The arrays do not fit the " +
+                              to_string(sm->getNumRows()) + " x " +
+                              to_string(sm->getNumColumns()) + " matrix of " +
+                              msg.path() + ".");
+}
+
+PoolReader::PoolReader(const vector<ObjId>& pools) : pools_(pools)
+{
+    lookup();
+}
+
+PoolReader::PoolReader(const MooseVec& pools) : pools_(pools.objs())
+{
+    lookup();
+}
+
+void PoolReader::lookup()
+{
+    vector<ObjId> stoichs;
+    wildcardFind("/##[ISA=Stoich]", stoichs);
+    vector<bool> found(pools_.size(), false);
+    vector<unsigned int> voxel;
+    vector<unsigned int> poolIndex;
+    for(const auto& s : stoichs) {
+        const Stoich* sp = reinterpret_cast<const Stoich*>(s.data());
+        if(sp->lookupPools(pools_, voxel, poolIndex) == 0)
+            continue;
+        Group g;
+        g.stoich = s;
+        for(size_t i = 0; i < pools_.size(); i++) {
+            if(found[i] || voxel[i] == ~0U)
+                continue;
+            found[i] = true;
+            g.pos.push_back(i);
+            g.voxel.push_back(voxel[i]);
+            g.poolIndex.push_back(poolIndex[i]);
+        }
+        if(!g.pos.empty())
+            groups_.push_back(std::move(g));
+    }
+    for(size_t i = 0; i < pools_.size(); i++)
+        if(!found[i])
+            unsolved_.push_back(i);
+}
+
+size_t PoolReader::size() const
+{
+    return pools_.size();
+}
+
+py::array_t<double> PoolReader::get(const string& field) const
+{
+    bool isConc = (field == "conc");
+    if(!isConc && field != "n")
+        throw py::value_error("PoolReader: field must be 'n' or 'conc', not '" +
+                              field + "'.");
+    py::array_t<double> ret(pools_.size());
+    double* data = ret.mutable_data();
+    vector<double> vals;
+    for(const auto& g : groups_) {
+        if(g.stoich.bad() || !g.stoich.element()->cinfo()->isA("Stoich"))
+            throw runtime_error("PoolReader: a solver of these pools has been "
+                                "deleted. Make a new PoolReader.");
+        const Stoich* sp = reinterpret_cast<const Stoich*>(g.stoich.data());
+        vals.assign(g.pos.size(), 0.0);
+        sp->getPoolValues(g.voxel, g.poolIndex, isConc, vals.data());
+        for(size_t k = 0; k < g.pos.size(); k++)
+            data[g.pos[k]] = vals[k];
+    }
+    for(size_t i : unsolved_)
+        data[i] = Field<double>::get(pools_[i], field);
+    return ret;
+}
+
 #if 0
 void mooseMoveId(const Id& a, const ObjId& b)
 {
@@ -248,6 +502,24 @@ void mooseMoveObPath(const string& a, const ObjId& b)
 }
 #endif
 
+void mooseSaveCheckpoint(const string& fileName, const string& root)
+{
+    if(!getShellPtr()->doSaveCheckpoint(root, fileName))
+        throw std::runtime_error("could not save checkpoint to " + fileName);
+}
+
+void mooseRestoreCheckpoint(const string& fileName, const string& root)
+{
+    if(!getShellPtr()->doRestoreCheckpoint(root, fileName))
+        throw std::runtime_error("could not restore checkpoint from " +
+                                 fileName);
+}
+
+void mooseSetModelCache(const string& directory, unsigned long maxBytes)
+{
+    ModelCache::setDirectory(directory, maxBytes);
+}
+
 void mooseSetClock(const unsigned int clockId, double dt)
 {
     getShellPtr()->doSetClock(clockId, dt);
@@ -759,3 +1031,22 @@ vector<ObjId> mooseNeighbors(const ObjId& obj, const string& fieldName,
     }
     return res;
 }
+
+py::tuple mooseReadNpy(const string& path)
+{
+    auto npy = new cnpy2::NpyMap(path);
+    if(! npy->isOpen()) {
+        delete npy;
+        throw py::value_error("Could not read numpy file '" + path + "'.");
+    }
+    // The array keeps the map alive through the capsule.
+    py::capsule owner(npy, [](void* p) {
+        delete reinterpret_cast<cnpy2::NpyMap*>(p);
+    });
+    py::array_t<double> arr(
+        {npy->numRows(), npy->numCols()},
+        {npy->numCols() * sizeof(double), sizeof(double)}, npy->data(), owner);
+    py::detail::array_proxy(arr.ptr())->flags &=
+        ~py::detail::npy_api::NPY_ARRAY_WRITEABLE_;
+    return py::make_tuple(arr, npy->colnames());
+}
@@ -161,6 +161,10 @@ ObjId getElementField(const ObjId objid, const string& fname);
 ObjId getElementFieldItem(const ObjId& objid, const string& fname,
                           unsigned int index);
 
+const vector<double>* vectorFieldData(const ObjId& oid, const string& fname);
+
+py::array_t<double> mooseFieldView(const ObjId& oid, const string& fname);
+
 // Connect using doConnect
 ObjId shellConnect(const ObjId& src, const string& srcField, const ObjId& tgt,
                    const string& tgtField, const string& msgType);
@@ -169,6 +173,47 @@ ObjId shellConnectToVec(const ObjId& src, const string& srcField,
                         const MooseVec& tgt, const string& tgtField,
                         const string& msgType);
 
+vector<ObjId> shellConnectMany(const MooseVec& src, const string& srcField,
+                               const vector<ObjId>& tgts,
+                               const string& tgtField);
+
+py::tuple sparseMsgCSR(const ObjId& msg);
+
+void setSparseMsgCSR(const ObjId& msg, const py::object& rowStart,
+                     const py::object& colIndex, const py::object& fieldIndex);
+
+/**
+ * Reads n or conc of many pools at once. The voxel and pool index of each
+ * pool in its Stoich are looked up once, when the PoolReader is made, and
+ * each get() reads the values straight from the solvers. Pools that are not
+ * in a solver are read through their fields. Make a new PoolReader after
+ * the pools or solvers change.
+ */
+class PoolReader
+{
+public:
+    PoolReader(const vector<ObjId>& pools);
+    PoolReader(const MooseVec& pools);
+
+    size_t size() const;
+
+    py::array_t<double> get(const string& field) const;
+
+private:
+    void lookup();
+
+    struct Group {
+        ObjId stoich;
+        vector<size_t> pos;
+        vector<unsigned int> voxel;
+        vector<unsigned int> poolIndex;
+    };
+
+    vector<ObjId> pools_;
+    vector<Group> groups_;
+    vector<size_t> unsolved_;
+};
+
 inline bool mooseDeleteId(const Id& id)
 {
     return getShellPtr()->doDelete(ObjId(id));
@@ -256,4 +301,20 @@ messages. Default is "".
  */
 vector<ObjId> mooseNeighbors(const ObjId& obj, const string& fieldName, const string& msgType="", int direction=2);
 
+/** Memory maps the numpy file `path` written by a Streamer or Table, and
+returns a tuple of a read-only (rows, columns) array of the values, which is
+a view into the mapped file, and the list of column names.
+ */
+py::tuple mooseReadNpy(const string& path);
+
+/** Saves the simulation state under root to a checkpoint file. */
+void mooseSaveCheckpoint(const string& fileName, const string& root);
+
+/** Restores a checkpoint into the model under root, after reinit. */
+void mooseRestoreCheckpoint(const string& fileName, const string& root);
+
+/** Turns the on-disk cache of loaded models on, or off if directory is
+ * empty. */
+void mooseSetModelCache(const string& directory, unsigned long maxBytes);
+
 #endif /* end of include guard: HELPER_H */
@@ -411,6 +411,15 @@ PYBIND11_MODULE(_moose, m)
         // Wrapped object.
         .def_property_readonly("objid", &MooseVec::obj);
 
+    py::class_<PoolReader>(m, "PoolReader",
+                           "Reads n or conc of many pools at once, from their "
+                           "solvers. Make a new one after the pools or "
+                           "solvers change.")
+        .def(py::init<const MooseVec &>(), "pools"_a)
+        .def(py::init<const vector<ObjId> &>(), "pools"_a)
+        .def("__len__", &PoolReader::size)
+        .def("get", &PoolReader::get, "field"_a = "conc");
+
     /**
      * MODULE FUNCTIONS such as moose.seed(10) etc.
      */
@@ -476,6 +485,19 @@ PYBIND11_MODULE(_moose, m)
 
     m.def("version_info", &mooseVersionInfo);
 
+    m.def("_readNpy", &mooseReadNpy, "path"_a);
+    m.def("_saveCheckpoint", &mooseSaveCheckpoint, "filename"_a, "root"_a);
+    m.def("_restoreCheckpoint", &mooseRestoreCheckpoint, "filename"_a,
+          "root"_a);
+    m.def("_setModelCache", &mooseSetModelCache, "directory"_a,
+          "maxBytes"_a);
+    m.def("_fieldView", &mooseFieldView, "obj"_a, "fieldname"_a);
+    m.def("_connectMany", &shellConnectMany, "src"_a, "srcfield"_a, "dests"_a,
+          "destfield"_a);
+    m.def("_sparseMsgCSR", &sparseMsgCSR, "msg"_a);
+    m.def("_setSparseMsgCSR", &setSparseMsgCSR, "msg"_a, "rowStart"_a,
+          "columnIndex"_a, "fieldIndex"_a);
+
     // Attributes.
     m.attr("NA") = NA;
     m.attr("PI") = PI;
@@ -310,6 +310,17 @@ def checkGroup(basePath,model,comptSbmlidMooseIdMap):
                     groupInfo[p.getId()] = {"mpath":moosegrp, "splist":memlists}
     return groupInfo
 
+def memberGroups(groupInfo):
+    """Map the SBML id of each group member to its moose group. Where an
+    id is in several groups the last one wins, as when searching the groups
+    in turn.
+    """
+    groupOf = {}
+    for v in groupInfo.values():
+        for sbmlId in v["splist"]:
+            groupOf[sbmlId] = v["mpath"]
+    return groupOf
+
 def setupEnzymaticReaction(enz, groupName, enzName, specInfoMap, modelAnnotaInfo,deletcplxMol):
     enzPool = (modelAnnotaInfo[groupName]["enzyme"])
     enzPool = str(idBeginWith(enzPool))
@@ -691,6 +702,7 @@ def createReaction(model, specInfoMap, modelAnnotaInfo, globparameterIdValue,fun
     reactSBMLIdMooseId = {}
     msg = ""
     reaction_ = None
+    groupOf = memberGroups(groupInfo)
     for ritem in range(0, model.getNumReactions()):
         reactionCreated = False
         channelCreated = False
@@ -705,10 +717,7 @@ def createReaction(model, specInfoMap, modelAnnotaInfo, globparameterIdValue,fun
         #     group = reacAnnoInfo["Group"]
         if (reac.isSetId()):
             rId = reac.getId()
-            #groups = [k for k, v in groupInfo.items() if rId in v]
-            for k,v in groupInfo.items():
-                if rId in v["splist"]:
-                    group = v["mpath"]
+            group = groupOf.get(rId, "")
 
             # if groups:
             #     group = groups[0]
@@ -1201,6 +1210,7 @@ def createSpecies(basePath, model, comptSbmlidMooseIdMap,
     if not (model.getNumSpecies()):
         return (False,"number of species is zero")
     else:
+        groupOf = memberGroups(groupInfo)
         for sindex in range(0, model.getNumSpecies()):
             spe = model.getSpecies(sindex)
             group = ""
@@ -1212,10 +1222,7 @@ def createSpecies(basePath, model, comptSbmlidMooseIdMap,
             sName = None
             sId = spe.getId()
             group = ""
-            #groups = [k for k, v in groupInfo.items() if sId in v]
-            for k,v in groupInfo.items():
-                if sId in v["splist"]:
-                    group = v["mpath"]
+            group = groupOf.get(sId, "")
             # if groups:
             #     group = groups[0]
             if spe.isSetName():
@@ -268,6 +268,137 @@ def connect(src, srcfield, dest, destfield, msgtype="Single"):
     return msg
 
 
+def connectMany(src, srcfield, dests, destfield):
+    """Connect `srcfield` of each entry of the vec `src` to `destfield` of
+    the matching object in `dests`, in one call.
+
+    Entry i of `src` is connected to `dests[i]`. This is much faster than
+    calling connect for each pair, for example to connect a vec of Tables
+    to the compartments of a large cell. Targets that are entries of the
+    same vec are connected by a single OneToOne or Sparse message, the
+    others by a Single message each.
+
+    Parameters
+    ----------
+    src : vec/element/str
+        Source objects. At least len(dests) entries.
+    srcfield : str
+        source field.
+    dests : sequence of elements
+        Destination object for each entry of `src`.
+    destfield : str
+        field to connect to on each of `dests`.
+
+    Returns
+    -------
+    list of msgmanagers for the messages made.
+
+    Examples
+    --------
+    >>> tabs = moose.Table('/plots/vm', len(compts))
+    >>> moose.connectMany(tabs.vec, 'requestOut', compts, 'getVm')
+    """
+    if isinstance(src, str):
+        src = element(src)
+    return _moose._connectMany(src.vec, srcfield, list(dests), destfield)
+
+
+def sparseMsgCSR(msg):
+    """Connectivity of a SparseMsg as compressed sparse row arrays.
+
+    Parameters
+    ----------
+    msg : melement/str
+        the SparseMsg, as returned by connect, or its path.
+
+    Returns
+    -------
+    (rowStart, columnIndex, fieldIndex) : numpy uint32 arrays
+        The connections of source i are entries rowStart[i] to
+        rowStart[i+1] of the other two arrays, which hold the index of the
+        target and, for targets such as synapses, the field index.
+
+    See also
+    --------
+    moose.setSparseMsgCSR, moose.saveSparseMsg
+    """
+    if isinstance(msg, str):
+        msg = element(msg)
+    return _moose._sparseMsgCSR(msg)
+
+
+def setSparseMsgCSR(msg, rowStart, columnIndex, fieldIndex):
+    """Replace all the connections of a SparseMsg with those given as
+    compressed sparse row arrays, as returned by sparseMsgCSR.
+
+    The columns of each row must not decrease; they repeat where a source
+    has several synapses on one target. Targets with fields, such as
+    SynHandlers, are resized to hold their synapses, as with tripletFill.
+    Raises ValueError, leaving the message as it was, if the arrays do not
+    fit its source and target.
+
+    Parameters
+    ----------
+    msg : melement/str
+        the SparseMsg, or its path.
+    rowStart, columnIndex, fieldIndex : array_like of ints
+        as returned by sparseMsgCSR.
+    """
+    if isinstance(msg, str):
+        msg = element(msg)
+    _moose._setSparseMsgCSR(msg, rowStart, columnIndex, fieldIndex)
+
+
+def saveSparseMsg(msg, filename):
+    """Save the connectivity of a SparseMsg to a numpy .npz file, to be
+    restored with loadSparseMsg.
+
+    Parameters
+    ----------
+    msg : melement/str
+        the SparseMsg, or its path.
+    filename : str
+        name of the .npz file.
+    """
+    import numpy as np
+    if isinstance(msg, str):
+        msg = element(msg)
+    rowStart, columnIndex, fieldIndex = sparseMsgCSR(msg)
+    np.savez(filename, rowStart=rowStart, columnIndex=columnIndex,
+             fieldIndex=fieldIndex,
+             shape=np.array([msg.numRows, msg.numColumns], dtype=np.uint32))
+
+
+def loadSparseMsg(msg, filename):
+    """Set the connectivity of a SparseMsg from a file written by
+    saveSparseMsg. The message must connect sources and targets of the
+    same sizes as the one that was saved.
+
+    Parameters
+    ----------
+    msg : melement/str
+        the SparseMsg, or its path.
+    filename : str
+        name of the .npz file.
+
+    Examples
+    --------
+    >>> mid = moose.connect(net, 'spikeOut', synapses, 'addSpike', 'Sparse')
+    >>> moose.loadSparseMsg(mid, 'wiring.npz')
+    """
+    import numpy as np
+    if isinstance(msg, str):
+        msg = element(msg)
+    with np.load(filename) as data:
+        if tuple(data['shape']) != (msg.numRows, msg.numColumns):
+            raise ValueError(
+                "%s holds a %d x %d matrix but %s is %d x %d." %
+                (filename, data['shape'][0], data['shape'][1], msg.path,
+                 msg.numRows, msg.numColumns))
+        setSparseMsgCSR(msg, data['rowStart'], data['columnIndex'],
+                        data['fieldIndex'])
+
+
 def delete(arg):
     """Delete the underlying moose object(s). This does not delete any of the
     Python objects referring to this vec but does invalidate them. Any
@@ -344,6 +475,42 @@ def getField(el, fieldname):
     return _moose.getField(el, fieldname)
 
 
+def fieldView(el, fieldname):
+    """Read-only numpy view of a vector field, without copying it.
+
+    Reading a field such as `Table.vector` makes a new numpy array each
+    time. For large tables, fieldView gives an array that looks at the
+    data held by the object instead. The view keeps that data alive: it
+    shows the values at the time it was taken, and stays valid after the
+    simulation runs, the field is set, or the object is deleted. The
+    object then writes to a new vector, so take a new view to see later
+    values.
+
+    Supported fields are `vector` of Table, Table2, TimeTable,
+    StimulusTable and Interpol, and `tableA` and `tableB` of HHGate. The
+    HHGate tables are changed in place, so for them the array is a copy.
+
+    Parameters
+    ----------
+    el : melement/str
+        object, or its path.
+    fieldname : str
+        name of the field.
+
+    Returns
+    -------
+    numpy.ndarray, read only.
+
+    Examples
+    --------
+    >>> vm = moose.fieldView(tab, 'vector')
+    >>> peak = vm.max()
+    """
+    if isinstance(el, str):
+        el = element(el)
+    return _moose._fieldView(el, fieldname)
+
+
 def getFieldDict(classname, finfoType=""):
     """Get dictionary of field names and types for specified class.
 
@@ -458,6 +625,140 @@ def stop():
     _moose.stop()
 
 
+def profile(enable=None):
+    """Report where the simulation spends its time.
+
+    Profiling is off by default. `moose.profile(True)` clears earlier
+    records and starts recording the wall-clock time of the process calls
+    made by later `moose.start()` calls, and `moose.profile(False)` stops
+    it. The records are kept until profiling is turned on again.
+
+    Parameters
+    ----------
+    enable : bool or None
+        Turn profiling on or off. None leaves it as it is.
+
+    Returns
+    -------
+    numpy.ndarray
+        Structured array with fields `kind`, `name`, `time` (seconds) and
+        `calls`. There is a row of kind 'tick' for each clock tick, named
+        by its number, one of kind 'class' for each class of object
+        called, and one of kind 'object' for each solver (Ksolve, Gsolve,
+        Dsolve, HSolve), Table and Streamer, named by its path. For ticks,
+        `calls` is the number of times the tick went off, otherwise the
+        number of calls to individual objects.
+
+    Examples
+    --------
+    >>> moose.profile(True)
+    >>> moose.reinit(); moose.start(1.0)
+    >>> p = moose.profile()
+    >>> p[p['kind'] == 'class'][['name', 'time']]
+    """
+    import numpy as np
+    clock = _moose.element("/clock")
+    if enable is not None:
+        clock.profiling = bool(enable)
+    rows = [n.split(":", 1) for n in clock.profileNames]
+    names = [r[1] for r in rows]
+    dtype = [("kind", "U6"), ("name", "U%d" % max([1] + [len(n) for n in names])),
+             ("time", "f8"), ("calls", "i8")]
+    ret = np.zeros(len(rows), dtype=dtype)
+    ret["kind"] = [r[0] for r in rows]
+    ret["name"] = names
+    ret["time"] = clock.profileTimes
+    ret["calls"] = clock.profileCalls
+    return ret
+
+
+def saveCheckpoint(filename, root="/"):
+    """Save the state of the simulation to a binary checkpoint file.
+
+    The checkpoint holds the current time, the values of all the assignable
+    numerical fields of the objects under `root`, the internal state of the
+    solvers (Ksolve, Gsolve, Dsolve, HSolve) and of the random number
+    generator. It does not hold the model itself.
+
+    Parameters
+    ----------
+    filename : str
+        Path of the checkpoint file.
+    root : str, melement
+        Element whose subtree is saved. Default is the whole tree.
+
+    See also
+    --------
+    moose.restoreCheckpoint
+    """
+    _moose._saveCheckpoint(filename, getattr(root, "path", root))
+
+
+def restoreCheckpoint(filename, root="/"):
+    """Restore a checkpoint saved by moose.saveCheckpoint.
+
+    Build the model the same way it was built when the checkpoint was saved,
+    call moose.reinit(), and then restore the checkpoint. The next
+    moose.start() continues the simulation from the saved time.
+
+    Parameters
+    ----------
+    filename : str
+        Path of the checkpoint file.
+    root : str, melement
+        Element whose subtree is restored. Default is the whole tree.
+
+    See also
+    --------
+    moose.saveCheckpoint
+    """
+    _moose._restoreCheckpoint(filename, getattr(root, "path", root))
+
+
+def sweep(paramSets, runtime, tables, processes=None, ordered=False):
+    """Run the model once for each set of parameters, in parallel.
+
+    Build the model first. Each run is a forked copy of this process, which
+    shares the memory of the built model until the run changes it, so the
+    model is neither rebuilt nor serialized. A run sets its parameters,
+    calls moose.reinit() and moose.start(runtime), and sends back the
+    vectors of the tables. The model in this process is not changed.
+
+    Parameters
+    ----------
+    paramSets : iterable of dict
+        One dict per run, mapping 'path.field' or (path, field) to the value
+        to set. Paths may be wildcards. A single value is set on all entries
+        of a vec, a sequence sets one value per entry.
+    runtime : float
+        Simulated time of each run.
+    tables : str, list
+        Wildcard path of the tables to record, or a list of tables or paths.
+    processes : int
+        Number of worker processes. Default is the number of CPUs.
+    ordered : bool
+        Yield the results in the order of `paramSets`. By default they are
+        yielded as the runs finish.
+
+    Yields
+    ------
+    (index, results) : (int, dict)
+        Index of the parameter set in `paramSets`, and a dict mapping the
+        path of each table to a numpy array of its vector.
+
+    Examples
+    --------
+    >>> sets = [{'/model/pulse.level[0]': x} for x in (1e-9, 2e-9)]
+    >>> for i, res in moose.sweep(sets, 0.1, '/model/##[TYPE=Table]'):
+    ...     print(i, res['/model/vm'].max())
+
+    Needs the 'fork' start method of multiprocessing (Linux, macOS).
+    """
+    from moose import sweep_utils
+
+    return sweep_utils.sweep(paramSets, runtime, tables, processes, ordered)
+
+
 def setCwe(arg):
     """Set the current working element.
 
@@ -561,6 +862,72 @@ def loadModel(filename, modelpath, solverclass="gsl"):
     return model_utils.mooseReadKkitGenesis(filename, modelpath, solverclass)
 
 
+def setModelCache(directory, maxBytes=256 * 2**20):
+    """Keep the models read by loadModel in an on-disk cache.
+
+    The first time a model file is loaded, the model built from it is saved
+    in `directory`, under a hash of the file contents and the solver class.
+    Later loads of the same file, in this or in other processes, build the
+    model from the cache instead of reading the file. When the cache holds
+    more than `maxBytes`, the least recently used models are removed.
+
+    Only kkit, cspace and SWC models are cached. The cache is off by
+    default.
+
+    Parameters
+    ----------
+    directory : str or None
+        Cache directory, made if it does not exist. None turns the cache
+        off.
+    maxBytes : int
+        Size limit of the cache. Default 256 MB.
+
+    See also
+    --------
+    moose.loadModel
+    """
+    _moose._setModelCache(str(directory) if directory else "", int(maxBytes))
+
+
+def loadSwcDir(directory, modelpath, solverclass="gsl"):
+    """Load every SWC file in a directory, one cell per file.
+
+    The cells are made under `modelpath`, which is created as a Neutral if
+    it does not exist, and are named after their files without the .swc
+    extension. Characters that are not allowed in moose names are replaced
+    by '_'.
+
+    Parameters
+    ----------
+    directory: str
+        directory holding the .swc files.
+    modelpath: str
+        moose path of the element to hold the cells.
+    solverclass: str
+        passed on to loadModel.
+
+    Returns
+    -------
+    list of melement
+        the cells, in the sorted order of their file names.
+
+    See also
+    --------
+    moose.loadModel
+    """
+    if not exists(modelpath):
+        _moose.Neutral(modelpath)
+    cells = []
+    for f in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(f)
+        if ext != ".swc":
+            continue
+        name = stem.translate(str.maketrans('[] #?"/\\', "_" * 8))
+        cells.append(loadModel(os.path.join(directory, f),
+                               modelpath + "/" + name, solverclass))
+    return cells
+
+
 def copy(src, dest, name="", n=1, toGlobal=False, copyExtMsg=False):
     """Make copies of a moose object.
 
@@ -885,6 +1252,28 @@ def doc(arg, paged=True):
         print(text)
 
 
+def readNPY(filepath):
+    """Read a numpy file written by a Streamer, without copying the data.
+
+    The file is memory mapped, and the values are read from disk as they
+    are accessed, which is much faster than numpy.load for long recordings.
+
+    Parameters
+    ----------
+    filepath : str
+        Path of a .npy file written by moose.
+
+    Returns
+    -------
+    A read-only numpy structured array with one field per column, e.g.
+    `data['time']`. It is a view into the mapped file, which stays mapped as
+    long as the array (or a view of it) exists.
+    """
+    arr, cols = _moose._readNpy(filepath)
+    dtype = [(c, arr.dtype) for c in cols]
+    return arr.view(dtype)[:, 0]
+
+
 # SBML related functions.
 def readSBML(filepath, loadpath, solver="ee", validate=True):
     """Load SBML model.
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""sweep_utils.py: run many variants of a model in parallel.
+
+The model is built once, in the calling process. Each run is a forked copy
+of that process, so it starts from the built model without rebuilding or
+reloading it: the memory of the model is shared with the parent until the
+run changes it. The run sets its parameters, calls reinit and start, and
+puts the vectors of the recorded tables in a shared memory block, from
+which the parent copies them into numpy arrays.
+
+Forking needs a platform that supports it (Linux, macOS).
+"""
+
+import multiprocessing as mp
+import secrets
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+import moose
+
+# Set in the parent before forking; the workers inherit them.
+_tablePaths = []
+_runtime = 0.0
+_blockPrefix = ''
+
+
+def _blockName(index):
+    """Name of the shared memory block of run `index`. Short enough for
+    macOS, which allows 31 characters."""
+    return '%s%d' % (_blockPrefix, index)
+
+
+def setParams(params):
+    """Set the fields given in `params`, a dict mapping 'path.field' or
+    (path, field) to a value. Paths may be wildcards. The value is set on
+    all entries of the object (a single value), or one entry each (a
+    sequence as long as the vec), as when assigning to a vec field."""
+    for key, value in params.items():
+        if isinstance(key, str):
+            path, field = key.rsplit('.', 1)
+        else:
+            path, field = key
+        if any(c in path for c in '#*['):
+            objs = moose.wildcardFind(path)
+            if not objs:
+                raise ValueError("sweep: '%s' matches no objects." % path)
+            for obj in objs:
+                setattr(obj, field, value)
+        else:
+            setattr(moose.vec(path), field, value)
+
+
+def _run(task):
+    """Runs one variant in a forked worker. Puts the table vectors in the
+    shared memory block of the run, and returns their lengths."""
+    index, params = task
+    setParams(params)
+    moose.reinit()
+    moose.start(_runtime)
+    data = [moose.fieldView(path, 'vector') for path in _tablePaths]
+    lengths = [len(d) for d in data]
+    shm = shared_memory.SharedMemory(name=_blockName(index), create=True,
+                                     size=max(8 * sum(lengths), 8))
+    out = np.ndarray(sum(lengths), dtype=np.float64, buffer=shm.buf)
+    start = 0
+    for d in data:
+        out[start:start + len(d)] = d
+        start += len(d)
+    del out
+    shm.close()
+    return index, lengths
+
+
+def _collect(name, lengths):
+    """Copies the table vectors out of a shared memory block and frees it."""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        buf = np.ndarray(sum(lengths), dtype=np.float64, buffer=shm.buf)
+        ret = {}
+        start = 0
+        for path, n in zip(_tablePaths, lengths):
+            ret[path] = buf[start:start + n].copy()
+            start += n
+        del buf
+    finally:
+        shm.close()
+        shm.unlink()
+    return ret
+
+
+def _unlink(name):
+    """Frees a shared memory block, if it was made."""
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    shm.close()
+    shm.unlink()
+
+
+def sweep(paramSets, runtime, tables, processes=None, ordered=False):
+    """Generator of the results of the runs, see moose.sweep."""
+    global _tablePaths, _runtime, _blockPrefix
+    if 'fork' not in mp.get_all_start_methods():
+        raise RuntimeError("sweep: needs the 'fork' start method, which "
+                           "this platform does not have.")
+    if isinstance(tables, str):
+        tables = moose.wildcardFind(tables)
+    _tablePaths = [t if isinstance(t, str) else t.path for t in tables]
+    _runtime = runtime
+    _blockPrefix = 'msw%s_' % secrets.token_hex(4)
+    tasks = list(enumerate(paramSets))
+    pending = set(range(len(tasks)))
+
+    # The workers must share the resource tracker of this process. A
+    # tracker started by a worker would unlink its block when the worker
+    # exits, before this process has read it.
+    resource_tracker.ensure_running()
+    ctx = mp.get_context('fork')
+    try:
+        # A fresh fork for each run, so that runs do not see each other's
+        # parameters.
+        with ctx.Pool(processes, maxtasksperchild=1) as pool:
+            imap = pool.imap if ordered else pool.imap_unordered
+            for index, lengths in imap(_run, tasks):
+                pending.discard(index)
+                yield index, _collect(_blockName(index), lengths)
+    finally:
+        # The caller stopped early: free the blocks of the runs that were
+        # not read. The pool has been terminated, so no more are made.
+        for index in pending:
+            _unlink(_blockName(index))
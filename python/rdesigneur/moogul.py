@@ -27,6 +27,7 @@ except ModuleNotFoundError:
 #from mpl_toolkits.mplot3d.art3d import Line3DCollection
 NUM_CMAP = 64
 SCALE_SCENE = 64
+DEFAULT_HISTORY_FRAMES = 1000   # Frames kept by each drawable for replay.
 bgvector = vp.vector(0.7, 0.8, 0.9)  # RGB
 bgDict = {'default': bgvector, 'black': vp.color.black, 'white': vp.color.white, 'cyan': vp.color.cyan, 'grey': vp.vector( 0.5, 0.5, 0.5 ) }
 
@@ -104,7 +105,7 @@ class MooView:
     def numFrames( self ):
         if len( self.drawables_ ) == 0:
             return 0
-        return len( self.drawables_[0].snapshot )
+        return self.drawables_[0].numFrames()
 
     def addDrawable( self, n ):
         self.drawables_.append( n )
@@ -355,6 +356,7 @@ class MooView:
         
         for i in self.drawables_:
             i.rgb = self.rgb
+            i.lastIndices_ = None
             i.drawForTheFirstTime( self.scene )
         if doOrnaments or not mergeDisplays:
             if len( center ) == 3:
@@ -601,6 +603,75 @@ class DataWrapper:
         # stub function. Derived classes fill it in and return useful values
         return [0, 1, 2, 3], [ 1, 4, 9, 16]
 
+    def numFrames( self ):
+        # Number of frames available through getFrame, for replay. None
+        # if the source can only advance, as for a running simulation,
+        # in which case the drawable keeps its own snapshots.
+        return None
+
+    def getFrame( self, idx ):
+        # Derived classes with random access to recorded frames fill it
+        # in and return simTime, values of frame idx.
+        return 0.0, self.getValues()
+
+class SnapshotHistory:
+    ''' Fixed-size store of the frames shown on a drawable, for replay.
+    Room for maxFrames frames is allocated on the first frame. When it is
+    full, every other frame is dropped and only every second frame is kept
+    from then on, and so on, so the history always spans the whole run at
+    a resolution that halves each time it fills. Values are kept as
+    float32, which is plenty for display. If spillFile is given, the
+    frames are held in a memory mapped file there instead of in RAM.
+    '''
+    def __init__( self, maxFrames = DEFAULT_HISTORY_FRAMES, spillFile = None ):
+        self.maxFrames = max( 2, maxFrames )
+        self.spillFile = spillFile
+        self.times_ = np.zeros( self.maxFrames )
+        self.vals_ = None
+        self.numFrames_ = 0
+        self.numOffered_ = 0
+        self.stride_ = 1
+
+    def __len__( self ):
+        return self.numFrames_
+
+    def __getitem__( self, idx ):
+        if idx < 0:
+            idx += self.numFrames_
+        if idx < 0 or idx >= self.numFrames_:
+            raise IndexError( "SnapshotHistory: frame {} out of range".format( idx ) )
+        return self.times_[idx], self.vals_[idx]
+
+    def append( self, simTime, val ):
+        k = self.numOffered_
+        self.numOffered_ += 1
+        if k % self.stride_ != 0:
+            return
+        if self.vals_ is None or self.vals_.shape[1] != len( val ):
+            self._allocate( len( val ) )
+        if self.numFrames_ == self.maxFrames:
+            self._decimate()
+            if k % self.stride_ != 0:
+                return
+        self.times_[self.numFrames_] = simTime
+        self.vals_[self.numFrames_] = val
+        self.numFrames_ += 1
+
+    def _allocate( self, numObj ):
+        shape = ( self.maxFrames, numObj )
+        if self.spillFile:
+            self.vals_ = np.memmap( self.spillFile, dtype = np.float32, mode = 'w+', shape = shape )
+        else:
+            self.vals_ = np.zeros( shape, dtype = np.float32 )
+        self.numFrames_ = 0
+
+    def _decimate( self ):
+        n = ( self.numFrames_ + 1 ) // 2
+        self.times_[:n] = self.times_[0:self.numFrames_:2]
+        self.vals_[:n] = self.vals_[0:self.numFrames_:2]
+        self.numFrames_ = n
+        self.stride_ *= 2
+
 class MooDrawable:
     ''' Base class for drawing things'''
     def __init__( self,
@@ -610,7 +681,9 @@ class MooDrawable:
         diaScale, 
         fieldScale, 
         autoscale,
-        valMin, valMax
+        valMin, valMax,
+        historyFrames = DEFAULT_HISTORY_FRAMES,
+        historyFile = None
     ):
         self.dataWrapper_ = dataWrapper
         self.lenScale = lenScale
@@ -621,7 +694,8 @@ class MooDrawable:
         self.valMin = valMin
         self.valMax = valMax
         self.segments = []
-        self.snapshot = []
+        self.snapshot = SnapshotHistory( historyFrames, historyFile )
+        self.lastIndices_ = None
         self.visible = True
         #cmap = plt.get_cmap( self.colormap, lut = NUM_CMAP )
         #self.rgb = [ list2vec(cmap(i)[0:3]) for i in range( NUM_CMAP ) ]
@@ -633,8 +707,8 @@ class MooDrawable:
             return
 
         if self.autoscale:
-            valMin = min( self.val )
-            valMax = max( self.val )
+            valMin = np.min( self.val )
+            valMax = np.max( self.val )
         else:
             valMin = self.valMin
             valMax = self.valMax
@@ -643,15 +717,17 @@ class MooDrawable:
         indices = np.maximum( np.minimum( scaleVal, NUM_CMAP-0.5), 0.0).astype(int)
 
         # Have to figure how this will work with multiple update rates.
-        self.snapshot.append( [simTime, self.val] )
+        # Recorded data is replayed from the source, so isn't kept here.
+        if self.dataWrapper_.numFrames() is None:
+            self.snapshot.append( simTime, self.val )
 
         self.displayValues( indices )
 
 
     def updateLimits( self, vmin, vmax ):
         if self.autoscale:
-            valMin = min( self.val )
-            valMax = max( self.val )
+            valMin = np.min( self.val )
+            valMax = np.max( self.val )
         else:
             valMin = self.valMin = vmin
             valMax = self.valMax = vmax
@@ -661,18 +737,38 @@ class MooDrawable:
 
 
     def displayValues( self, indices ):
-        for idx, seg in zip( indices, self.segments ): 
-            seg.color = self.rgb[ idx]
-            #seg.radius = self.diaScale  * self.activeDia[idx]
+        # Each colour assignment is a message to the browser, so only
+        # the segments whose colour index has changed are updated.
+        indices = np.asarray( indices )[:len( self.segments )]
+        if self.lastIndices_ is None or len( self.lastIndices_ ) != len( indices ):
+            changed = np.arange( len( indices ) )
+        else:
+            changed = np.flatnonzero( indices != self.lastIndices_ )
+        segments = self.segments
+        rgb = self.rgb
+        for i, idx in zip( changed, indices[changed] ):
+            segments[i].color = rgb[idx]
+        self.lastIndices_ = indices
+
+    def numFrames( self ):
+        numFrames = self.dataWrapper_.numFrames()
+        if numFrames is None:
+            return len( self.snapshot )
+        return numFrames
 
     def replaySnapshot( self, idx ):
-        if idx >= len( self.snapshot ):
+        if idx >= self.numFrames():
             self.animationIdx = 0
             return 0.0
-        scaleVal = NUM_CMAP * (self.snapshot[idx][1] - self.valMin) / (self.valMax - self.valMin)
+        if self.dataWrapper_.numFrames() is None:
+            simTime, val = self.snapshot[idx]
+        else:
+            simTime, val = self.dataWrapper_.getFrame( idx )
+            val = val * self.fieldScale
+        scaleVal = NUM_CMAP * (val - self.valMin) / (self.valMax - self.valMin)
         indices = np.maximum( np.minimum( scaleVal, NUM_CMAP-0.5), 0.0).astype(int)
         self.displayValues( indices )
-        return self.snapshot[idx][0]    # return frame time
+        return simTime    # return frame time
 
     def updateDiameter( self ):
         dia = self.dataWrapper_.getCoords()[:,6]
@@ -724,6 +820,7 @@ class MooNeuron( MooDrawable ):
         lenScale = 1.0, diaScale = 1.0, fieldScale = 1.0,
         autoscale = False, 
         valMin = -0.1, valMax = 0.05,
+        historyFrames = DEFAULT_HISTORY_FRAMES, historyFile = None
     ):
         #self.isFieldOnCompt = 
             #field in ( 'Vm', 'Im', 'Rm', 'Cm', 'Ra', 'inject', 'diameter' )
@@ -732,7 +829,8 @@ class MooNeuron( MooDrawable ):
                 colormap = colormap, lenScale = lenScale, 
                 diaScale = diaScale, fieldScale = fieldScale,
                 autoscale = autoscale, 
-                valMin = valMin, valMax = valMax )
+                valMin = valMin, valMax = valMax,
+                historyFrames = historyFrames, historyFile = historyFile )
         self.opacity = np.ones( dataWrapper.numObj() ) * 0.5
 
     def drawForTheFirstTime( self, _scene ):
@@ -746,14 +844,16 @@ class MooReacSystem( MooDrawable ):
         colormap = 'jet', 
         lenScale = 1e0, diaScale = 1.0, fieldScale = 1.0, 
         autoscale = False, 
-        valMin = 0.0, valMax = 1.0
+        valMin = 0.0, valMax = 1.0,
+        historyFrames = DEFAULT_HISTORY_FRAMES, historyFile = None
     ):
         
         MooDrawable.__init__( self, dataWrapper,
                 colormap = colormap, lenScale = lenScale, 
                 diaScale = diaScale, fieldScale = fieldScale, 
                 autoscale = autoscale, 
-                valMin = valMin, valMax = valMax )
+                valMin = valMin, valMax = valMax,
+                historyFrames = historyFrames, historyFile = historyFile )
         self.opacity = np.ones( dataWrapper.numObj() )
 
 
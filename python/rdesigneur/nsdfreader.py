@@ -0,0 +1,117 @@
+# nsdfreader.py: Prefetching frame reader for NSDF uniform datasets.
+# Copyright (C) Upinder S. Bhalla NCBS 2022
+# This program is licensed under the GNU Public License version 3.
+
+import threading
+from collections import OrderedDict
+import numpy as np
+
+DEFAULT_BLOCK_FRAMES = 64
+
+class NsdfFrameReader:
+    ''' Reads the frames of an NSDF uniform dataset, which is laid out as
+    [object, time], so that a frame is a column. Reading one column at a
+    time from HDF5 touches every chunk of the dataset on every frame, so
+    the reader instead reads blocks of whole chunks along the time axis,
+    on a background thread, into a bounded set of blocks. The blocks just
+    ahead of the last frame asked for are prefetched, so a sequential
+    replay rarely waits, and a jump elsewhere in the file costs one block
+    read. Memory use is bounded by numBlocks * blockFrames * numObj values
+    whatever the length of the recording.
+    The dataset can be an h5py Dataset or any 2-D array.
+    '''
+    def __init__( self, dataset, numBlocks = 8, blockFrames = None, lookahead = 2 ):
+        if len( dataset.shape ) != 2:
+            raise ValueError( "NsdfFrameReader: dataset must be 2-D, has shape {}".format( dataset.shape ) )
+        self.dataset_ = dataset
+        self.numObj_, self.numFrames_ = dataset.shape
+        chunks = getattr( dataset, 'chunks', None )
+        chunkFrames = chunks[1] if chunks else 1
+        if blockFrames is None:
+            blockFrames = max( DEFAULT_BLOCK_FRAMES, chunkFrames )
+        # Align blocks to chunk boundaries so no chunk is read twice.
+        self.blockFrames_ = chunkFrames * max( 1, -(-blockFrames // chunkFrames) )
+        self.lookahead_ = lookahead
+        self.numBlocks_ = max( numBlocks, lookahead + 1 )
+        self.blocks_ = OrderedDict()    # block index: [frame, obj], LRU order
+        self.wanted_ = []               # blocks to read, most urgent first
+        self.reading_ = None            # block being read right now
+        self.error_ = None
+        self.stop_ = False
+        self.cond_ = threading.Condition()
+        self.thread_ = threading.Thread( target = self._readLoop, daemon = True )
+        self.thread_.start()
+
+    def __len__( self ):
+        return self.numFrames_
+
+    def numFrames( self ):
+        return self.numFrames_
+
+    def numObj( self ):
+        return self.numObj_
+
+    def getFrame( self, idx ):
+        ''' Returns a read-only array with the values of all objects at
+        frame idx, waiting for its block to be read if need be.
+        '''
+        if idx < 0:
+            idx += self.numFrames_
+        if idx < 0 or idx >= self.numFrames_:
+            raise IndexError( "NsdfFrameReader: frame {} out of range [0, {})".format( idx, self.numFrames_ ) )
+        block = idx // self.blockFrames_
+        with self.cond_:
+            lastBlock = ( self.numFrames_ - 1 ) // self.blockFrames_
+            want = range( block, min( block + self.lookahead_, lastBlock ) + 1 )
+            self.wanted_ = [ b for b in want
+                    if b not in self.blocks_ and b != self.reading_ ]
+            self.cond_.notify_all()
+            while block not in self.blocks_:
+                if self.error_ is not None:
+                    raise self.error_
+                self.cond_.wait()
+            self.blocks_.move_to_end( block )
+            return self.blocks_[block][ idx - block * self.blockFrames_ ]
+
+    def close( self ):
+        ''' Stops the background thread. The reader cannot be used after. '''
+        with self.cond_:
+            self.stop_ = True
+            self.cond_.notify_all()
+        self.thread_.join()
+        self.blocks_.clear()
+
+    def _readLoop( self ):
+        while True:
+            with self.cond_:
+                while not self.wanted_ and not self.stop_:
+                    self.cond_.wait()
+                if self.stop_:
+                    return
+                block = self.wanted_.pop( 0 )
+                if block in self.blocks_:
+                    continue
+                self.reading_ = block
+            t0 = block * self.blockFrames_
+            t1 = min( t0 + self.blockFrames_, self.numFrames_ )
+            try:
+                data = np.ascontiguousarray( np.asarray( self.dataset_[:, t0:t1] ).T )
+            except Exception as e:
+                with self.cond_:
+                    self.error_ = e
+                    self.cond_.notify_all()
+                return
+            data.flags.writeable = False
+            with self.cond_:
+                self.reading_ = None
+                self.blocks_[block] = data
+                self._evict()
+                self.cond_.notify_all()
+
+    def _evict( self ):
+        # Drop the least recently used blocks, but not ones still wanted.
+        for b in list( self.blocks_ ):
+            if len( self.blocks_ ) <= self.numBlocks_:
+                break
+            if b not in self.wanted_:
+                del self.blocks_[b]
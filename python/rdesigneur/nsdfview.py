@@ -9,6 +9,7 @@ import h5py
 import time
 #import rdesigneur.moogul as moogul
 import moogul
+import nsdfreader
 mooViews = []
 
 defaultFieldRange = { 'conc': [0.0, 1.0], 'n': [0, 10], 'Vm': [-0.7, 0.02], 'Ik':[-1e-9, 1e-9], 'Ca':[0.0, 1.0] }
@@ -38,6 +39,7 @@ class NsdfNeuronDataWrapper( moogul.DataWrapper ):
         self.simTime_ = 0.0
         self.idx_ = 0
         self.dt_= nsdf["/data/uniform/{}/{}/{}".format( self.objBase_, self.objRel_, field)].attrs['dt']
+        self.reader_ = nsdfreader.NsdfFrameReader( nsdf["/data/uniform/{}/{}/{}".format( self.objBase_, self.objRel_, field)] )
         self.coords_ = np.array( nsdf['/data/static/{}/{}/coords'.format(self.objBase_, self.objRel_) ] )
         objPaths = nsdf["/map/static/{}/{}/coords".format( self.objBase_, self.objRel_)]
         self.objList_ = [ ObjHandle( path ) for path in objPaths ]
@@ -45,13 +47,17 @@ class NsdfNeuronDataWrapper( moogul.DataWrapper ):
         self.getMinMax()
 
     def getValues( self ):
-        npath = "/data/uniform/{}/{}/{}".format( self.objBase_, self.objRel_, self.field_ )
-        ret=np.array( self.nsdf_[npath][:,self.idx_] )
-        #ret = np.array( nsdf["/data/uniform/{}/{}".format( neuronName, field)][self.idx_] )
+        ret = self.reader_.getFrame( self.idx_ )
         self.idx_ += 1
         self.simTime_ = self.idx_ * self.dt_
         return ret
 
+    def numFrames( self ):
+        return self.reader_.numFrames()
+
+    def getFrame( self, idx ):
+        return idx * self.dt_, self.reader_.getFrame( idx )
+
     def getCoords( self ):
         ''' Obtains 2-D array [comptidx, coord#] from the associated cell.
         There can be any number of rows, but only 7 columns (i.e, coords).
@@ -105,6 +111,7 @@ class NsdfChemDataWrapper( moogul.DataWrapper ):
         self.simTime_ = 0.0
         self.idx_ = 0
         self.dt_= nsdf["/data/uniform/{}/{}/{}".format( self.objBase_, self.objRel_, field)].attrs['dt']
+        self.reader_ = nsdfreader.NsdfFrameReader( nsdf["/data/uniform/{}/{}/{}".format( self.objBase_, self.objRel_, field)] )
         self.coords_ = np.array( nsdf['/data/static/{}/{}/coords'.format(self.objBase_, self.objRel_) ] )
         self.meshType_ = nsdf['/data/static/{}/{}/coords'.format(self.objBase_, self.objRel_) ].attrs['meshType'].decode('utf-8')
         if self.coords_.shape[1] == 10:
@@ -115,12 +122,17 @@ class NsdfChemDataWrapper( moogul.DataWrapper ):
         self.getMinMax()
 
     def getValues( self ):
-        npath = "/data/uniform/{}/{}/{}".format( self.objBase_, self.objRel_, self.field_ )
-        ret=np.array( self.nsdf_[npath][:,self.idx_] )
+        ret = self.reader_.getFrame( self.idx_ )
         self.idx_ += 1
         self.simTime_ = self.idx_ * self.dt_
         return ret
 
+    def numFrames( self ):
+        return self.reader_.numFrames()
+
+    def getFrame( self, idx ):
+        return idx * self.dt_, self.reader_.getFrame( idx )
+
     def getCoords( self ):
         ''' Obtains 2-D array [comptidx, coord#] from the associated cell.
         There can be any number of rows, but only 7 columns (i.e, coords).
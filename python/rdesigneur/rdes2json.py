@@ -1045,11 +1045,8 @@ print( "Wall Clock Time = {:8.2f}, simtime = {:8.3f}".format( time.time() - _sta
                         tabs.vec.useSpikeMode = True # spike detect mode on
 
             vtabs = moose.vec( tabs )
-            q = 0
-            for p in [ x for x in plotObj if x != dummy ]:
-                #print( p.path, plotField, q )
-                moose.connect( vtabs[q], 'requestOut', p, plotField )
-                q += 1
+            moose.connectMany( vtabs, 'requestOut',
+                    [ x for x in plotObj if x != dummy ], plotField )
 
     def _buildMoogli( self ):
         knownFields = knownFieldsDefault
@@ -8,6 +8,7 @@
  *        License:  MIT License
  */
 
+#include <sstream>
 #include "RNG.h"
 
 namespace moose {
@@ -71,4 +72,22 @@ double RNG::uniform( void )
     return dist_( rng_ );
 }
 
+/**
+ * @brief Save the state of the engine and of the distribution, so that a
+ * restored RNG continues the same sequence of numbers.
+ */
+string RNG::getState( ) const
+{
+    ostringstream os;
+    os.precision( 17 );
+    os << seed_ << ' ' << rng_ << ' ' << dist_;
+    return os.str();
+}
+
+void RNG::setState( const string& state )
+{
+    istringstream is( state );
+    is >> seed_ >> rng_ >> dist_;
+}
+
 }
@@ -23,6 +23,7 @@
 #include <iostream>
 #include <random>
 #include <cassert>
+#include <string>
 
 #include "Definitions.h"
 #include "Distributions.h"
@@ -56,6 +57,10 @@ class RNG
 
         double uniform( void );
 
+        /// Engine and distribution state, as text, for checkpointing.
+        string getState( ) const;
+        void setState( const string& state );
+
 
     private:
         /* ====================  DATA MEMBERS  ======================================= */
@@ -51,6 +51,7 @@
 #include "../basecode/header.h"
 #include "../utility/print_function.hpp"
 #include "Clock.h"
+#include <chrono>
 
 #if PARALLELIZE_CLOCK_USING_CPP11_ASYNC
 #include <future>
@@ -187,6 +188,37 @@ const Cinfo* Clock::initCinfo()
         &Clock::isRunning
     );
 
+    static ValueFinfo< Clock, bool > profiling(
+        "profiling",
+        "When true, the wall-clock time spent in the process calls of "
+        "each tick and of each target object is recorded. Setting it "
+        "to true clears the earlier records. Off by default.",
+        &Clock::setProfiling,
+        &Clock::getProfiling
+    );
+
+    static ReadOnlyValueFinfo< Clock, vector< string > > profileNames(
+        "profileNames",
+        "Names of the profiling records: 'tick:<n>' for each tick, "
+        "'class:<name>' for each class of target object, and "
+        "'object:<path>' for each solver, Table and Streamer.",
+        &Clock::getProfileNames
+    );
+
+    static ReadOnlyValueFinfo< Clock, vector< double > > profileTimes(
+        "profileTimes",
+        "Wall-clock time in seconds of each of the profileNames.",
+        &Clock::getProfileTimes
+    );
+
+    static ReadOnlyValueFinfo< Clock, vector< double > > profileCalls(
+        "profileCalls",
+        "Number of process calls of each of the profileNames. For "
+        "ticks this is the number of times the tick went off, for "
+        "classes and objects the number of calls to individual objects.",
+        &Clock::getProfileCalls
+    );
+
     static LookupValueFinfo< Clock, unsigned int, unsigned int >
     tickStep(
         "tickStep",
@@ -268,6 +300,10 @@ const Cinfo* Clock::initCinfo()
         &currentStep,           // ReadOnlyValue
         &dts,                   // ReadOnlyValue
         &isRunning,             // ReadOnlyValue
+        &profiling,             // Value
+        &profileNames,          // ReadOnlyValue
+        &profileTimes,          // ReadOnlyValue
+        &profileCalls,          // ReadOnlyValue
         &tickStep,              // LookupValue
         &tickDt,                // LookupValue
         &defaultTick,           // ReadOnlyLookupValue
@@ -402,6 +438,7 @@ const Cinfo* Clock::initCinfo()
         "    MarkovChannel       4       50e-6\n"        
         "    SpikeGen             5      50e-6\n"
         "    HSolve               6      50e-6\n"
+        "    HSolveNet            6      50e-6\n"
         "    SpikeStats           7      50e-6\n"
         "    Table                8      0.1e-3\n"
         "    TimeTable            8      0.1e-3\n"
@@ -460,7 +497,11 @@ Clock::Clock()
       isRunning_( false ),
       doingReinit_( false ),
       info_(),
-      ticks_( Clock::numTicks, 0 )
+      ticks_( Clock::numTicks, 0 ),
+      notify_( false ),
+      profiling_( false ),
+      tickTime_( Clock::numTicks, 0.0 ),
+      tickCalls_( Clock::numTicks, 0 )
 {
     buildDefaultTick();
     dt_ = defaultDt_[0];
@@ -539,6 +580,106 @@ vector< double > Clock::getDts() const
     return ret;
 }
 
+void Clock::setProfiling( bool v )
+{
+    if ( v )
+    {
+        tickTime_.assign( Clock::numTicks, 0.0 );
+        tickCalls_.assign( Clock::numTicks, 0 );
+        elementProfile_.clear();
+    }
+    profiling_ = v;
+}
+
+bool Clock::getProfiling() const
+{
+    return profiling_;
+}
+
+/**
+ * Classes whose objects are also profiled one by one, as they usually do
+ * most of the work of a model.
+ */
+static bool isProfiledObject( const Cinfo* c )
+{
+    static const char* classes[] = {
+        "Ksolve", "Gsolve", "Dsolve", "HSolve", "HSolveNet",
+        "TableBase", "Streamer"
+    };
+    for ( unsigned int i = 0; i < sizeof( classes ) / sizeof( char* ); ++i )
+        if ( c->isA( classes[i] ) )
+            return true;
+    return false;
+}
+
+/**
+ * Fills in the profiling records, in the order ticks, classes, objects.
+ * Ticks that never went off are left out.
+ */
+void Clock::getProfile( vector< string >& names, vector< double >& times,
+                        vector< double >& calls ) const
+{
+    for ( unsigned int i = 0; i < tickTime_.size(); ++i )
+    {
+        if ( tickCalls_[i] == 0 )
+            continue;
+        names.push_back( "tick:" + to_string( i ) );
+        times.push_back( tickTime_[i] );
+        calls.push_back( tickCalls_[i] );
+    }
+    map< string, pair< double, unsigned long > > byClass;
+    map< string, pair< double, unsigned long > > byObject;
+    for ( auto i = elementProfile_.begin(); i != elementProfile_.end(); ++i )
+    {
+        const ProfileEntry& pe = i->second;
+        pair< double, unsigned long >& cl = byClass[ pe.cinfo->name() ];
+        cl.first += pe.time;
+        cl.second += pe.calls;
+        if ( isProfiledObject( pe.cinfo ) && Id::isValid( i->first ) )
+            byObject[ Id( i->first ).path() ] =
+                make_pair( pe.time, pe.calls );
+    }
+    for ( auto i = byClass.begin(); i != byClass.end(); ++i )
+    {
+        names.push_back( "class:" + i->first );
+        times.push_back( i->second.first );
+        calls.push_back( i->second.second );
+    }
+    for ( auto i = byObject.begin(); i != byObject.end(); ++i )
+    {
+        names.push_back( "object:" + i->first );
+        times.push_back( i->second.first );
+        calls.push_back( i->second.second );
+    }
+}
+
+vector< string > Clock::getProfileNames() const
+{
+    vector< string > names;
+    vector< double > times;
+    vector< double > calls;
+    getProfile( names, times, calls );
+    return names;
+}
+
+vector< double > Clock::getProfileTimes() const
+{
+    vector< string > names;
+    vector< double > times;
+    vector< double > calls;
+    getProfile( names, times, calls );
+    return times;
+}
+
+vector< double > Clock::getProfileCalls() const
+{
+    vector< string > names;
+    vector< double > times;
+    vector< double > calls;
+    getProfile( names, times, calls );
+    return calls;
+}
+
 bool Clock::isRunning() const
 {
     return isRunning_;
@@ -638,6 +779,18 @@ void Clock::stop()
     isRunning_ = 0;
 }
 
+void Clock::restoreStep( unsigned long step )
+{
+    if ( isRunning_ || doingReinit_ )
+    {
+        cout << "Clock::restoreStep: Warning: simulation in progress.\n Command ignored\n";
+        return;
+    }
+    currentStep_ = nSteps_ = step;
+    currentTime_ = info_.currTime = dt_ * step;
+    runTime_ = currentTime_;
+}
+
 /////////////////////////////////////////////////////////////////////
 // Info functions
 /////////////////////////////////////////////////////////////////////
@@ -770,7 +923,10 @@ void Clock::handleStep( const Eref& e, unsigned long numSteps )
             if ( endStep % *j == 0 )
             {
                 info_.dt = *j * dt_;
-                processVec()[*k]->send( e, &info_ );
+                if ( profiling_ )
+                    profiledProcess( e, *k );
+                else
+                    processVec()[*k]->send( e, &info_ );
             }
             ++k;
         }
@@ -800,6 +956,51 @@ void Clock::handleStep( const Eref& e, unsigned long numSteps )
     finished()->send( e );
 }
 
+void Clock::profiledProcess( const Eref& e, unsigned int tick )
+{
+    typedef std::chrono::steady_clock::time_point TimePoint;
+    const SrcFinfo1< ProcPtr >* src = processVec()[ tick ];
+    const vector< MsgDigest >& md = e.msgDigest( src->getBindIndex() );
+    TimePoint tickStart = std::chrono::steady_clock::now();
+    for ( vector< MsgDigest >::const_iterator
+            i = md.begin(); i != md.end(); ++i )
+    {
+        const OpFunc1Base< ProcPtr >* f =
+            dynamic_cast< const OpFunc1Base< ProcPtr >* >( i->func );
+        assert( f );
+        for ( vector< Eref >::const_iterator
+                j = i->targets.begin(); j != i->targets.end(); ++j )
+        {
+            Element* elm = j->element();
+            unsigned long n = 1;
+            TimePoint t0 = std::chrono::steady_clock::now();
+            if ( j->dataIndex() == ALLDATA )
+            {
+                unsigned int start = elm->localDataStart();
+                unsigned int end = start + elm->numLocalData();
+                for ( unsigned int k = start; k < end; ++k )
+                    f->op( Eref( elm, k ), &info_ );
+                n = end - start;
+            }
+            else
+            {
+                f->op( *j, &info_ );
+            }
+            std::chrono::duration< double > dt =
+                std::chrono::steady_clock::now() - t0;
+            ProfileEntry& pe = elementProfile_.emplace(
+                    elm->id().value(),
+                    ProfileEntry{ elm->cinfo(), 0.0, 0 } ).first->second;
+            pe.time += dt.count();
+            pe.calls += n;
+        }
+    }
+    std::chrono::duration< double > dt =
+        std::chrono::steady_clock::now() - tickStart;
+    tickTime_[ tick ] += dt.count();
+    tickCalls_[ tick ]++;
+}
+
 /**
  * This is the dest function that sets off the reinit.
  */
@@ -921,6 +1122,7 @@ void Clock::buildDefaultTick()
     defaultTick_["MarkovChannel"] = 4;
     defaultTick_["SpikeGen"] = 5;
     defaultTick_["HSolve"] = 6;
+    defaultTick_["HSolveNet"] = 6;
     defaultTick_["SpikeStats"] = 7;
     defaultTick_["Table"] = 8;
     defaultTick_["TimeTable"] = 8;
@@ -47,6 +47,11 @@ class Clock
     unsigned int getDefaultTick( string className ) const;
 
     vector< double > getDts() const;
+    void setProfiling( bool v );
+    bool getProfiling() const;
+    vector< string > getProfileNames() const;
+    vector< double > getProfileTimes() const;
+    vector< double > getProfileCalls() const;
 
     //////////////////////////////////////////////////////////
     //  Dest functions
@@ -57,6 +62,13 @@ class Clock
      */
     void stop();
 
+    /**
+     * Sets the clock to the end of the specified step, as if the
+     * simulation had run that far. Used when restoring a checkpoint,
+     * after reinit.
+     */
+    void restoreStep( unsigned long step );
+
     /// dest function for message to run simulation for specified time
     void handleStart( const Eref& e, double runtime, bool notify );
 
@@ -122,6 +134,16 @@ class Clock
 
     private:
     void buildTicks( const Eref& e );
+
+    /**
+     * Does the work of processVec()[tick]->send(), timing the process
+     * call of each target Element. Used instead of send when profiling.
+     */
+    void profiledProcess( const Eref& e, unsigned int tick );
+
+    /// Fills in the profileNames, profileTimes and profileCalls.
+    void getProfile( vector< string >& names, vector< double >& times,
+                     vector< double >& calls ) const;
     double runTime_;
     double currentTime_;
     unsigned long nSteps_;
@@ -176,6 +198,28 @@ class Clock
      * over.
      */
     bool notify_;
+
+    /**
+     * True when the wall-clock time of process calls is recorded.
+     */
+    bool profiling_;
+
+    /// Wall-clock time and number of calls of each Tick, when profiling.
+    vector< double > tickTime_;
+    vector< unsigned long > tickCalls_;
+
+    /**
+     * Wall-clock time and number of process calls on the objects of
+     * an Element, when profiling. The Cinfo is kept so that the time can
+     * still be reported by class after the Element is deleted.
+     */
+    struct ProfileEntry
+    {
+        const Cinfo* cinfo;
+        double time;
+        unsigned long calls;
+    };
+    unordered_map< unsigned int, ProfileEntry > elementProfile_;
 };
 
 #endif // _CLOCK_H
@@ -159,8 +159,22 @@ void testClock()
 	assert( cdata->activeTicks_[3] == 1 );
 	assert( cdata->activeTicks_[4] == 3 );
 	assert( cdata->activeTicks_[5] == 5 );
+	Field< bool >::set( clock, "profiling", true );
 	cdata->handleStart( clocker, runtime, false );
 	assert( doubleEq( cdata->getCurrentTime(), runtime ) );
+
+	// Ticks 0 to 4 and 7 have dts 2, 2, 5, 1, 3 and 5.
+	vector< string > names = Field< vector< string > >::get( clock, "profileNames" );
+	vector< double > calls = Field< vector< double > >::get( clock, "profileCalls" );
+	vector< double > times = Field< vector< double > >::get( clock, "profileTimes" );
+	assert( names.size() == 7 );
+	assert( calls.size() == 7 && times.size() == 7 );
+	assert( names[3] == "tick:3" && calls[3] == 20 );
+	assert( names[5] == "tick:7" && calls[5] == 4 );
+	assert( names[6] == "class:testSched" && calls[6] == 54 );
+	for ( unsigned int i = 0; i < times.size(); ++i )
+		assert( times[i] >= 0.0 );
+	Field< bool >::set( clock, "profiling", false );
 	test.destroy();
 	for ( unsigned int i = 0; i < Clock::numTicks; ++i )
 		cdata->ticks_[i] = 0;
@@ -0,0 +1,345 @@
+/**********************************************************************
+** This program is part of 'MOOSE', the
+** Messaging Object Oriented Simulation Environment.
+**           Copyright (C) 2003-2020 Upinder S. Bhalla. and NCBS
+** It is made available under the terms of the
+** GNU Lesser General Public License version 2.1
+** See the file COPYING.LIB for the full notice.
+**********************************************************************/
+
+#include <fstream>
+#include <sstream>
+#include "../basecode/header.h"
+#include "../randnum/randnum.h"
+#include "../scheduling/Clock.h"
+#include "../ksolve/VoxelPoolsBase.h"
+#include "../mesh/VoxelJunction.h"
+#include "../ksolve/XferInfo.h"
+#include "../ksolve/KsolveBase.h"
+#include "../hsolve/HSolveStruct.h"
+#include "../hsolve/HinesMatrix.h"
+#include "../hsolve/HSolvePassive.h"
+#include "../hsolve/RateLookup.h"
+#include "../hsolve/HSolveActive.h"
+#include "Checkpoint.h"
+#include "Shell.h"
+
+/**
+ * A checkpoint file holds, in this order:
+ *  - the magic string and the format version,
+ *  - the base dt and the current step of the Clock,
+ *  - for each element in the tree under the root: its path relative
+ *    to the root, its class, its number of objects and the values of
+ *    all its assignable double and vector< double > fields,
+ *  - the internal state of each solver in the tree, as a blob,
+ *  - the state of the global random number generator.
+ *
+ * The model itself is not stored: a checkpoint is restored into the same
+ * model, rebuilt the same way and reinited.
+ */
+static const char* checkpointMagic = "MOOSECKP";
+static const unsigned int checkpointVersion = 1;
+
+/// Top level elements that belong to the system rather than to the model.
+static bool isSystemElement( Id id )
+{
+    static const char* names[] = {
+        "classes", "Msgs", "clock", "postmaster"
+    };
+    if ( Neutral::parent( ObjId( id ) ).id != Id() )
+        return false;
+    for ( unsigned int i = 0; i < sizeof( names ) / sizeof( names[0] ); ++i )
+        if ( id.element()->getName() == names[i] )
+            return true;
+    return false;
+}
+
+/// All the elements in the tree under root, parents before their
+/// children, in a repeatable order. Each element is visited once.
+static vector< Id > checkpointElements( Id root )
+{
+    vector< Id > top;
+    if ( root == Id() )
+        Neutral::children( root.eref(), top );
+    else
+        top.push_back( root );
+
+    vector< Id > ret;
+    for ( auto i = top.cbegin(); i != top.cend(); ++i )
+        if ( !isSystemElement( *i ) )
+            ret.push_back( *i );
+    for ( unsigned int i = 0; i < ret.size(); ++i )
+    {
+        vector< Id > kids;
+        Neutral::children( ObjId( ret[i] ).eref(), kids );
+        ret.insert( ret.end(), kids.begin(), kids.end() );
+    }
+    return ret;
+}
+
+/// Path of e relative to root, so that the checkpoint can be moved.
+static string relativePath( Id e, Id root )
+{
+    if ( root == Id() )
+        return e.path();
+    string rootPath = root.path();
+    return e.path().substr( rootPath.length() );
+}
+
+vector< ObjId > checkpoint::objects( Id e )
+{
+    Element* elm = e.element();
+    vector< ObjId > ret;
+    for ( unsigned int i = 0; i < elm->numData(); ++i )
+    {
+        if ( !elm->hasFields() )
+            ret.push_back( ObjId( e, i ) );
+        else
+            for ( unsigned int j = 0; j < elm->numField( i ); ++j )
+                ret.push_back( ObjId( e, i, j ) );
+    }
+    return ret;
+}
+
+/// The assignable fields that hold doubles or vectors of doubles.
+static vector< const ValueFinfoBase* > stateFields( const Cinfo* c )
+{
+    vector< const ValueFinfoBase* > ret;
+    for ( unsigned int i = 0; i < c->getNumValueFinfo(); ++i )
+    {
+        const ValueFinfoBase* f =
+            dynamic_cast< const ValueFinfoBase* >( c->getValueFinfo( i ) );
+        if ( !f || f->innerDest().size() != 2 )
+            continue;
+        string type = f->rttiType();
+        if ( type == "double" || type == "vector<double>" )
+            ret.push_back( f );
+    }
+    return ret;
+}
+
+static KsolveBase* kineticSolver( Id e )
+{
+    const Cinfo* c = e.element()->cinfo();
+    if ( c->isA( "Ksolve" ) || c->isA( "Gsolve" ) || c->isA( "Dsolve" ) )
+        return reinterpret_cast< KsolveBase* >( e.eref().data() );
+    return 0;
+}
+
+static HSolveActive* hsolveSolver( Id e )
+{
+    if ( e.element()->cinfo()->isA( "HSolve" ) )
+        return reinterpret_cast< HSolveActive* >( e.eref().data() );
+    return 0;
+}
+
+static void saveFields( ostream& os, Id e )
+{
+    vector< ObjId > objs = checkpoint::objects( e );
+    vector< const ValueFinfoBase* > fields = stateFields( e.element()->cinfo() );
+    checkpoint::writeValue< unsigned int >( os, fields.size() );
+    for ( auto f = fields.cbegin(); f != fields.cend(); ++f )
+    {
+        const string& name = ( *f )->name();
+        checkpoint::writeString( os, name );
+        if ( ( *f )->rttiType() == "double" )
+        {
+            checkpoint::writeValue< unsigned char >( os, 0 );
+            vector< double > vals( objs.size() );
+            for ( unsigned int i = 0; i < objs.size(); ++i )
+                vals[i] = Field< double >::get( objs[i], name );
+            checkpoint::writeVec( os, vals );
+        }
+        else
+        {
+            checkpoint::writeValue< unsigned char >( os, 1 );
+            for ( auto i = objs.cbegin(); i != objs.cend(); ++i )
+                checkpoint::writeVec( os,
+                                      Field< vector< double > >::get( *i, name ) );
+        }
+    }
+}
+
+/**
+ * Reads the fields saved by saveFields for num objects, and assigns them
+ * to objs unless it is empty. Only the values that differ from the
+ * current ones are assigned, so that reinited parameters are left alone
+ * and the time-varying values are brought back.
+ */
+static void restoreFields( istream& is, const vector< ObjId >& objs,
+                           unsigned int num )
+{
+    unsigned int numFields = checkpoint::readValue< unsigned int >( is );
+    for ( unsigned int j = 0; j < numFields && is; ++j )
+    {
+        string name = checkpoint::readString( is );
+        unsigned char isVec = checkpoint::readValue< unsigned char >( is );
+        if ( isVec == 0 )
+        {
+            vector< double > vals = checkpoint::readVec< double >( is );
+            for ( unsigned int i = 0; i < objs.size() && i < vals.size(); ++i )
+                if ( Field< double >::get( objs[i], name ) != vals[i] )
+                    Field< double >::set( objs[i], name, vals[i] );
+        }
+        else
+        {
+            for ( unsigned int i = 0; i < num; ++i )
+            {
+                vector< double > vals = checkpoint::readVec< double >( is );
+                if ( i < objs.size() &&
+                        Field< vector< double > >::get( objs[i], name ) != vals )
+                    Field< vector< double > >::set( objs[i], name, vals );
+            }
+        }
+    }
+}
+
+/**
+ * Saves the state of the simulation under the element root into fileName.
+ * Returns false if the file could not be written.
+ */
+bool Shell::doSaveCheckpoint( const string& root, const string& fileName )
+	const
+{
+    Id rootId( root );
+    if ( rootId == Id() && root != "/" && root != "/root" )
+    {
+        cout << "Warning: Shell::doSaveCheckpoint: No element '" <<
+             root << "'.\n";
+        return false;
+    }
+    ofstream os( fileName.c_str(), ios::binary );
+    if ( !os )
+    {
+        cout << "Warning: Shell::doSaveCheckpoint: Cannot open '" <<
+             fileName << "' for writing.\n";
+        return false;
+    }
+
+    const Clock* clock = reinterpret_cast< const Clock* >(
+                             Id( 1 ).eref().data() );
+    os.write( checkpointMagic, 8 );
+    checkpoint::writeValue( os, checkpointVersion );
+    checkpoint::writeValue( os, clock->getDt() );
+    checkpoint::writeValue< unsigned long >( os, clock->getCurrentStep() );
+
+    vector< Id > elms = checkpointElements( rootId );
+    checkpoint::writeValue< unsigned int >( os, elms.size() );
+    for ( auto i = elms.cbegin(); i != elms.cend(); ++i )
+    {
+        checkpoint::writeString( os, relativePath( *i, rootId ) );
+        checkpoint::writeString( os, i->element()->cinfo()->name() );
+        checkpoint::writeValue< unsigned int >(
+            os, checkpoint::objects( *i ).size() );
+        saveFields( os, *i );
+    }
+
+    vector< Id > solvers;
+    for ( auto i = elms.cbegin(); i != elms.cend(); ++i )
+        if ( kineticSolver( *i ) || hsolveSolver( *i ) )
+            solvers.push_back( *i );
+    checkpoint::writeValue< unsigned int >( os, solvers.size() );
+    for ( auto i = solvers.cbegin(); i != solvers.cend(); ++i )
+    {
+        ostringstream blob;
+        if ( kineticSolver( *i ) )
+            kineticSolver( *i )->saveState( blob );
+        else
+            hsolveSolver( *i )->saveState( blob );
+        checkpoint::writeString( os, relativePath( *i, rootId ) );
+        checkpoint::writeString( os, blob.str() );
+    }
+
+    checkpoint::writeString( os, moose::rng.getState() );
+    return static_cast< bool >( os );
+}
+
+/**
+ * Restores the state saved by doSaveCheckpoint into the model under root.
+ * The model must have been built as it was when the checkpoint was saved,
+ * and reinited. Elements that cannot be matched are skipped with a
+ * warning. Returns false if the file could not be read.
+ */
+bool Shell::doRestoreCheckpoint( const string& root, const string& fileName )
+{
+    Id rootId( root );
+    if ( rootId == Id() && root != "/" && root != "/root" )
+    {
+        cout << "Warning: Shell::doRestoreCheckpoint: No element '" <<
+             root << "'.\n";
+        return false;
+    }
+    ifstream is( fileName.c_str(), ios::binary );
+    char magic[8] = { 0 };
+    is.read( magic, 8 );
+    if ( !is || string( magic, 8 ) != checkpointMagic ||
+            checkpoint::readValue< unsigned int >( is ) != checkpointVersion )
+    {
+        cout << "Warning: Shell::doRestoreCheckpoint: '" << fileName <<
+             "' is not a checkpoint file.\n";
+        return false;
+    }
+
+    Clock* clock = reinterpret_cast< Clock* >( Id( 1 ).eref().data() );
+    double dt = checkpoint::readValue< double >( is );
+    unsigned long step = checkpoint::readValue< unsigned long >( is );
+    if ( !doubleEq( dt, clock->getDt() ) )
+        cout << "Warning: Shell::doRestoreCheckpoint: Clock dt is " <<
+             clock->getDt() << " but was " << dt << " when saved.\n";
+    clock->restoreStep( step );
+
+    string rootPath = ( rootId == Id() ) ? "" : rootId.path();
+    unsigned int numMismatch = 0;
+    unsigned int numElms = checkpoint::readValue< unsigned int >( is );
+    for ( unsigned int i = 0; i < numElms && is; ++i )
+    {
+        string path = rootPath + checkpoint::readString( is );
+        string className = checkpoint::readString( is );
+        unsigned int num = checkpoint::readValue< unsigned int >( is );
+        Id e( path );
+        vector< ObjId > objs;
+        if ( e != Id() && e.element()->cinfo()->name() == className )
+            objs = checkpoint::objects( e );
+        if ( objs.size() != num )
+        {
+            cout << "Warning: Shell::doRestoreCheckpoint: '" << path <<
+                 "' does not match the saved " << className << ".\n";
+            objs.clear();
+            ++numMismatch;
+        }
+        // The fields are read even if they are not used, to get past them.
+        restoreFields( is, objs, num );
+    }
+
+    unsigned int numSolvers = checkpoint::readValue< unsigned int >( is );
+    for ( unsigned int i = 0; i < numSolvers && is; ++i )
+    {
+        string path = rootPath + checkpoint::readString( is );
+        istringstream blob( checkpoint::readString( is ) );
+        Id e( path );
+        bool ok = false;
+        if ( e != Id() && kineticSolver( e ) )
+            ok = kineticSolver( e )->restoreState( blob );
+        else if ( e != Id() && hsolveSolver( e ) )
+            ok = hsolveSolver( e )->restoreState( blob );
+        if ( !ok )
+        {
+            cout << "Warning: Shell::doRestoreCheckpoint: Could not restore "
+                 "solver '" << path << "'.\n";
+            ++numMismatch;
+        }
+    }
+
+    string rngState = checkpoint::readString( is );
+    if ( !is )
+    {
+        cout << "Warning: Shell::doRestoreCheckpoint: '" << fileName <<
+             "' is truncated.\n";
+        return false;
+    }
+    moose::rng.setState( rngState );
+    if ( numMismatch > 0 )
+        cout << "Warning: Shell::doRestoreCheckpoint: " << numMismatch <<
+             " elements could not be restored.\n";
+    return true;
+}
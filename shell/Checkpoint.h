@@ -0,0 +1,76 @@
+/**********************************************************************
+** This program is part of 'MOOSE', the
+** Messaging Object Oriented Simulation Environment.
+**           Copyright (C) 2003-2020 Upinder S. Bhalla. and NCBS
+** It is made available under the terms of the
+** GNU Lesser General Public License version 2.1
+** See the file COPYING.LIB for the full notice.
+**********************************************************************/
+
+#ifndef _CHECKPOINT_H
+#define _CHECKPOINT_H
+
+#include <iostream>
+#include <string>
+#include <vector>
+
+class Id;
+class ObjId;
+
+/**
+ * Binary IO for checkpoint files. Values are written in native byte
+ * order, so a checkpoint is only meant to be read back on the same
+ * kind of machine. Solvers use these to write their state blobs from
+ * saveState and read them in restoreState.
+ */
+namespace checkpoint
+{
+/// All the objects of e, with the entries of field elements flattened.
+std::vector< ObjId > objects( Id e );
+
+template< class T > void writeValue( std::ostream& os, const T& v )
+{
+    os.write( reinterpret_cast< const char* >( &v ), sizeof( T ) );
+}
+
+template< class T > T readValue( std::istream& is )
+{
+    T v = T();
+    is.read( reinterpret_cast< char* >( &v ), sizeof( T ) );
+    return v;
+}
+
+inline void writeString( std::ostream& os, const std::string& s )
+{
+    writeValue< unsigned long >( os, s.size() );
+    os.write( s.data(), s.size() );
+}
+
+inline std::string readString( std::istream& is )
+{
+    unsigned long n = readValue< unsigned long >( is );
+    std::string s( n, '\0' );
+    if ( n > 0 )
+        is.read( &s[0], n );
+    return s;
+}
+
+template< class T > void writeVec( std::ostream& os, const std::vector< T >& v )
+{
+    writeValue< unsigned long >( os, v.size() );
+    if ( !v.empty() )
+        os.write( reinterpret_cast< const char* >( v.data() ),
+                  v.size() * sizeof( T ) );
+}
+
+template< class T > std::vector< T > readVec( std::istream& is )
+{
+    unsigned long n = readValue< unsigned long >( is );
+    std::vector< T > v( n );
+    if ( n > 0 )
+        is.read( reinterpret_cast< char* >( v.data() ), n * sizeof( T ) );
+    return v;
+}
+}
+
+#endif // _CHECKPOINT_H
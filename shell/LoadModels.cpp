@@ -13,6 +13,8 @@
 #include "../utility/strutil.h"
 #include "../utility/Vec.h"
 #include "LoadModels.h" // For the ModelType enum.
+#include "ModelCache.h"
+#include "../scheduling/Clock.h"
 
 #include "../biophysics/ReadCell.h"
 #include "../biophysics/SwcSegment.h"
@@ -128,30 +130,17 @@ bool findModelParent( Id cwe, const string& path,
     return 0;
 }
 
-/// Returns the Id of the loaded model.
-Id Shell::doLoadModel( const string& fileName, const string& modelPath, const string& solverClass )
+/// Builds the model in the file with the loader for its type.
+static Id loadModelFile( Shell* s, ModelType type, const string& fileName,
+                         const string& line, Id parentId,
+                         const string& modelName, const string& solverClass )
 {
-    ifstream fin( fileName.c_str() );
-    if ( !fin )
-    {
-        LOG( moose::failed, "Shell::doLoadModel: could not open file " << fileName );
-        return Id();
-    }
-
-    string modelName;
-    Id parentId;
-
-    if ( !( findModelParent ( cwe_, modelPath, parentId, modelName ) ) )
-        return Id();
-
-    string line;
-    switch ( findModelType( fileName, fin, line ) )
+    switch ( type )
     {
     case DOTP:
     {
         ReadCell rc;
         return rc.read( fileName, modelName, parentId );
-        return Id();
     }
     case SWC:
     {
@@ -160,7 +149,7 @@ Id Shell::doLoadModel( const string& fileName, const string& modelPath, const st
         Id model = parentId;
         if ( !parentId.element()->cinfo()->isA( "Neuron" ) )
         {
-            model = doCreate( "Neuron", parentId, modelName, 1 );
+            model = s->doCreate( "Neuron", parentId, modelName, 1 );
         }
         rs.build( model, 0.5e-3, 1.0, 1.0, 0.01 );
         return model;
@@ -188,3 +177,50 @@ Id Shell::doLoadModel( const string& fileName, const string& modelPath, const st
     }
     return Id();
 }
+
+/// Returns the Id of the loaded model.
+Id Shell::doLoadModel( const string& fileName, const string& modelPath, const string& solverClass )
+{
+    ifstream fin( fileName.c_str() );
+    if ( !fin )
+    {
+        LOG( moose::failed, "Shell::doLoadModel: could not open file " << fileName );
+        return Id();
+    }
+
+    string modelName;
+    Id parentId;
+
+    if ( !( findModelParent ( cwe_, modelPath, parentId, modelName ) ) )
+        return Id();
+
+    string line;
+    ModelType type = findModelType( fileName, fin, line );
+
+    // Models are taken from the cache, or put into it, only when they
+    // are self-contained and built as a new element. .p files use
+    // channel prototypes from /library, which the cache can't see.
+    string cacheKey;
+    if ( ModelCache::isEnabled() && type != DOTP && type != UNKNOWN &&
+            Neutral::child( parentId.eref(), modelName ) == Id() )
+    {
+        cacheKey = ModelCache::key( fileName, type, solverClass );
+        if ( !cacheKey.empty() )
+        {
+            Id ret = ModelCache::load( cacheKey, parentId, modelName );
+            if ( ret != Id() )
+                return ret;
+        }
+    }
+
+    const Clock* clock = reinterpret_cast< const Clock* >(
+                             Id( 1 ).eref().data() );
+    vector< double > tickDts = clock->getDts();
+    Id ret = loadModelFile( this, type, fileName, line, parentId,
+                            modelName, solverClass );
+    if ( !cacheKey.empty() && ret != Id() &&
+            Neutral::parent( ObjId( ret ) ).id == parentId &&
+            ret.element()->getName() == modelName )
+        ModelCache::save( cacheKey, ret, tickDts, type == KKIT );
+    return ret;
+}
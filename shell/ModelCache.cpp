@@ -0,0 +1,816 @@
+/**********************************************************************
+** This program is part of 'MOOSE', the
+** Messaging Object Oriented Simulation Environment.
+**           Copyright (C) 2003-2020 Upinder S. Bhalla. and NCBS
+** It is made available under the terms of the
+** GNU Lesser General Public License version 2.1
+** See the file COPYING.LIB for the full notice.
+**********************************************************************/
+
+#include <fstream>
+#include <filesystem>
+#include <random>
+#include "../basecode/header.h"
+#include "../msg/SingleMsg.h"
+#include "../msg/DiagonalMsg.h"
+#include "../msg/OneToOneMsg.h"
+#include "../msg/OneToAllMsg.h"
+#include "../scheduling/Clock.h"
+#include "Checkpoint.h"
+#include "Shell.h"
+#include "ModelCache.h"
+
+namespace fs = std::filesystem;
+
+/**
+ * A cache file holds, in this order:
+ *  - the magic string and the format version,
+ *  - whether to reinit after loading,
+ *  - the Clock ticks whose dt the loader changed, with their dts,
+ *  - for each element of the model, parents first: its name, class,
+ *    parent (as an index into the list of elements, the root has none),
+ *    number of entries, clock tick, and the values of its assignable
+ *    fields,
+ *  - the messages between the elements.
+ * Elements are referred to by their index in the list throughout, so
+ * that the model can be rebuilt without path lookups, under any name.
+ */
+static const char* cacheMagic = "MOOSEMDL";
+static const unsigned int cacheVersion = 1;
+static const char* cacheSuffix = ".mmc";
+
+string ModelCache::dir_ = "";
+unsigned long ModelCache::maxBytes_ = 0;
+
+namespace
+{
+enum FieldType { DOUBLE, DOUBLE_VEC, STRING, OBJID, ID };
+
+/// A reference from a field to an object, in or out of the model.
+struct ObjRef
+{
+    int elm;        /// Index of the element, or -1 if outside the model.
+    unsigned int dataIndex;
+    unsigned int fieldIndex;
+    string path;    /// Path, if outside the model.
+};
+
+struct FieldRecord
+{
+    string name;
+    unsigned char type;
+    vector< double > d;
+    vector< vector< double > > dv;
+    vector< string > s;
+    vector< ObjRef > r;
+};
+
+struct ElementRecord
+{
+    string name;
+    string className;
+    int parent;
+    unsigned int parentData;
+    unsigned int numData;
+    int tick;
+    unsigned char isGlobal;
+    unsigned int numObj;
+    vector< FieldRecord > fields;
+};
+
+struct MsgRecord
+{
+    string type;
+    unsigned int src;
+    unsigned int srcData;
+    string srcField;
+    unsigned int dest;
+    unsigned int destData;
+    unsigned int destFieldIndex;
+    string destField;
+    int stride;
+};
+
+/// Hash used to name the cache files, 64 bit FNV-1a.
+class Fnv
+{
+public:
+    Fnv() : h_( 14695981039346656037ULL ) {;}
+    void add( const char* p, size_t n )
+    {
+        for ( size_t i = 0; i < n; ++i )
+        {
+            h_ ^= static_cast< unsigned char >( p[i] );
+            h_ *= 1099511628211ULL;
+        }
+    }
+    string hex() const
+    {
+        char buf[17];
+        snprintf( buf, sizeof( buf ), "%016llx",
+                  static_cast< unsigned long long >( h_ ) );
+        return buf;
+    }
+private:
+    unsigned long long h_;
+};
+
+Shell* shell()
+{
+    return reinterpret_cast< Shell* >( Id().eref().data() );
+}
+
+/// Solvers hold state that is not in their fields.
+bool isSolver( const Cinfo* c )
+{
+    static const char* names[] = {
+        "Stoich", "Ksolve", "Gsolve", "Dsolve", "HSolve"
+    };
+    for ( unsigned int i = 0; i < sizeof( names ) / sizeof( names[0] ); ++i )
+        if ( c->isA( names[i] ) )
+            return true;
+    return false;
+}
+
+/**
+ * The assignable fields to save. Those of Neutral are handled through
+ * the element itself, and fields of types that can't be written and
+ * read back exactly are left out.
+ */
+vector< const ValueFinfoBase* > cacheFields( const Cinfo* c )
+{
+    static const Cinfo* neutral = Neutral::initCinfo();
+    vector< const ValueFinfoBase* > ret;
+    for ( unsigned int i = 0; i < c->getNumValueFinfo(); ++i )
+    {
+        const ValueFinfoBase* f =
+            dynamic_cast< const ValueFinfoBase* >( c->getValueFinfo( i ) );
+        if ( !f || f->innerDest().size() != 2 ||
+                neutral->findFinfo( f->name() ) )
+            continue;
+        string type = f->rttiType();
+        if ( type == "double" || type == "vector<double>" ||
+                type == "string" || type == "int" ||
+                type == "unsigned int" || type == "long" ||
+                type == "unsigned long" || type == "bool" ||
+                type == "ObjId" || type == "Id" )
+            ret.push_back( f );
+    }
+    return ret;
+}
+
+unsigned char fieldType( const string& rtti )
+{
+    if ( rtti == "double" )
+        return DOUBLE;
+    if ( rtti == "vector<double>" )
+        return DOUBLE_VEC;
+    if ( rtti == "ObjId" )
+        return OBJID;
+    if ( rtti == "Id" )
+        return ID;
+    return STRING;
+}
+
+ObjRef makeRef( ObjId oid, const map< Id, unsigned int >& index )
+{
+    ObjRef ret = { -1, oid.dataIndex, oid.fieldIndex, "" };
+    auto i = index.find( oid.id );
+    if ( i != index.end() )
+        ret.elm = i->second;
+    else
+        ret.path = oid.path();
+    return ret;
+}
+
+ObjId findRef( const ObjRef& r, const vector< Id >& elms )
+{
+    if ( r.elm < 0 )
+        return ObjId( r.path );
+    if ( static_cast< unsigned int >( r.elm ) >= elms.size() ||
+            elms[ r.elm ] == Id() )
+        return ObjId( 0, BADINDEX );
+    return ObjId( elms[ r.elm ], r.dataIndex, r.fieldIndex );
+}
+
+void writeRef( ostream& os, const ObjRef& r )
+{
+    checkpoint::writeValue( os, r.elm );
+    checkpoint::writeValue( os, r.dataIndex );
+    checkpoint::writeValue( os, r.fieldIndex );
+    checkpoint::writeString( os, r.path );
+}
+
+ObjRef readRef( istream& is )
+{
+    ObjRef r;
+    r.elm = checkpoint::readValue< int >( is );
+    r.dataIndex = checkpoint::readValue< unsigned int >( is );
+    r.fieldIndex = checkpoint::readValue< unsigned int >( is );
+    r.path = checkpoint::readString( is );
+    return r;
+}
+
+FieldRecord saveField( const ValueFinfoBase* f, const vector< ObjId >& objs,
+                       const map< Id, unsigned int >& index )
+{
+    FieldRecord rec;
+    rec.name = f->name();
+    rec.type = fieldType( f->rttiType() );
+    for ( auto i = objs.cbegin(); i != objs.cend(); ++i )
+    {
+        switch ( rec.type )
+        {
+        case DOUBLE:
+            rec.d.push_back( Field< double >::get( *i, rec.name ) );
+            break;
+        case DOUBLE_VEC:
+            rec.dv.push_back( Field< vector< double > >::get( *i, rec.name ) );
+            break;
+        case OBJID:
+            rec.r.push_back(
+                makeRef( Field< ObjId >::get( *i, rec.name ), index ) );
+            break;
+        case ID:
+            rec.r.push_back(
+                makeRef( ObjId( Field< Id >::get( *i, rec.name ) ), index ) );
+            break;
+        default:
+        {
+            string val;
+            SetGet::strGet( *i, rec.name, val );
+            rec.s.push_back( val );
+        }
+        }
+    }
+    return rec;
+}
+
+void writeField( ostream& os, const FieldRecord& rec )
+{
+    checkpoint::writeString( os, rec.name );
+    checkpoint::writeValue( os, rec.type );
+    if ( rec.type == DOUBLE )
+        checkpoint::writeVec( os, rec.d );
+    else if ( rec.type == DOUBLE_VEC )
+        for ( auto i = rec.dv.cbegin(); i != rec.dv.cend(); ++i )
+            checkpoint::writeVec( os, *i );
+    else if ( rec.type == OBJID || rec.type == ID )
+        for ( auto i = rec.r.cbegin(); i != rec.r.cend(); ++i )
+            writeRef( os, *i );
+    else
+        for ( auto i = rec.s.cbegin(); i != rec.s.cend(); ++i )
+            checkpoint::writeString( os, *i );
+}
+
+FieldRecord readField( istream& is, unsigned int numObj )
+{
+    FieldRecord rec;
+    rec.name = checkpoint::readString( is );
+    rec.type = checkpoint::readValue< unsigned char >( is );
+    if ( rec.type == DOUBLE )
+        rec.d = checkpoint::readVec< double >( is );
+    else if ( rec.type == DOUBLE_VEC )
+        for ( unsigned int i = 0; i < numObj && is; ++i )
+            rec.dv.push_back( checkpoint::readVec< double >( is ) );
+    else if ( rec.type == OBJID || rec.type == ID )
+        for ( unsigned int i = 0; i < numObj && is; ++i )
+            rec.r.push_back( readRef( is ) );
+    else
+        for ( unsigned int i = 0; i < numObj && is; ++i )
+            rec.s.push_back( checkpoint::readString( is ) );
+    return rec;
+}
+
+/**
+ * Assigns the saved values that differ from the current ones. Returns
+ * the number assigned.
+ */
+unsigned int restoreField( const FieldRecord& rec, const vector< ObjId >& objs,
+                           const vector< Id >& elms )
+{
+    unsigned int numSet = 0;
+    for ( unsigned int i = 0; i < objs.size(); ++i )
+    {
+        const ObjId& o = objs[i];
+        switch ( rec.type )
+        {
+        case DOUBLE:
+            if ( Field< double >::get( o, rec.name ) != rec.d[i] )
+            {
+                Field< double >::set( o, rec.name, rec.d[i] );
+                ++numSet;
+            }
+            break;
+        case DOUBLE_VEC:
+            if ( Field< vector< double > >::get( o, rec.name ) != rec.dv[i] )
+            {
+                Field< vector< double > >::set( o, rec.name, rec.dv[i] );
+                ++numSet;
+            }
+            break;
+        case OBJID:
+        {
+            ObjId val = findRef( rec.r[i], elms );
+            if ( !val.bad() && Field< ObjId >::get( o, rec.name ) != val )
+            {
+                Field< ObjId >::set( o, rec.name, val );
+                ++numSet;
+            }
+            break;
+        }
+        case ID:
+        {
+            ObjId val = findRef( rec.r[i], elms );
+            if ( !val.bad() && Field< Id >::get( o, rec.name ) != val.id )
+            {
+                Field< Id >::set( o, rec.name, val.id );
+                ++numSet;
+            }
+            break;
+        }
+        default:
+        {
+            string val;
+            SetGet::strGet( o, rec.name, val );
+            if ( val != rec.s[i] )
+            {
+                SetGet::strSet( o, rec.name, rec.s[i] );
+                ++numSet;
+            }
+        }
+        }
+    }
+    return numSet;
+}
+
+bool containsAll( const vector< SrcFinfo* >& finfos,
+                  const vector< string >& names )
+{
+    for ( auto n = names.cbegin(); n != names.cend(); ++n )
+    {
+        bool found = false;
+        for ( auto f = finfos.cbegin(); f != finfos.cend(); ++f )
+            found = found || ( *f )->name() == *n;
+        if ( !found )
+            return false;
+    }
+    return true;
+}
+
+/**
+ * Finds the fields to pass to doAddMsg to remake m. A plain message has
+ * one SrcFinfo and one DestFinfo; a shared one is matched to the pair of
+ * SharedFinfos that hold its SrcFinfos on each side. Returns false if no
+ * such fields are found.
+ */
+bool msgFields( const Msg* m, string& srcField, string& destField )
+{
+    vector< string > src1 = m->getSrcFieldsOnE1();
+    vector< string > src2 = m->getSrcFieldsOnE2();
+    vector< string > dest2 = m->getDestFieldsOnE2();
+    if ( src2.empty() && src1.size() == 1 && dest2.size() == 1 )
+    {
+        srcField = src1[0];
+        destField = dest2[0];
+        return true;
+    }
+    Cinfo* c1 = const_cast< Cinfo* >( m->e1()->cinfo() );
+    Cinfo* c2 = const_cast< Cinfo* >( m->e2()->cinfo() );
+    for ( unsigned int i = 0; i < c1->getNumSharedFinfo(); ++i )
+    {
+        const SharedFinfo* f1 =
+            dynamic_cast< const SharedFinfo* >( c1->getSharedFinfo( i ) );
+        if ( !f1 || !containsAll( f1->src(), src1 ) )
+            continue;
+        for ( unsigned int j = 0; j < c2->getNumSharedFinfo(); ++j )
+        {
+            const SharedFinfo* f2 =
+                dynamic_cast< const SharedFinfo* >( c2->getSharedFinfo( j ) );
+            if ( f2 && containsAll( f2->src(), src2 ) &&
+                    f1->checkTarget( f2 ) )
+            {
+                srcField = f1->name();
+                destField = f2->name();
+                return true;
+            }
+        }
+    }
+    return false;
+}
+
+/**
+ * Describes the messages going out of element e to the others in the
+ * model. Returns false if one of them can't be remade from the cache.
+ */
+bool saveMsgs( Id e, const map< Id, unsigned int >& index,
+               vector< MsgRecord >& msgs )
+{
+    const vector< ObjId >& mids = e.element()->msgIn();
+    for ( auto mid = mids.cbegin(); mid != mids.cend(); ++mid )
+    {
+        const Msg* m = Msg::getMsg( *mid );
+        if ( m->e1() != e.element() )
+            continue;
+        vector< string > src1 = m->getSrcFieldsOnE1();
+        if ( src1.size() == 1 && src1[0] == "childOut" )
+            continue;
+        auto dest = index.find( m->e2()->id() );
+        if ( dest == index.end() )
+            return false;
+        MsgRecord rec = { "", index.at( e ), 0, "", dest->second, 0, 0, "", 0 };
+        if ( !msgFields( m, rec.srcField, rec.destField ) )
+            return false;
+        if ( const SingleMsg* sm = dynamic_cast< const SingleMsg* >( m ) )
+        {
+            rec.type = "Single";
+            rec.srcData = sm->getI1();
+            rec.destData = sm->getI2();
+            rec.destFieldIndex = sm->getTargetField();
+        }
+        else if ( const OneToAllMsg* am = dynamic_cast< const OneToAllMsg* >( m ) )
+        {
+            rec.type = "OneToAll";
+            rec.srcData = am->getI1();
+        }
+        else if ( const OneToOneMsg* om = dynamic_cast< const OneToOneMsg* >( m ) )
+        {
+            rec.type = "OneToOne";
+            rec.srcData = om->getI1();
+            rec.destData = om->getI2();
+        }
+        else if ( const DiagonalMsg* dm = dynamic_cast< const DiagonalMsg* >( m ) )
+        {
+            rec.type = "Diagonal";
+            rec.stride = dm->getStride();
+        }
+        else
+        {
+            return false;
+        }
+        msgs.push_back( rec );
+    }
+    return true;
+}
+
+void writeMsg( ostream& os, const MsgRecord& rec )
+{
+    checkpoint::writeString( os, rec.type );
+    checkpoint::writeValue( os, rec.src );
+    checkpoint::writeValue( os, rec.srcData );
+    checkpoint::writeString( os, rec.srcField );
+    checkpoint::writeValue( os, rec.dest );
+    checkpoint::writeValue( os, rec.destData );
+    checkpoint::writeValue( os, rec.destFieldIndex );
+    checkpoint::writeString( os, rec.destField );
+    checkpoint::writeValue( os, rec.stride );
+}
+
+MsgRecord readMsg( istream& is )
+{
+    MsgRecord rec;
+    rec.type = checkpoint::readString( is );
+    rec.src = checkpoint::readValue< unsigned int >( is );
+    rec.srcData = checkpoint::readValue< unsigned int >( is );
+    rec.srcField = checkpoint::readString( is );
+    rec.dest = checkpoint::readValue< unsigned int >( is );
+    rec.destData = checkpoint::readValue< unsigned int >( is );
+    rec.destFieldIndex = checkpoint::readValue< unsigned int >( is );
+    rec.destField = checkpoint::readString( is );
+    rec.stride = checkpoint::readValue< int >( is );
+    return rec;
+}
+
+bool addMsg( const MsgRecord& rec, const vector< Id >& elms )
+{
+    if ( rec.src >= elms.size() || rec.dest >= elms.size() ||
+            elms[ rec.src ] == Id() || elms[ rec.dest ] == Id() )
+        return false;
+    ObjId mid = shell()->doAddMsg( rec.type,
+                                   ObjId( elms[ rec.src ], rec.srcData ), rec.srcField,
+                                   ObjId( elms[ rec.dest ], rec.destData, rec.destFieldIndex ),
+                                   rec.destField );
+    if ( mid.bad() )
+        return false;
+    if ( rec.type == "Diagonal" )
+        Field< int >::set( mid, "stride", rec.stride );
+    return true;
+}
+
+/// The elements of the model, each after its parent.
+vector< Id > modelElements( Id model )
+{
+    vector< Id > ret( 1, model );
+    for ( unsigned int i = 0; i < ret.size(); ++i )
+    {
+        vector< Id > kids;
+        Neutral::children( ObjId( ret[i] ).eref(), kids );
+        ret.insert( ret.end(), kids.begin(), kids.end() );
+    }
+    return ret;
+}
+}
+
+///////////////////////////////////////////////////////////////////////////
+
+void ModelCache::setDirectory( const string& dir, unsigned long maxBytes )
+{
+    dir_ = dir;
+    maxBytes_ = maxBytes;
+    if ( dir_.empty() )
+        return;
+    std::error_code ec;
+    fs::create_directories( dir_, ec );
+    if ( ec )
+    {
+        cout << "Warning: ModelCache::setDirectory: Cannot make '" << dir <<
+             "': " << ec.message() << ". Model cache is off.\n";
+        dir_ = "";
+        return;
+    }
+    evict();
+}
+
+string ModelCache::getDirectory()
+{
+    return dir_;
+}
+
+unsigned long ModelCache::getMaxBytes()
+{
+    return maxBytes_;
+}
+
+bool ModelCache::isEnabled()
+{
+    return !dir_.empty();
+}
+
+string ModelCache::key( const string& fileName, int modelType,
+                        const string& solverClass )
+{
+    ifstream fin( fileName.c_str(), ios::binary );
+    if ( !fin )
+        return "";
+    Fnv h;
+    h.add( reinterpret_cast< const char* >( &cacheVersion ),
+           sizeof( cacheVersion ) );
+    h.add( reinterpret_cast< const char* >( &modelType ), sizeof( modelType ) );
+    h.add( solverClass.c_str(), solverClass.size() + 1 );
+    vector< char > buf( 1 << 16 );
+    while ( fin.read( buf.data(), buf.size() ) || fin.gcount() > 0 )
+        h.add( buf.data(), fin.gcount() );
+    return h.hex();
+}
+
+Id ModelCache::load( const string& key, Id parent, const string& name )
+{
+    fs::path file = fs::path( dir_ ) / ( key + cacheSuffix );
+    ifstream is( file, ios::binary );
+    if ( !is )
+        return Id();
+    char magic[8] = { 0 };
+    is.read( magic, 8 );
+    if ( !is || string( magic, 8 ) != cacheMagic ||
+            checkpoint::readValue< unsigned int >( is ) != cacheVersion )
+        return Id();
+
+    bool reinit = checkpoint::readValue< unsigned char >( is );
+    vector< unsigned int > ticks = checkpoint::readVec< unsigned int >( is );
+    vector< double > dts = checkpoint::readVec< double >( is );
+    vector< ElementRecord > recs(
+        checkpoint::readValue< unsigned int >( is ) );
+    for ( auto r = recs.begin(); r != recs.end() && is; ++r )
+    {
+        r->name = checkpoint::readString( is );
+        r->className = checkpoint::readString( is );
+        r->parent = checkpoint::readValue< int >( is );
+        r->parentData = checkpoint::readValue< unsigned int >( is );
+        r->numData = checkpoint::readValue< unsigned int >( is );
+        r->tick = checkpoint::readValue< int >( is );
+        r->isGlobal = checkpoint::readValue< unsigned char >( is );
+        r->numObj = checkpoint::readValue< unsigned int >( is );
+        r->fields.resize( checkpoint::readValue< unsigned int >( is ) );
+        for ( auto f = r->fields.begin(); f != r->fields.end() && is; ++f )
+            *f = readField( is, r->numObj );
+    }
+    vector< MsgRecord > msgs( checkpoint::readValue< unsigned int >( is ) );
+    for ( auto m = msgs.begin(); m != msgs.end() && is; ++m )
+        *m = readMsg( is );
+    if ( !is || recs.empty() )
+    {
+        cout << "Warning: ModelCache::load: '" << file.string() <<
+             "' is truncated.\n";
+        return Id();
+    }
+
+    // Make the elements. Some exist already, made with their parents
+    // or by assigning fields of their parents; those that are still
+    // missing are looked for again as the fields are assigned.
+    Shell* s = shell();
+    vector< Id > elms( recs.size() );
+    for ( unsigned int i = 0; i < recs.size(); ++i )
+    {
+        const ElementRecord& r = recs[i];
+        if ( i > 0 && ( r.parent < 0 || static_cast< unsigned int >(
+                            r.parent ) >= i ) )
+            break;
+        if ( i > 0 && elms[ r.parent ] == Id() )
+            continue;
+        ObjId pa = ( i == 0 ) ? ObjId( parent ) :
+                   ObjId( elms[ r.parent ], r.parentData );
+        string elmName = ( i == 0 ) ? name : r.name;
+        Id e = Neutral::child( pa.eref(), elmName );
+        if ( e == Id() )
+        {
+            const Cinfo* c = Cinfo::find( r.className );
+            if ( c && !c->banCreation() )
+                e = s->doCreate( r.className, pa, elmName, r.numData,
+                                 r.isGlobal ? MooseGlobal : MooseBlockBalance );
+        }
+        elms[i] = e;
+    }
+
+    bool ok = elms[0] != Id();
+    vector< const MsgRecord* > pending;
+    for ( auto m = msgs.cbegin(); ok && m != msgs.cend(); ++m )
+        if ( !addMsg( *m, elms ) )
+            pending.push_back( &*m );
+
+    // The setters of some fields depend on others, so the fields are
+    // assigned until they all hold their saved values.
+    const unsigned int maxPasses = 3;
+    for ( unsigned int pass = 0; ok && pass < maxPasses; ++pass )
+    {
+        unsigned int numSet = 0;
+        for ( unsigned int i = 0; ok && i < recs.size(); ++i )
+        {
+            const ElementRecord& r = recs[i];
+            if ( elms[i] == Id() && i > 0 && elms[ r.parent ] != Id() )
+                elms[i] = Neutral::child(
+                              ObjId( elms[ r.parent ], r.parentData ).eref(), r.name );
+            if ( elms[i] == Id() )
+                continue;
+            if ( elms[i].element()->cinfo()->name() != r.className )
+            {
+                ok = false;
+                break;
+            }
+            vector< ObjId > objs = checkpoint::objects( elms[i] );
+            if ( objs.size() != r.numObj )
+                continue;
+            for ( auto f = r.fields.cbegin(); f != r.fields.cend(); ++f )
+                numSet += restoreField( *f, objs, elms );
+        }
+        vector< const MsgRecord* > stillPending;
+        for ( auto m = pending.cbegin(); m != pending.cend(); ++m )
+            if ( !addMsg( **m, elms ) )
+                stillPending.push_back( *m );
+        pending.swap( stillPending );
+        if ( numSet == 0 )
+            break;
+    }
+    for ( unsigned int i = 0; ok && i < recs.size(); ++i )
+    {
+        if ( elms[i] == Id() ||
+                checkpoint::objects( elms[i] ).size() != recs[i].numObj )
+            ok = false;
+        else if ( elms[i].element()->getTick() != recs[i].tick )
+            elms[i].element()->setTick( recs[i].tick );
+    }
+    if ( !ok || !pending.empty() )
+    {
+        cout << "Warning: ModelCache::load: Could not rebuild the model in '"
+             << file.string() << "', removing it.\n";
+        if ( elms[0] != Id() )
+            s->doDelete( elms[0] );
+        std::error_code ec;
+        fs::remove( file, ec );
+        return Id();
+    }
+
+    for ( unsigned int i = 0; i < ticks.size() && i < dts.size(); ++i )
+        s->doSetClock( ticks[i], dts[i] );
+    if ( reinit )
+        s->doReinit();
+
+    // Mark the file as recently used.
+    std::error_code ec;
+    fs::last_write_time( file, fs::file_time_type::clock::now(), ec );
+    return elms[0];
+}
+
+bool ModelCache::save( const string& key, Id model,
+                       const vector< double >& tickDts, bool reinit )
+{
+    vector< Id > elms = modelElements( model );
+    map< Id, unsigned int > index;
+    for ( unsigned int i = 0; i < elms.size(); ++i )
+    {
+        if ( isSolver( elms[i].element()->cinfo() ) )
+            return false;
+        index[ elms[i] ] = i;
+    }
+
+    vector< MsgRecord > msgs;
+    for ( auto e = elms.cbegin(); e != elms.cend(); ++e )
+        if ( !saveMsgs( *e, index, msgs ) )
+            return false;
+
+    const Clock* clock = reinterpret_cast< const Clock* >(
+                             Id( 1 ).eref().data() );
+    vector< unsigned int > ticks;
+    vector< double > dts;
+    for ( unsigned int i = 0; i < tickDts.size(); ++i )
+    {
+        if ( clock->getTickDt( i ) != tickDts[i] )
+        {
+            ticks.push_back( i );
+            dts.push_back( clock->getTickDt( i ) );
+        }
+    }
+
+    // Write to a file of our own and rename it, so that other processes
+    // sharing the cache never see a partial file.
+    fs::path file = fs::path( dir_ ) / ( key + cacheSuffix );
+    fs::path temp = file;
+    temp += "." + std::to_string( std::random_device()() );
+    {
+        ofstream os( temp, ios::binary );
+        if ( !os )
+            return false;
+        os.write( cacheMagic, 8 );
+        checkpoint::writeValue( os, cacheVersion );
+        checkpoint::writeValue< unsigned char >( os, reinit );
+        checkpoint::writeVec( os, ticks );
+        checkpoint::writeVec( os, dts );
+        checkpoint::writeValue< unsigned int >( os, elms.size() );
+        for ( unsigned int i = 0; i < elms.size(); ++i )
+        {
+            const Element* elm = elms[i].element();
+            ObjId pa = Neutral::parent( ObjId( elms[i] ) );
+            vector< ObjId > objs = checkpoint::objects( elms[i] );
+            checkpoint::writeString( os, elm->getName() );
+            checkpoint::writeString( os, elm->cinfo()->name() );
+            checkpoint::writeValue< int >(
+                os, ( i == 0 ) ? -1 : static_cast< int >( index[ pa.id ] ) );
+            checkpoint::writeValue< unsigned int >( os, pa.dataIndex );
+            checkpoint::writeValue< unsigned int >( os, elm->numData() );
+            checkpoint::writeValue< int >( os, elm->getTick() );
+            checkpoint::writeValue< unsigned char >( os, elm->isGlobal() );
+            checkpoint::writeValue< unsigned int >( os, objs.size() );
+            vector< const ValueFinfoBase* > fields =
+                cacheFields( elm->cinfo() );
+            checkpoint::writeValue< unsigned int >( os, fields.size() );
+            for ( auto f = fields.cbegin(); f != fields.cend(); ++f )
+                writeField( os, saveField( *f, objs, index ) );
+        }
+        checkpoint::writeValue< unsigned int >( os, msgs.size() );
+        for ( auto m = msgs.cbegin(); m != msgs.cend(); ++m )
+            writeMsg( os, *m );
+        if ( !os )
+        {
+            os.close();
+            std::error_code ec;
+            fs::remove( temp, ec );
+            return false;
+        }
+    }
+    std::error_code ec;
+    fs::rename( temp, file, ec );
+    if ( ec )
+    {
+        fs::remove( temp, ec );
+        return false;
+    }
+    evict();
+    return true;
+}
+
+void ModelCache::evict()
+{
+    vector< pair< fs::file_time_type, fs::path > > files;
+    unsigned long total = 0;
+    std::error_code ec;
+    for ( auto i = fs::directory_iterator( dir_, ec );
+            !ec && i != fs::directory_iterator(); i.increment( ec ) )
+    {
+        if ( i->path().extension() != cacheSuffix )
+            continue;
+        std::error_code ec2;
+        unsigned long size = i->file_size( ec2 );
+        fs::file_time_type t = i->last_write_time( ec2 );
+        if ( ec2 )
+            continue;
+        total += size;
+        files.push_back( make_pair( t, i->path() ) );
+    }
+    sort( files.begin(), files.end() );
+    for ( auto f = files.cbegin(); f != files.cend() && total > maxBytes_; ++f )
+    {
+        std::error_code ec2;
+        unsigned long size = fs::file_size( f->second, ec2 );
+        if ( !ec2 && fs::remove( f->second, ec2 ) )
+            total -= size;
+    }
+}
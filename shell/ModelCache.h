@@ -0,0 +1,73 @@
+/**********************************************************************
+** This program is part of 'MOOSE', the
+** Messaging Object Oriented Simulation Environment.
+**           Copyright (C) 2003-2020 Upinder S. Bhalla. and NCBS
+** It is made available under the terms of the
+** GNU Lesser General Public License version 2.1
+** See the file COPYING.LIB for the full notice.
+**********************************************************************/
+
+#ifndef _MODEL_CACHE_H
+#define _MODEL_CACHE_H
+
+/**
+ * On-disk cache of models loaded by Shell::doLoadModel. When enabled,
+ * the tree built by a loader is saved to a binary file in the cache
+ * directory, named by a hash of the model file contents, its type and
+ * the solver class. Loading the same file again then rebuilds the tree
+ * from the cache file instead of parsing the model: the elements are
+ * created, the messages between them added and the field values
+ * assigned.
+ * The total size of the cache files is kept below a limit by removing
+ * the least recently used ones.
+ * Only models that do not depend on anything outside their own file
+ * are cached: kkit, cspace and SWC. Trees with messages to elements
+ * outside the model, or with message types other than Single, OneToAll,
+ * OneToOne and Diagonal, are not cached.
+ */
+class ModelCache
+{
+public:
+    /**
+     * Turns the cache on, in directory dir, which is made if needed, or
+     * off if dir is empty. Files are removed once the cache holds more
+     * than maxBytes.
+     */
+    static void setDirectory( const string& dir, unsigned long maxBytes );
+    static string getDirectory();
+    static unsigned long getMaxBytes();
+    static bool isEnabled();
+
+    /**
+     * Returns the cache key for a model file: a hash of its contents,
+     * the model type and the solver class. Empty if the file can't be
+     * read.
+     */
+    static string key( const string& fileName, int modelType,
+                       const string& solverClass );
+
+    /**
+     * Builds the model cached under key as parent/name. Returns Id() if
+     * there is no such entry or it could not be used, in which case
+     * nothing is left behind.
+     */
+    static Id load( const string& key, Id parent, const string& name );
+
+    /**
+     * Saves the tree under model to the cache under key. tickDts are the
+     * dts of the Clock ticks before the model was loaded, so that those
+     * changed by the loader can be saved too. If reinit is set, loading
+     * from the cache ends with a reinit, as the loader does.
+     */
+    static bool save( const string& key, Id model,
+                      const vector< double >& tickDts, bool reinit );
+
+private:
+    /// Removes the least recently used files until the cache fits.
+    static void evict();
+
+    static string dir_;
+    static unsigned long maxBytes_;
+};
+
+#endif // _MODEL_CACHE_H
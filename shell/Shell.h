@@ -208,6 +208,23 @@ public:
      */
     void doSaveModel( Id model, const string& fileName, bool qflag = 0 ) const;
 
+    /**
+     * Saves the state of the simulation under root to a binary file:
+     * the clock step, the assignable double and vector< double > fields
+     * of every object, the internal state of the solvers and of the
+     * random number generator. Defined in Checkpoint.cpp.
+     */
+    bool doSaveCheckpoint( const string& root, const string& fileName )
+        const;
+
+    /**
+     * Restores a checkpoint saved by doSaveCheckpoint into the model
+     * under root, which must have been built the same way and reinited.
+     * The simulation then continues from the saved time on the next
+     * start.
+     */
+    bool doRestoreCheckpoint( const string& root, const string& fileName );
+
     /**
      * This function synchronizes fieldDimension on the DataHandler
      * across nodes. Used after function calls that might alter the
@@ -0,0 +1,87 @@
+# Filename: cube_neuro_junction_benchmark.py
+# Description: Setup time of junctions between a CubeMesh and a NeuroMesh.
+"""Times Dsolve.buildMeshJunctions between a large CubeMesh standing for the
+extracellular space and a branched NeuroMesh inside it.
+
+The junctions are found by sampling the surface of each neuronal voxel and
+looking up the cube voxels hit; this benchmark tracks how that scales with
+the size of the cube and of the neuron.
+
+Usage: python cube_neuro_junction_benchmark.py [cubeSide] [numNeuroVoxels]
+"""
+
+import sys
+import time
+import numpy as np
+import moose
+
+
+def make_tree(model, nsegs, seglen, dia, origin):
+    """Binary tree of cylindrical compartments, built breadth first."""
+    soma = moose.Compartment(f'{model.path}/soma')
+    soma.x0, soma.y0, soma.z0 = origin
+    soma.x, soma.y, soma.z = origin[0] + seglen, origin[1], origin[2]
+    soma.diameter, soma.length = dia, seglen
+    compts = [soma]
+    ii = 0
+    while len(compts) < nsegs:
+        parent = compts[ii // 2]
+        theta = (ii % 2 - 0.5) * np.pi / 4
+        c = moose.Compartment(f'{model.path}/dend{ii}')
+        c.x0, c.y0, c.z0 = parent.x, parent.y, parent.z
+        c.x = parent.x + seglen * np.cos(theta)
+        c.y = parent.y + seglen * np.sin(theta)
+        c.z = parent.z
+        c.diameter, c.length = dia, seglen
+        moose.connect(parent, 'raxial', c, 'axial')
+        compts.append(c)
+        ii += 1
+    return compts
+
+
+def make_solvers(compt, path):
+    moose.Pool(f'{compt.path}/a').diffConst = 1e-12
+    stoich = moose.Stoich(f'{compt.path}/stoich')
+    stoich.compartment = compt
+    stoich.ksolve = moose.Ksolve(f'{compt.path}/ksolve')
+    stoich.dsolve = moose.Dsolve(f'{compt.path}/dsolve')
+    stoich.reacSystemPath = path
+    return stoich.dsolve
+
+
+def build(side, nvoxels):
+    model = moose.Neutral('/model')
+    dx = 1e-6
+    cube = moose.CubeMesh('/model/cube')
+    cube.preserveNumEntries = False
+    cube.coords = [0, 0, 0, side * dx, side * dx, side * dx, dx, dx, dx]
+    cell = moose.Neutral('/model/cell')
+    diffLength = 1e-6
+    seglen = 10e-6
+    centre = side * dx / 2
+    make_tree(cell, max(1, nvoxels // int(seglen / diffLength)), seglen,
+              2e-6, (centre / 4, centre, centre))
+    nm = moose.NeuroMesh('/model/nm')
+    nm.geometryPolicy = 'cylinder'
+    nm.diffLength = diffLength
+    nm.subTreePath = '/model/cell/#'
+    cubeDsolve = make_solvers(cube, '/model/cube/##')
+    nmDsolve = make_solvers(nm, '/model/nm/##')
+    return cube, nm, cubeDsolve, nmDsolve
+
+
+def main():
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    nvoxels = int(sys.argv[2]) if len(sys.argv) > 2 else 3000
+    t0 = time.perf_counter()
+    cube, nm, cubeDsolve, nmDsolve = build(side, nvoxels)
+    t1 = time.perf_counter()
+    nmDsolve.buildMeshJunctions(cubeDsolve)
+    t2 = time.perf_counter()
+    print(f'cube={side}^3 ({cube.numDiffCompts} voxels) '
+          f'neuron={nm.numDiffCompts} voxels')
+    print(f'build {t1 - t0:.2f} s, buildMeshJunctions {t2 - t1:.2f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# Filename: dsolve_batch_benchmark.py
+# Description: Benchmark for Dsolve on a large branched NeuroMesh.
+"""Times Dsolve on a branched NeuroMesh with many diffusing species, for
+several values of Dsolve.numThreads.
+
+All the pools on the mesh share one elimination pattern, so the Dsolve
+advances them as batches (see Dsolve.numBatches).
+
+Usage: python dsolve_batch_benchmark.py [numVoxels] [numSpecies] [runtime]
+"""
+
+import sys
+import time
+import numpy as np
+import moose
+
+
+def make_tree(model, nsegs, seglen, dia):
+    """Binary tree of cylindrical compartments, built breadth first."""
+    soma = moose.Compartment(f'{model.path}/soma')
+    soma.x0, soma.x, soma.diameter, soma.length = 0, seglen, dia, seglen
+    compts = [soma]
+    ii = 0
+    while len(compts) < nsegs:
+        parent = compts[ii // 2]
+        theta = (ii % 2 - 0.5) * np.pi / 4
+        c = moose.Compartment(f'{model.path}/dend{ii}')
+        c.x0, c.y0 = parent.x, parent.y
+        c.x = parent.x + seglen * np.cos(theta)
+        c.y = parent.y + seglen * np.sin(theta)
+        c.diameter, c.length = dia, seglen
+        moose.connect(parent, 'raxial', c, 'axial')
+        compts.append(c)
+        ii += 1
+    return compts
+
+
+def build(nvoxels, nspecies):
+    model = moose.Neutral('/model')
+    diffLength = 1e-6
+    seglen = 10e-6
+    make_tree(model, max(1, nvoxels // int(seglen / diffLength)), seglen, 2e-6)
+    nm = moose.NeuroMesh('/model/nm')
+    nm.geometryPolicy = 'cylinder'
+    nm.diffLength = diffLength
+    nm.subTreePath = '/model/#'
+    rng = np.random.default_rng(1)
+    for ii in range(nspecies):
+        pool = moose.Pool(f'/model/nm/p{ii}')
+        pool.diffConst = 1e-12 * (1 + ii % 10)
+        pool.vec.concInit = rng.random(len(pool.vec))
+    stoich = moose.Stoich('/model/nm/stoich')
+    ksolve = moose.Ksolve('/model/nm/ksolve')
+    dsolve = moose.Dsolve('/model/nm/dsolve')
+    stoich.compartment = nm
+    stoich.ksolve = ksolve
+    stoich.dsolve = dsolve
+    stoich.reacSystemPath = '/model/nm/##'
+    return nm, dsolve
+
+
+def main():
+    nvoxels = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    nspecies = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    runtime = float(sys.argv[3]) if len(sys.argv) > 3 else 1.0
+    nm, dsolve = build(nvoxels, nspecies)
+    dt = moose.element('/clock').tickDt[dsolve.tick]
+    print(f'voxels={nm.numDiffCompts} species={nspecies} dt={dt}')
+    for nthreads in (1, 2, 4, 8):
+        dsolve.numThreads = nthreads
+        moose.reinit()
+        t0 = time.perf_counter()
+        moose.start(runtime)
+        t1 = time.perf_counter()
+        print(f'numThreads={nthreads} numBatches={dsolve.numBatches} '
+              f'{runtime / dt / (t1 - t0):.1f} steps/s')
+
+
+if __name__ == '__main__':
+    main()
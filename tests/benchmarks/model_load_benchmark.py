@@ -0,0 +1,59 @@
+# Filename: model_load_benchmark.py
+# Description: Load times of the largest kkit and SBML models in the tests.
+"""Times moose.loadModel on kkit (.g) and SBML (.xml) models, by default the
+largest of each found under the tests directory, and prints the number of
+objects made so that runs on different models can be compared.
+
+Usage: python model_load_benchmark.py [model ...]
+"""
+
+import os
+import sys
+import time
+import moose
+
+TESTS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def largest(ext, tag=None, n=2):
+    found = []
+    for root, dirs, files in os.walk(TESTS):
+        for f in files:
+            if f.endswith(ext):
+                path = os.path.join(root, f)
+                if tag:
+                    with open(path, errors='ignore') as fh:
+                        if tag not in fh.read(4096):
+                            continue
+                found.append((os.path.getsize(path), path))
+    return [p for s, p in sorted(found, reverse=True)[:n]]
+
+
+def time_load(fname, repeats=3):
+    best = float('inf')
+    for i in range(repeats):
+        t0 = time.perf_counter()
+        moose.loadModel(fname, '/model', 'ee')
+        best = min(best, time.perf_counter() - t0)
+        num = len(moose.wildcardFind('/model/##'))
+        moose.delete('/model')
+    return best, num
+
+
+def main():
+    models = sys.argv[1:]
+    if not models:
+        models = largest('.g')
+        try:
+            import libsbml   # noqa: F401
+            models += largest('.xml', '<sbml')
+        except ImportError:
+            print('python-libsbml not found, skipping SBML models')
+    for fname in models:
+        t, num = time_load(fname)
+        print(f'{os.path.relpath(fname, TESTS):50s} {num:6d} objects '
+              f'{t * 1e3:9.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+/**********************************************************************
+** This program is part of 'MOOSE', the
+** Messaging Object Oriented Simulation Environment.
+**           Copyright (C) 2003-2013 Upinder S. Bhalla. and NCBS
+** It is made available under the terms of the
+** GNU Lesser General Public License version 2.1
+** See the file COPYING.LIB for the full notice.
+**********************************************************************/
+
+/**
+ * Benchmark of the spike exchange schedules used by PostMaster::process.
+ * It runs the same communication pattern as the PostMaster, on synthetic
+ * load, without needing a MOOSE build:
+ *
+ *  lockstep:  Isend to every node, wait for every node, barrier, on
+ *             every step. This is PostMaster with minDelay = 0 plus the
+ *             barrier it used to have.
+ *  windowed:  Exchange once every `interval` steps. The exchange of a
+ *             window is completed only at the next exchange, so it
+ *             overlaps with the computation in between. This is
+ *             PostMaster with minDelay = 2 * interval * dt.
+ *
+ * Each rank does a randomly varying amount of work per step, so that
+ * lockstep runs at the pace of the slowest rank on every step.
+ *
+ * Build and run on one machine:
+ *   mpicxx -O2 -std=c++17 mpi_exchange_benchmark.cpp -o mpi_exchange_benchmark
+ *   mpirun -np 4 ./mpi_exchange_benchmark [numSteps] [interval] [spikesPerStep]
+ */
+
+#include <mpi.h>
+#include <vector>
+#include <random>
+#include <cstdlib>
+#include <cmath>
+#include <iostream>
+
+using namespace std;
+
+static const int MSGTAG = 1;
+
+/// Busy work standing in for the local computation of one step.
+static double work( unsigned int n )
+{
+    double x = 0.0;
+    for ( unsigned int i = 0; i < n; ++i )
+        x += sin( i * 1e-3 );
+    return x;
+}
+
+class Exchanger
+{
+public:
+    Exchanger( int rank, int size, unsigned int bufSize )
+        : rank_( rank ), size_( size ), bufSize_( bufSize ),
+          sendBuf_( size ), inFlightBuf_( size ), recvBuf_( size ),
+          recvReq_( size, MPI_REQUEST_NULL ),
+          sendReq_( size, MPI_REQUEST_NULL ),
+          recvCount_( size, 0 ), numDelivered_( 0 )
+    {
+        for ( int i = 0; i < size_; ++i ) {
+            if ( i == rank_ ) continue;
+            recvBuf_[i].resize( bufSize_ );
+            postRecv( i );
+        }
+    }
+
+    ~Exchanger()
+    {
+        for ( int i = 0; i < size_; ++i ) {
+            if ( recvReq_[i] != MPI_REQUEST_NULL ) {
+                MPI_Cancel( &recvReq_[i] );
+                MPI_Request_free( &recvReq_[i] );
+            }
+        }
+    }
+
+    void addSpike( int node, double t )
+    {
+        sendBuf_[node].push_back( t );
+    }
+
+    void postSends()
+    {
+        for ( int i = 0; i < size_; ++i ) {
+            if ( i == rank_ ) continue;
+            sendBuf_[i].swap( inFlightBuf_[i] );
+            sendBuf_[i].clear();
+            MPI_Isend( inFlightBuf_[i].data(), inFlightBuf_[i].size(),
+                       MPI_DOUBLE, i, MSGTAG, MPI_COMM_WORLD, &sendReq_[i] );
+            poll();
+        }
+    }
+
+    void completeExchange()
+    {
+        for ( int i = 0; i < size_; ++i ) {
+            if ( i == rank_ ) continue;
+            while ( recvCount_[i] == 0 )
+                poll();
+            recvCount_[i]--;
+        }
+        MPI_Waitall( size_, sendReq_.data(), MPI_STATUSES_IGNORE );
+    }
+
+    void poll()
+    {
+        for ( int i = 0; i < size_; ++i ) {
+            if ( i == rank_ ) continue;
+            int done = 0;
+            MPI_Status status;
+            MPI_Test( &recvReq_[i], &done, &status );
+            if ( done ) {
+                int count = 0;
+                MPI_Get_count( &status, MPI_DOUBLE, &count );
+                numDelivered_ += count;
+                recvCount_[i]++;
+                postRecv( i );
+            }
+        }
+    }
+
+    unsigned long numDelivered() const
+    {
+        return numDelivered_;
+    }
+
+private:
+    void postRecv( int node )
+    {
+        MPI_Irecv( recvBuf_[node].data(), bufSize_, MPI_DOUBLE, node,
+                   MSGTAG, MPI_COMM_WORLD, &recvReq_[node] );
+    }
+
+    int rank_;
+    int size_;
+    unsigned int bufSize_;
+    vector< vector< double > > sendBuf_;
+    vector< vector< double > > inFlightBuf_;
+    vector< vector< double > > recvBuf_;
+    vector< MPI_Request > recvReq_;
+    vector< MPI_Request > sendReq_;
+    vector< unsigned int > recvCount_;
+    unsigned long numDelivered_;
+};
+
+static double run( bool windowed, unsigned int numSteps,
+                   unsigned int interval, unsigned int spikesPerStep,
+                   unsigned long& numDelivered )
+{
+    int rank, size;
+    MPI_Comm_rank( MPI_COMM_WORLD, &rank );
+    MPI_Comm_size( MPI_COMM_WORLD, &size );
+    mt19937 rng( 1234 + rank );
+    uniform_int_distribution< int > node( 0, size - 1 );
+    uniform_int_distribution< unsigned int > load( 20000, 60000 );
+
+    Exchanger ex( rank, size, 1 + 2 * spikesPerStep * interval );
+    bool pending = false;
+    double sink = 0.0;
+
+    MPI_Barrier( MPI_COMM_WORLD );
+    double t0 = MPI_Wtime();
+    for ( unsigned int step = 1; step <= numSteps; ++step ) {
+        sink += work( load( rng ) );
+        for ( unsigned int s = 0; s < spikesPerStep; ++s ) {
+            int tgt = node( rng );
+            if ( tgt != rank )
+                ex.addSpike( tgt, step );
+        }
+        if ( !windowed ) {
+            ex.postSends();
+            ex.completeExchange();
+            MPI_Barrier( MPI_COMM_WORLD );
+        } else if ( step % interval == 0 ) {
+            if ( pending )
+                ex.completeExchange();
+            ex.postSends();
+            pending = true;
+        } else {
+            ex.poll();
+        }
+    }
+    if ( pending )
+        ex.completeExchange();
+    double t1 = MPI_Wtime();
+    MPI_Barrier( MPI_COMM_WORLD );
+    numDelivered = ex.numDelivered();
+    if ( sink == 42.0 ) // Keep the work from being optimized out.
+        cout << "";
+    return t1 - t0;
+}
+
+int main( int argc, char** argv )
+{
+    MPI_Init( &argc, &argv );
+    int rank, size;
+    MPI_Comm_rank( MPI_COMM_WORLD, &rank );
+    MPI_Comm_size( MPI_COMM_WORLD, &size );
+
+    unsigned int numSteps = argc > 1 ? atoi( argv[1] ) : 2000;
+    unsigned int interval = argc > 2 ? atoi( argv[2] ) : 10;
+    unsigned int spikesPerStep = argc > 3 ? atoi( argv[3] ) : 50;
+
+    unsigned long n1 = 0, n2 = 0;
+    double lockstep = run( false, numSteps, interval, spikesPerStep, n1 );
+    double windowed = run( true, numSteps, interval, spikesPerStep, n2 );
+
+    double maxLockstep = 0.0, maxWindowed = 0.0;
+    unsigned long tot1 = 0, tot2 = 0;
+    MPI_Reduce( &lockstep, &maxLockstep, 1, MPI_DOUBLE, MPI_MAX, 0, MPI_COMM_WORLD );
+    MPI_Reduce( &windowed, &maxWindowed, 1, MPI_DOUBLE, MPI_MAX, 0, MPI_COMM_WORLD );
+    MPI_Reduce( &n1, &tot1, 1, MPI_UNSIGNED_LONG, MPI_SUM, 0, MPI_COMM_WORLD );
+    MPI_Reduce( &n2, &tot2, 1, MPI_UNSIGNED_LONG, MPI_SUM, 0, MPI_COMM_WORLD );
+    if ( rank == 0 ) {
+        cout << "ranks=" << size << " steps=" << numSteps
+             << " interval=" << interval
+             << " spikesPerStep=" << spikesPerStep << endl;
+        cout << "lockstep: " << maxLockstep << " s, "
+             << numSteps / maxLockstep << " steps/s, "
+             << tot1 << " spikes delivered" << endl;
+        cout << "windowed: " << maxWindowed << " s, "
+             << numSteps / maxWindowed << " steps/s, "
+             << tot2 << " spikes delivered" << endl;
+    }
+    MPI_Finalize();
+    return 0;
+}
@@ -0,0 +1,374 @@
+# Filename: run_benchmarks.py
+# Description: Standard benchmarks of the core solvers, reported as JSON.
+"""Runs a fixed set of benchmarks of the core solvers and model readers and
+reports, for each, the setup time, the run time, the simulation steps per
+second and the peak memory, as JSON. Copying a cell also reports the
+memory taken by each copy. Each benchmark runs in its own process
+so that its memory peak and moose state do not depend on the others.
+
+Reports of two builds can be compared with --compare: benchmarks that got
+slower, or use more memory, by more than --tolerance are listed, and the
+exit status is 1 if there are any.
+
+Usage:
+    python run_benchmarks.py [-o report.json] [--scale S] [--only NAME ...]
+    python run_benchmarks.py --compare baseline.json [-o report.json]
+    python run_benchmarks.py --list
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+BENCHDIR = os.path.dirname(os.path.abspath(__file__))
+DATADIR = os.path.join(os.path.dirname(BENCHDIR), 'data')
+sys.path.insert(0, BENCHDIR)
+
+
+class Skip(Exception):
+    """Raised by a benchmark when an optional dependency is missing."""
+
+
+def run(runtime):
+    """reinit and run, returning the run time and number of steps taken."""
+    import moose
+    moose.reinit()
+    t0 = time.perf_counter()
+    moose.start(runtime)
+    t = time.perf_counter() - t0
+    clock = moose.element('/clock')
+    return t, clock.currentStep // clock.stride
+
+
+def chem_cylinder(solverClass, numVoxels):
+    """A small reaction system on a CylMesh of numVoxels voxels."""
+    import moose
+    moose.Neutral('/model')
+    cyl = moose.CylMesh('/model/cyl')
+    cyl.r0 = cyl.r1 = 2e-6
+    cyl.x0 = 0
+    cyl.x1 = numVoxels * 1e-6
+    cyl.diffLength = 1e-6
+    pools = {}
+    for name in 'ABCD':
+        pools[name] = moose.Pool('/model/cyl/' + name)
+        pools[name].concInit = 0.01
+    for name, subs, prds, kf, kb in [('r1', 'AB', 'C', 100, 1),
+                                     ('r2', 'C', 'D', 1, 0),
+                                     ('r3', 'D', 'AB', 1, 10)]:
+        r = moose.Reac('/model/cyl/' + name)
+        r.Kf, r.Kb = kf, kb
+        for s in subs:
+            moose.connect(r, 'sub', pools[s], 'reac')
+        for p in prds:
+            moose.connect(r, 'prd', pools[p], 'reac')
+    solver = solverClass('/model/cyl/solver')
+    stoich = moose.Stoich('/model/cyl/stoich')
+    stoich.compartment = cyl
+    stoich.ksolve = solver
+    stoich.reacSystemPath = '/model/cyl/##'
+    return cyl
+
+
+def bench_hsolve_cell(scale):
+    """HSolve on a reconstructed cell with HH channels everywhere. The
+    morphology is fixed, so scale does not apply."""
+    import moose
+    import rdesigneur as rd
+    rdes = rd.rdesigneur(
+        cellProto=[[os.path.join(DATADIR, 'h10.CNG.swc'), 'elec']],
+        chanProto=[['make_HH_Na()', 'Na'], ['make_HH_K()', 'K']],
+        chanDistrib=[['Na', '#', 'Gbar', '400'], ['K', '#', 'Gbar', '120']],
+        stimList=[['soma', '1', '.', 'inject', '(t>0.01) * 1e-9']],
+        plotList=[['soma', '1', '.', 'Vm', 'Soma Vm']],
+    )
+    rdes.buildModel()
+    assert moose.exists('/model/elec/hsolve')
+    return run(0.1)
+
+
+def bench_ksolve_voxels(scale):
+    """Gsl Ksolve on many voxels of a CylMesh."""
+    import moose
+    chem_cylinder(moose.Ksolve, int(2000 * scale))
+    return run(100)
+
+
+def bench_gsolve_voxels(scale):
+    """Gsolve on many voxels of a CylMesh."""
+    import moose
+    chem_cylinder(moose.Gsolve, int(2000 * scale))
+    return run(100)
+
+
+def bench_dsolve_neuromesh(scale):
+    """Dsolve with many diffusing species on a branched NeuroMesh."""
+    from dsolve_batch_benchmark import build
+    build(int(2000 * scale), 50)
+    return run(1.0)
+
+
+def bench_lif_sparse(scale):
+    """Recurrent LIF network connected by a SparseMsg."""
+    import moose
+    size = int(2000 * scale)
+    moose.Neutral('/model')
+    net = moose.LIF('/model/net', size)
+    syns = moose.SimpleSynHandler('/model/net/syns', size)
+    moose.connect(syns, 'activationOut', net, 'activation', 'OneToOne')
+    syns.vec.numSynapses = [1] * size
+    sv = moose.vec('/model/net/syns/synapse')
+    mid = moose.connect(net, 'spikeOut', sv, 'addSpike', 'Sparse')
+    moose.element(mid).setRandomConnectivity(0.05, 5489)
+    rng = np.random.default_rng(456)
+    net.vec.Rm = 1e8
+    net.vec.Cm = 1e-10
+    net.vec.thresh = -0.05
+    net.vec.vReset = -0.07
+    net.vec.refractoryPeriod = 2e-3
+    net.vec.inject = 2.1e-10 + 0.2e-10 * rng.random(size)
+    for h in syns.vec:
+        h = moose.element(h)
+        n = len(h.synapse)
+        h.synapse.delay = 1e-3 + 4e-3 * rng.random(n)
+        h.synapse.weight = 1e-3 * rng.random(n)
+    return run(0.2)
+
+
+def bench_table_recording(scale):
+    """Many Tables recording from passive compartments."""
+    import moose
+    num = int(5000 * scale)
+    moose.Neutral('/model')
+    compts = moose.Compartment('/model/c', num)
+    compts.vec.Rm = 1e9
+    compts.vec.Cm = 1e-11
+    compts.vec.inject = 1e-11
+    moose.Neutral('/model/plots')
+    for i in range(num):
+        tab = moose.Table('/model/plots/t%d' % i)
+        moose.connect(tab, 'requestOut', compts.vec[i], 'getVm')
+    moose.setClock(moose.element('/clock').defaultTick['Table'], 50e-6)
+    return run(0.2)
+
+
+def load_time(fname, reader):
+    """Time taken by reader(fname), and the number of objects it made."""
+    import moose
+    before = len(moose.wildcardFind('/##'))
+    t0 = time.perf_counter()
+    reader(fname)
+    t = time.perf_counter() - t0
+    return t, len(moose.wildcardFind('/##')) - before
+
+
+def bench_load_kkit(scale):
+    """loadModel of a large kkit model."""
+    import moose
+    fname = os.path.join(DATADIR, 'acc94.g')
+    return load_time(fname, lambda f: moose.loadModel(f, '/model', 'gsl'))
+
+
+def bench_load_sbml(scale):
+    """readSBML of a large SBML model."""
+    import moose
+    try:
+        import libsbml  # noqa: F401
+    except ImportError:
+        raise Skip('python-libsbml not found')
+    fname = os.path.join(DATADIR, 'mkp1_feedback_effects_acc4.xml')
+    return load_time(fname, lambda f: moose.readSBML(f, '/model', 'gsl'))
+
+
+def bench_load_nml2(scale):
+    """readNML2 of the granule cell model."""
+    import moose
+    fname = os.path.join(os.path.dirname(BENCHDIR), 'neuroml2',
+                         'GranuleCell', 'GranuleCell.net.nml')
+    try:
+        import neuroml  # noqa: F401
+    except ImportError:
+        raise Skip('libNeuroML not found')
+    return load_time(fname, moose.readNML2)
+
+
+def bench_copy_cells(scale):
+    """Copies of a cell prototype with tabulated channels and large tables."""
+    import moose
+    num = int(200 * scale)
+    moose.Neutral('/library')
+    proto = moose.Neutral('/library/cell')
+    for i in range(20):
+        c = moose.Compartment('/library/cell/c%d' % i)
+        chan = moose.HHChannel(c.path + '/K')
+        chan.Xpower = 4
+        gate = moose.element(chan.path + '/gateX')
+        gate.setupAlpha([1e4, 0, 1, 10e-3, -10e-3, 125, 0, 0, 0, 80e-3,
+                         3000, -0.1, 0.05])
+        moose.connect(chan, 'channel', c, 'channel')
+    interp = moose.Interpol('/library/cell/interp')
+    interp.vector = np.linspace(0, 1, 100000)
+    stim = moose.StimulusTable('/library/cell/stim')
+    stim.vector = np.sin(np.linspace(0, 100, 100000))
+    moose.Neutral('/model')
+    before = peak_rss_mb()
+    t0 = time.perf_counter()
+    for i in range(num):
+        moose.copy(proto, '/model', 'cell%d' % i)
+    t = time.perf_counter() - t0
+    return t, num, (peak_rss_mb() - before) / num
+
+
+BENCHMARKS = {
+    'hsolve_cell': (bench_hsolve_cell, 'run'),
+    'ksolve_voxels': (bench_ksolve_voxels, 'run'),
+    'gsolve_voxels': (bench_gsolve_voxels, 'run'),
+    'dsolve_neuromesh': (bench_dsolve_neuromesh, 'run'),
+    'lif_sparse': (bench_lif_sparse, 'run'),
+    'table_recording': (bench_table_recording, 'run'),
+    'copy_cells': (bench_copy_cells, 'copy'),
+    'load_kkit': (bench_load_kkit, 'load'),
+    'load_sbml': (bench_load_sbml, 'load'),
+    'load_nml2': (bench_load_nml2, 'load'),
+}
+
+
+def peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kB on Linux, bytes on macOS.
+    return rss / (2**20 if sys.platform == 'darwin' else 2**10)
+
+
+def run_one(name, scale):
+    """Runs one benchmark in this process and returns its results."""
+    import moose  # noqa: F401
+    func, kind = BENCHMARKS[name]
+    t0 = time.perf_counter()
+    try:
+        if kind == 'run':
+            runTime, steps = func(scale)
+            total = time.perf_counter() - t0
+            ret = {'setup_s': total - runTime, 'run_s': runTime,
+                   'steps': int(steps), 'steps_per_s': steps / runTime}
+        elif kind == 'copy':
+            copyTime, numCopies, mbPerCopy = func(scale)
+            ret = {'setup_s': copyTime, 'copies': numCopies,
+                   'mb_per_copy': mbPerCopy}
+        else:
+            loadTime, numObjects = func(scale)
+            ret = {'setup_s': loadTime, 'objects': numObjects}
+    except Skip as e:
+        return {'skipped': str(e)}
+    ret['peak_rss_mb'] = peak_rss_mb()
+    return ret
+
+
+def run_child(name, scale):
+    """Runs one benchmark in a new process."""
+    env = dict(os.environ, MPLBACKEND='Agg')
+    proc = subprocess.run(
+        [sys.executable, __file__, '--child', name, '--scale', str(scale)],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env,
+        universal_newlines=True)
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        err = proc.stderr.strip().splitlines()
+        return {'error': err[-1] if err else 'exit status %d' % proc.returncode}
+    return json.loads(lines[-1])
+
+
+def environment():
+    import moose
+    return {
+        'moose_version': moose.version(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpus': os.cpu_count(),
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+# Smaller is better for all of these except steps_per_s.
+COMPARED = ['steps_per_s', 'setup_s', 'peak_rss_mb', 'mb_per_copy']
+
+
+def compare(report, baseline, tolerance):
+    """Returns a line for each result worse than in baseline by more than
+    tolerance, as a fraction."""
+    worse = []
+    for name, res in report['benchmarks'].items():
+        base = baseline.get('benchmarks', {}).get(name)
+        if not base:
+            continue
+        for key in COMPARED:
+            if key not in res or key not in base or base[key] <= 0:
+                continue
+            change = res[key] / base[key] - 1.0
+            if key == 'steps_per_s':
+                change = -change
+            if change > tolerance:
+                worse.append('%-18s %-12s %10.4g -> %10.4g (%+.0f%%)' % (
+                    name, key, base[key], res[key], 100 * change))
+    return worse
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('-o', '--output', help='write the report here')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='size of the models, relative to the default')
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS),
+                        help='run only these benchmarks')
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help='report regressions against this report')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='allowed fractional change (default 0.1)')
+    parser.add_argument('--list', action='store_true',
+                        help='list the benchmarks and exit')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_one(args.child, args.scale)))
+        return 0
+    if args.list:
+        for name, (func, kind) in BENCHMARKS.items():
+            print('%-18s %s' % (name, func.__doc__.split('\n')[0]))
+        return 0
+
+    report = {'environment': environment(), 'scale': args.scale,
+              'benchmarks': {}}
+    for name in args.only or BENCHMARKS:
+        res = run_child(name, args.scale)
+        report['benchmarks'][name] = res
+        print('%-18s %s' % (name, ', '.join(
+            '%s=%.4g' % (k, v) if isinstance(v, float) else '%s=%s' % (k, v)
+            for k, v in res.items())), file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            worse = compare(report, json.load(f), args.tolerance)
+        for line in worse:
+            print('REGRESSION', line, file=sys.stderr)
+        return 1 if worse else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,83 @@
+# Filename: test_checkpoint.py
+# Description: Save and restore the simulation state.
+"""A run that is checkpointed, rebuilt, restored and continued must end up
+where an uninterrupted run ends up.
+
+Usage: pytest test_checkpoint.py
+"""
+
+import numpy as np
+import moose
+
+
+def build_chem():
+    compt = moose.CubeMesh('/model/compt')
+    compt.volume = 1e-18
+    a = moose.Pool('/model/compt/a')
+    b = moose.Pool('/model/compt/b')
+    a.concInit = 1e-3
+    reac = moose.Reac('/model/compt/reac')
+    reac.Kf = 0.3
+    reac.Kb = 0.1
+    moose.connect(reac, 'sub', a, 'reac')
+    moose.connect(reac, 'prd', b, 'reac')
+    ksolve = moose.Ksolve('/model/compt/ksolve')
+    stoich = moose.Stoich('/model/compt/stoich')
+    stoich.compartment = compt
+    stoich.ksolve = ksolve
+    stoich.reacSystemPath = '/model/compt/##'
+    tab = moose.Table2('/model/tab')
+    moose.connect(tab, 'requestOut', b, 'getN')
+    return b, tab
+
+
+def build_cell():
+    soma = moose.Compartment('/model/soma')
+    soma.Cm = 1e-10
+    soma.Rm = 1e8
+    soma.Em = -0.065
+    soma.initVm = -0.065
+    soma.inject = 1e-10
+    hsolve = moose.HSolve('/model/hsolve')
+    hsolve.dt = 50e-6
+    hsolve.target = soma.path
+    tab = moose.Table('/model/vm')
+    moose.connect(tab, 'requestOut', moose.element('/model/soma'), 'getVm')
+    return moose.element('/model/soma'), tab
+
+
+def run(build, field, tmp_path, runtime):
+    fname = str(tmp_path / 'run.ckpt')
+
+    moose.Neutral('/model')
+    obj, tab = build()
+    moose.reinit()
+    moose.start(runtime)
+    moose.saveCheckpoint(fname, '/model')
+    moose.start(runtime)
+    expected = getattr(obj, field), np.array(tab.vector)
+    moose.delete('/model')
+
+    moose.Neutral('/model')
+    obj, tab = build()
+    moose.reinit()
+    moose.restoreCheckpoint(fname, '/model')
+    assert np.isclose(moose.element('/clock').currentTime, runtime)
+    moose.start(runtime)
+    computed = getattr(obj, field), np.array(tab.vector)
+    moose.delete('/model')
+    return expected, computed
+
+
+def test_checkpoint_ksolve(tmp_path):
+    (n0, t0), (n1, t1) = run(build_chem, 'n', tmp_path, 5.0)
+    assert np.isclose(n0, n1, rtol=1e-6), (n0, n1)
+    assert len(t0) == len(t1)
+    assert np.allclose(t0, t1, rtol=1e-6)
+
+
+def test_checkpoint_hsolve(tmp_path):
+    (v0, t0), (v1, t1) = run(build_cell, 'Vm', tmp_path, 0.02)
+    assert np.isclose(v0, v1, rtol=1e-9), (v0, v1)
+    assert len(t0) == len(t1)
+    assert np.allclose(t0, t1, rtol=1e-9)
@@ -0,0 +1,68 @@
+# Filename: test_connect_many.py
+# Description: Connecting a vec of Tables to many objects in one call.
+"""moose.connectMany must record the same values as connecting each table
+with moose.connect, whether the targets are a whole vec, part of a vec in
+any order, or separate objects.
+
+Usage: pytest test_connect_many.py
+"""
+
+import numpy as np
+import moose
+
+
+def test_connect_many():
+    model = moose.Neutral('/cm')
+    arr = moose.Compartment('/cm/arr', 10)
+    arr.vec.Rm = 1e9
+    arr.vec.Cm = 1e-11
+    arr.vec.inject = np.arange(10) * 1e-11
+    single = [moose.Compartment('/cm/c%d' % i) for i in range(3)]
+    for i, c in enumerate(single):
+        c.Rm, c.Cm, c.inject = 1e9, 1e-11, (i + 1) * 1e-11
+    subset = [arr.vec[i] for i in (7, 2, 5)]
+
+    cases = [('all', list(arr.vec), 'OneToOne'),
+             ('subset', subset, 'SparseMsg'),
+             ('single', single, 'SingleMsg'),
+             ('mixed', single[:2] + subset, None)]
+    tabs = {}
+    for name, dests, msgClass in cases:
+        many = moose.Table('/cm/many_' + name, len(dests))
+        msgs = moose.connectMany(many.vec, 'requestOut', dests, 'getVm')
+        if msgClass == 'OneToOne':
+            assert len(msgs) == 1 and msgs[0].className == 'OneToOneMsg'
+        elif msgClass == 'SparseMsg':
+            assert len(msgs) == 1 and msgs[0].className == 'SparseMsg'
+        elif msgClass == 'SingleMsg':
+            assert len(msgs) == len(dests)
+        ref = moose.Table('/cm/ref_' + name, len(dests))
+        for i, d in enumerate(dests):
+            moose.connect(ref.vec[i], 'requestOut', d, 'getVm')
+        tabs[name] = (many, ref)
+
+    moose.reinit()
+    moose.start(0.01)
+    for name, (many, ref) in tabs.items():
+        a = np.array([moose.element(t).vector for t in many.vec])
+        b = np.array([moose.element(t).vector for t in ref.vec])
+        assert a.shape == b.shape and a.shape[1] > 0
+        assert np.allclose(a, b), name
+    moose.delete(model)
+
+
+def test_connect_many_errors():
+    model = moose.Neutral('/cmerr')
+    c = moose.Compartment('/cmerr/c')
+    tabs = moose.Table('/cmerr/tab', 1)
+    try:
+        moose.connectMany(tabs.vec, 'requestOut', [c, c], 'getVm')
+        assert False, 'more targets than tables must fail'
+    except RuntimeError:
+        pass
+    moose.delete(model)
+
+
+if __name__ == '__main__':
+    test_connect_many()
+    test_connect_many_errors()
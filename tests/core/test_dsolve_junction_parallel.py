@@ -0,0 +1,68 @@
+# Filename: test_dsolve_junction_parallel.py
+# Description: Junction fluxes between Dsolves computed over threads.
+"""Diffusion across the junction between a cylinder and its EndoMesh must
+give the same result whether the junctions are computed serially or over
+several threads.
+
+Usage: pytest test_dsolve_junction_parallel.py
+"""
+
+import numpy as np
+import pytest
+import moose
+
+diffConst = 1e-12
+
+
+def run(nthreads):
+    model = moose.Neutral('/model')
+    compt = moose.CylMesh('/model/compartment')
+    compt.x1 = 100e-6
+    compt.diffLength = 1e-6
+    s = moose.Pool('/model/compartment/s')
+    s.diffConst = diffConst
+    endo = moose.EndoMesh('/model/endo')
+    endo.isMembraneBound = False
+    endo.surround = compt
+    es = moose.Pool('/model/endo/s')
+    es.diffConst = diffConst
+
+    ksolve = moose.Ksolve('/model/compartment/ksolve')
+    dsolve = moose.Dsolve('/model/dsolve')
+    eksolve = moose.Ksolve('/model/endo/ksolve')
+    edsolve = moose.Dsolve('/model/endo/dsolve')
+    eksolve.numThreads = nthreads
+    stoich = moose.Stoich('/model/compartment/stoich')
+    stoich.compartment = compt
+    stoich.ksolve = ksolve
+    stoich.dsolve = dsolve
+    stoich.reacSystemPath = '/model/compartment/##'
+    estoich = moose.Stoich('/model/endo/stoich')
+    estoich.compartment = endo
+    estoich.ksolve = eksolve
+    estoich.dsolve = edsolve
+    estoich.reacSystemPath = '/model/endo/##'
+    edsolve.buildMeshJunctions(dsolve)
+
+    nvox = len(s.vec)
+    s.vec.concInit = np.linspace(0.0, 1e-3, nvox)
+    es.vec.concInit = np.linspace(1e-3, 0.0, nvox)
+    for i in range(10, 18):
+        moose.setClock(i, 0.01)
+    moose.reinit()
+    moose.start(5.0)
+    ret = np.concatenate((s.vec.n, es.vec.n))
+    moose.delete(model)
+    return ret
+
+
+@pytest.mark.parametrize('nthreads', [2, 4])
+def test_dsolve_junction_parallel(nthreads):
+    expected = run(1)
+    computed = run(nthreads)
+    assert np.allclose(expected, computed, rtol=1e-12, atol=0), \
+        np.abs(expected - computed).max()
+
+
+if __name__ == '__main__':
+    test_dsolve_junction_parallel(4)
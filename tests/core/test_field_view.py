@@ -0,0 +1,86 @@
+# Filename: test_field_view.py
+# Description: Read-only views of vector fields.
+"""moose.fieldView gives the values of Table.vector and of the HHGate
+tables without a copy, as a read-only array. A view of a table keeps the
+values it had when the view was taken, across runs and deletion.
+
+Usage: pytest test_field_view.py
+"""
+
+import numpy as np
+import pytest
+import moose
+
+
+def test_table_view():
+    model = moose.Neutral('/fv')
+    pg = moose.PulseGen('/fv/pg')
+    pg.firstLevel, pg.firstWidth, pg.firstDelay = 1.0, 2e-3, 1e-3
+    tab = moose.Table('/fv/tab')
+    moose.connect(tab, 'requestOut', pg, 'getOutputValue')
+    moose.reinit()
+    moose.start(0.01)
+
+    view = moose.fieldView(tab, 'vector')
+    assert np.array_equal(view, tab.vector)
+    assert view.max() == 1.0
+    assert not view.flags.writeable
+    with pytest.raises(ValueError):
+        view[0] = 2.0
+    saved = view.copy()
+    saved[0] = 2.0
+    assert tab.vector[0] != 2.0
+
+    empty = moose.Table('/fv/empty')
+    assert len(moose.fieldView(empty, 'vector')) == 0
+    with pytest.raises(ValueError):
+        moose.fieldView(pg, 'firstLevel')
+    moose.delete(model)
+
+
+def test_view_outlives_table():
+    model = moose.Neutral('/fvl')
+    pg = moose.PulseGen('/fvl/pg')
+    pg.firstLevel, pg.firstWidth, pg.firstDelay = 1.0, 2e-3, 1e-3
+    tab = moose.Table('/fvl/tab')
+    moose.connect(tab, 'requestOut', pg, 'getOutputValue')
+    moose.reinit()
+    moose.start(0.01)
+    view = moose.fieldView(tab, 'vector')
+    saved = tab.vector.copy()
+
+    # Recording grows the table well past its size when the view was taken.
+    moose.start(1.0)
+    assert len(tab.vector) > 10 * len(saved)
+    assert np.array_equal(view, saved)
+    assert np.array_equal(tab.vector[:len(saved)], saved)
+    later = moose.fieldView(tab, 'vector')
+    assert len(later) == len(tab.vector)
+
+    moose.reinit()
+    assert len(tab.vector) == 0
+    assert len(later) > len(saved)
+
+    moose.delete(tab)
+    assert np.array_equal(view, saved)
+    assert later.max() == 1.0
+    moose.delete(model)
+
+
+def test_gate_view():
+    model = moose.Neutral('/fvg')
+    chan = moose.HHChannel('/fvg/chan')
+    chan.Xpower = 1
+    gate = moose.element(chan.path + '/gateX')
+    gate.min, gate.max, gate.divs = -0.1, 0.05, 150
+    gate.tableA = np.linspace(0, 1, 151)
+    gate.tableB = np.linspace(1, 2, 151)
+    assert np.array_equal(moose.fieldView(gate, 'tableA'), gate.tableA)
+    assert np.array_equal(moose.fieldView(gate.path, 'tableB'), gate.tableB)
+    moose.delete(model)
+
+
+if __name__ == '__main__':
+    test_table_view()
+    test_view_outlives_table()
+    test_gate_view()
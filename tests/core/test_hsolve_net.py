@@ -0,0 +1,128 @@
+# Filename: test_hsolve_net.py
+# Description: Tests for HSolveNet, the multi-cell threaded Hines solver.
+"""Tests for HSolveNet class.
+
+Usage: pytest test_hsolve_net.py
+"""
+
+import numpy as np
+import pytest
+import moose
+
+
+def make_cell(path, inject):
+    """Single compartment cell with Hodgkin-Huxley Na and K channels,
+    in the units used by Hodgkin and Huxley (ms, mV, mS/cm^2)."""
+    comp = moose.Compartment(path)
+    comp.Em = comp.Vm = comp.initVm = 0.0
+    comp.Cm = 1.0
+    comp.Rm = 1 / 0.3
+    comp.inject = inject
+    vdivs, vmin, vmax = 150, -30.0, 120.0
+    na = moose.HHChannel(f'{path}/Na')
+    na.Gbar, na.Ek = 120.0, 115.0
+    na.Xpower, na.Ypower = 3, 1
+    moose.element(f'{na.path}/gateX').setupAlpha(
+        [2.5, -0.1, -1.0, -25.0, -10.0, 4, 0, 0, 0, 18.0, vdivs, vmin, vmax])
+    moose.element(f'{na.path}/gateY').setupAlpha(
+        [0.07, 0, 0, 0, 20.0, 1, 0, 1, -30, -10.0, vdivs, vmin, vmax])
+    k = moose.HHChannel(f'{path}/K')
+    k.Gbar, k.Ek = 36.0, -12.0
+    k.Xpower = 4
+    moose.element(f'{k.path}/gateX').setupAlpha(
+        [0.1, -0.01, -1.0, -10.0, -10.0, 0.125, 0, 0, 0, 80.0, vdivs, vmin, vmax])
+    for chan in (na, k):
+        moose.connect(chan, 'channel', comp, 'channel')
+    return comp
+
+
+def run_network(ncells, nthreads=None):
+    model = moose.Neutral('/model')
+    data = moose.Neutral('/data')
+    dt = 0.01
+    for tick in range(10):
+        moose.setClock(tick, dt)
+    tabs = []
+    for ii in range(ncells):
+        cell = moose.Neutral(f'{model.path}/cell{ii}')
+        comp = make_cell(f'{cell.path}/soma', inject=5.0 + 0.5 * ii)
+        solver = moose.HSolve(f'{cell.path}/solver')
+        solver.dt = dt
+        solver.target = comp.path
+        tab = moose.Table(f'{data.path}/Vm{ii}')
+        moose.connect(tab, 'requestOut', comp, 'getVm')
+        tabs.append(tab)
+    net = None
+    if nthreads is not None:
+        net = moose.HSolveNet(f'{model.path}/net')
+        net.numThreads = nthreads
+        net.path = f'{model.path}/##[TYPE=HSolve]'
+        assert net.numCells == ncells
+        assert net.numCompartments == ncells
+    moose.reinit()
+    moose.start(50.0)
+    ret = np.array([tab.vector for tab in tabs])
+    moose.delete(model)
+    moose.delete(data)
+    return ret
+
+
+@pytest.mark.parametrize('nthreads', [1, 3])
+def test_hsolve_net_matches_hsolve(nthreads):
+    """HSolveNet must give the same traces as individually scheduled HSolves."""
+    ncells = 8
+    expected = run_network(ncells)
+    computed = run_network(ncells, nthreads)
+    assert expected.shape == computed.shape
+    # The cells must be spiking, otherwise the comparison is trivial.
+    assert expected.max() > 50.0
+    assert np.allclose(expected, computed), np.abs(expected - computed).max()
+
+
+def test_hsolve_net_releases_cells():
+    """Cells dropped from the path, or left when the HSolveNet is deleted,
+    must go back on the clock and keep being simulated."""
+    model = moose.Neutral('/model')
+    dt = 0.01
+    for tick in range(10):
+        moose.setClock(tick, dt)
+    solvers, tabs = [], []
+    for ii in range(3):
+        cell = moose.Neutral(f'{model.path}/cell{ii}')
+        comp = make_cell(f'{cell.path}/soma', inject=5.0)
+        solver = moose.HSolve(f'{cell.path}/solver')
+        solver.dt = dt
+        solver.target = comp.path
+        tab = moose.Table(f'{model.path}/Vm{ii}')
+        moose.connect(tab, 'requestOut', comp, 'getVm')
+        solvers.append(solver)
+        tabs.append(tab)
+    defaultTick = solvers[0].tick
+    net = moose.HSolveNet(f'{model.path}/net')
+    net.path = f'{model.path}/##[TYPE=HSolve]'
+    assert [s.tick for s in solvers] == [-1, -1, -1]
+
+    net.path = f'{model.path}/cell0/##[TYPE=HSolve]'
+    assert net.numCells == 1
+    assert [s.tick for s in solvers] == [-1, defaultTick, defaultTick]
+    moose.reinit()
+    moose.start(20.0)
+    n = int(round(20.0 / dt))
+    for tab in tabs:
+        assert len(tab.vector) >= n
+        assert max(tab.vector) > 50.0
+    # Each cell is advanced once per step, so the traces are the same.
+    assert np.allclose(tabs[0].vector, tabs[1].vector)
+
+    moose.delete(net)
+    assert solvers[0].tick == defaultTick
+    moose.reinit()
+    moose.start(20.0)
+    assert max(tabs[0].vector) > 50.0
+    assert np.allclose(tabs[0].vector, tabs[2].vector)
+    moose.delete(model)
+
+
+if __name__ == '__main__':
+    test_hsolve_net_matches_hsolve(4)
+    test_hsolve_net_releases_cells()
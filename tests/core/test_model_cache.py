@@ -0,0 +1,65 @@
+# Filename: test_model_cache.py
+# Description: On-disk cache of models read by loadModel.
+"""A model loaded from the cache must be the model loaded from the file: the
+same elements, fields, messages and results.
+
+Usage: pytest test_model_cache.py
+"""
+
+import os
+import numpy as np
+import moose
+
+scriptdir = os.path.dirname(os.path.realpath(__file__))
+mfile = os.path.join(scriptdir, '..', 'data', 'kkit_objects_example.g')
+
+
+def describe(path):
+    """Class of each element, and the substrates and products of reacs."""
+    ret = {}
+    for e in moose.wildcardFind(path + '/##'):
+        rel = e.path[len(path):]
+        ret[rel] = e.className
+        if e.isA['Reac']:
+            ret[rel + '.sub'] = sorted(m.path[len(path):] for m in e.neighbors['sub'])
+            ret[rel + '.prd'] = sorted(m.path[len(path):] for m in e.neighbors['prd'])
+    return ret
+
+
+def run(path, runtime=20.0):
+    moose.reinit()
+    moose.start(runtime)
+    plots = moose.wildcardFind(path + '/#graphs/conc#/#')
+    return [np.array(p.vector) for p in plots]
+
+
+def test_model_cache(tmp_path):
+    cache = tmp_path / 'cache'
+    moose.setModelCache(cache)
+    try:
+        moose.loadModel(mfile, '/plain', 'ee')
+        assert len(list(cache.glob('*.mmc'))) == 1
+        moose.loadModel(mfile, '/cached', 'ee')
+        assert describe('/plain') == describe('/cached')
+        for a, b in zip(moose.wildcardFind('/plain/##[ISA=PoolBase]'),
+                        moose.wildcardFind('/cached/##[ISA=PoolBase]')):
+            assert np.isclose(a.concInit, b.concInit, rtol=1e-12)
+        for a, b in zip(moose.wildcardFind('/plain/##[ISA=Reac]'),
+                        moose.wildcardFind('/cached/##[ISA=Reac]')):
+            assert np.isclose(a.Kf, b.Kf) and np.isclose(a.Kb, b.Kb)
+
+        moose.delete('/cached')
+        expected = run('/plain')
+        moose.delete('/plain')
+        moose.loadModel(mfile, '/cached', 'ee')
+        computed = run('/cached')
+        moose.delete('/cached')
+        assert len(expected) == len(computed) > 0
+        for e, c in zip(expected, computed):
+            assert np.allclose(e, c)
+
+        # Evicted when over the size limit.
+        moose.setModelCache(cache, 0)
+        assert list(cache.glob('*.mmc')) == []
+    finally:
+        moose.setModelCache(None)
@@ -0,0 +1,60 @@
+# Filename: test_pool_reader.py
+# Description: Reading n and conc of many solved pools at once.
+"""moose.PoolReader must give the same n and conc as reading the fields of
+each pool, for pools in a Ksolve over many voxels, pools without a solver,
+and a list of pools in any order.
+
+Usage: pytest test_pool_reader.py
+"""
+
+import numpy as np
+import pytest
+import moose
+
+
+def test_pool_reader():
+    model = moose.Neutral('/pr')
+    cyl = moose.CylMesh('/pr/cyl')
+    cyl.r0 = cyl.r1 = 1e-6
+    cyl.x1 = 20e-6
+    cyl.diffLength = 1e-6
+    a = moose.Pool('/pr/cyl/a')
+    b = moose.Pool('/pr/cyl/b')
+    a.concInit = 1.0
+    reac = moose.Reac('/pr/cyl/reac')
+    reac.Kf, reac.Kb = 1, 0.5
+    moose.connect(reac, 'sub', a, 'reac')
+    moose.connect(reac, 'prd', b, 'reac')
+    ksolve = moose.Ksolve('/pr/cyl/ksolve')
+    stoich = moose.Stoich('/pr/cyl/stoich')
+    stoich.compartment = cyl
+    stoich.ksolve = ksolve
+    stoich.reacSystemPath = '/pr/cyl/##'
+    free = moose.Pool('/pr/free')
+    free.concInit = 0.25
+
+    moose.reinit()
+    moose.start(0.5)
+    assert len(a.vec) == 20
+
+    reader = moose.PoolReader(b.vec)
+    assert len(reader) == 20
+    assert np.allclose(reader.get('n'), b.vec.n)
+    assert np.allclose(reader.get(), b.vec.conc)
+    assert reader.get('n').max() > 0
+
+    pools = [b.vec[3], free, a.vec[7], a.vec[0]]
+    reader = moose.PoolReader(pools)
+    assert np.allclose(reader.get('conc'),
+                       [moose.element(p).conc for p in pools])
+    assert np.allclose(reader.get('n'), [moose.element(p).n for p in pools])
+
+    moose.start(0.5)    # Values are read again, not kept.
+    assert np.allclose(reader.get('n'), [moose.element(p).n for p in pools])
+    with pytest.raises(ValueError):
+        reader.get('concInit')
+    moose.delete(model)
+
+
+if __name__ == '__main__':
+    test_pool_reader()
@@ -0,0 +1,44 @@
+# Filename: test_profile.py
+# Description: Timing of process calls by tick, class and solver.
+"""moose.profile() reports the time and number of process calls of each
+tick, class and recording object, only while profiling is on.
+
+Usage: pytest test_profile.py
+"""
+
+import moose
+
+
+def test_profile():
+    model = moose.Neutral('/prof')
+    compts = [moose.Compartment('/prof/c%d' % i) for i in range(3)]
+    tab = moose.Table('/prof/tab')
+    moose.connect(tab, 'requestOut', compts[0], 'getVm')
+    moose.reinit()
+    moose.start(0.01)
+
+    moose.profile(True)
+    assert len(moose.profile()) == 0
+    moose.start(0.01)
+    p = moose.profile(False)
+    rows = {(r['kind'], r['name']): r for r in p}
+    assert any(k == 'tick' for k, n in rows)
+    assert all(r['time'] >= 0.0 for r in p)
+
+    clock = moose.element('/clock')
+    tabSteps = round(0.01 / clock.tickDt[clock.defaultTick['Table']])
+    assert rows[('class', 'Table')]['calls'] == tabSteps
+    assert rows[('object', '/prof/tab')]['calls'] == tabSteps
+    # Compartments are called on their init and process ticks.
+    comptSteps = round(0.01 / clock.tickDt[clock.defaultTick['Compartment']])
+    assert rows[('class', 'Compartment')]['calls'] == 2 * 3 * comptSteps
+    assert ('object', '/prof/c0') not in rows
+
+    # The records are kept, unchanged, once profiling is off.
+    moose.start(0.01)
+    assert (moose.profile() == p).all()
+    moose.delete(model)
+
+
+if __name__ == '__main__':
+    test_profile()
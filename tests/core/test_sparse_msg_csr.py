@@ -0,0 +1,94 @@
+# Filename: test_sparse_msg_csr.py
+# Description: Saving and restoring the connectivity of a SparseMsg.
+"""The compressed sparse row arrays of a SparseMsg must match its
+rowStart, columnIndex and matrixEntry fields, and loading them into a new
+message between objects of the same sizes must rebuild the same
+connections and synapses, also when a source has several synapses on one
+target.
+
+Usage: pytest test_sparse_msg_csr.py
+"""
+
+import numpy as np
+import pytest
+import moose
+
+
+def make_net(path, size):
+    net = moose.LIF(path + '/net', size)
+    syns = moose.SimpleSynHandler(path + '/syns', size)
+    moose.connect(syns, 'activationOut', net, 'activation', 'OneToOne')
+    sv = moose.vec(path + '/syns/synapse')
+    mid = moose.connect(net, 'spikeOut', sv, 'addSpike', 'Sparse')
+    return syns, mid
+
+
+def test_sparse_msg_csr(tmp_path):
+    model = moose.Neutral('/csr')
+    moose.Neutral('/csr/a')
+    moose.Neutral('/csr/b')
+    size = 200
+    synsA, midA = make_net('/csr/a', size)
+    moose.element(midA).setRandomConnectivity(0.1, 123)
+    rowStart, columnIndex, fieldIndex = moose.sparseMsgCSR(midA)
+    assert rowStart.dtype == np.uint32
+    assert len(rowStart) == size + 1 and rowStart[-1] == len(columnIndex)
+    assert list(rowStart) == list(moose.element(midA).rowStart)
+    assert list(columnIndex) == list(moose.element(midA).columnIndex)
+    assert list(fieldIndex) == list(moose.element(midA).matrixEntry)
+
+    fname = str(tmp_path / 'wiring.npz')
+    moose.saveSparseMsg(midA, fname)
+    synsB, midB = make_net('/csr/b', size)
+    moose.loadSparseMsg(midB, fname)
+    for a, b in zip(moose.sparseMsgCSR(midA), moose.sparseMsgCSR(midB)):
+        assert np.array_equal(a, b)
+    assert np.array_equal(synsA.vec.numSynapses, synsB.vec.numSynapses)
+
+    bad = np.array(columnIndex)
+    bad[0] = size
+    with pytest.raises(ValueError):
+        moose.setSparseMsgCSR(midB, rowStart, bad, fieldIndex)
+    assert np.array_equal(moose.sparseMsgCSR(midB)[1], columnIndex)
+
+    synsC, midC = make_net('/csr', size // 2)
+    with pytest.raises(ValueError):
+        moose.loadSparseMsg(midC, fname)
+    moose.delete(model)
+
+
+
+def test_sparse_msg_csr_repeated_pairs(tmp_path):
+    model = moose.Neutral('/csrr')
+    moose.Neutral('/csrr/a')
+    moose.Neutral('/csrr/b')
+    size = 10
+    synsA, midA = make_net('/csrr/a', size)
+    # Source 2 makes three synapses on target 5, and two on target 7.
+    src = [2, 2, 2, 0, 2, 9, 2]
+    dest = [5, 5, 7, 5, 5, 0, 7]
+    moose.element(midA).pairFill(src, dest)
+    rowStart, columnIndex, fieldIndex = moose.sparseMsgCSR(midA)
+    row = columnIndex[rowStart[2]:rowStart[3]]
+    assert list(row) == [5, 5, 5, 7, 7]
+    assert synsA.vec[5].numSynapses == 4
+
+    fname = str(tmp_path / 'repeats.npz')
+    moose.saveSparseMsg(midA, fname)
+    synsB, midB = make_net('/csrr/b', size)
+    moose.loadSparseMsg(midB, fname)
+    for a, b in zip(moose.sparseMsgCSR(midA), moose.sparseMsgCSR(midB)):
+        assert np.array_equal(a, b)
+    assert np.array_equal(synsA.vec.numSynapses, synsB.vec.numSynapses)
+
+    bad = np.array(columnIndex)
+    bad[rowStart[2]], bad[rowStart[2] + 1] = 7, 5
+    with pytest.raises(ValueError):
+        moose.setSparseMsgCSR(midB, rowStart, bad, fieldIndex)
+    moose.delete(model)
+
+
+if __name__ == '__main__':
+    import tempfile, pathlib
+    test_sparse_msg_csr(pathlib.Path(tempfile.mkdtemp()))
+    test_sparse_msg_csr_repeated_pairs(pathlib.Path(tempfile.mkdtemp()))
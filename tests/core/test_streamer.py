@@ -120,9 +120,26 @@ def test_abit_more():
     for i, name in enumerate(npData.dtype.names):
         assert (csvData[:,i] == npData[name]).all()
 
+def test_npy_append_runs():
+    # The npy file stays open during a run, and later runs append to it.
+    st = buildSystem('data2.npy')
+    moose.reinit()
+    moose.start(50)
+    n1 = len(np.load(st.outfile))
+    moose.start(50)
+    npData = np.load(st.outfile)
+    assert len(npData) > n1
+
+    mapped = moose.readNPY(st.outfile)
+    assert mapped.dtype.names == npData.dtype.names
+    assert not mapped.flags.writeable
+    for name in npData.dtype.names:
+        assert (mapped[name] == npData[name]).all()
+
 def main( ):
     test_sanity( )
     test_abit_more( )
+    test_npy_append_runs( )
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,75 @@
+# Filename: test_swc_reader.py
+# Description: Reading SWC morphologies, alone and by directory.
+"""A cell read from an SWC file whose segments are out of order, with
+arbitrary indices, must have the compartments of the cell read from the
+ordered file. loadSwcDir loads one cell per file.
+
+Usage: pytest test_swc_reader.py
+"""
+
+import os
+import random
+import numpy as np
+import moose
+
+scriptdir = os.path.dirname(os.path.realpath(__file__))
+swcfile = os.path.join(scriptdir, '..', 'data', 'h10.CNG.swc')
+
+
+def describe(path):
+    """Geometry of each compartment and of its parent, in sorted order. The
+    names depend on the order of the segments in the file, so are left out.
+    """
+    ret = []
+    for c in moose.wildcardFind(path + '/#[ISA=CompartmentBase]'):
+        pa = c.neighbors['raxial']
+        pxyz = (pa[0].x, pa[0].y, pa[0].z) if pa else (0.0, 0.0, 0.0)
+        ret.append((c.x, c.y, c.z, c.diameter, c.length) + pxyz)
+    return np.array(sorted(ret))
+
+
+def shuffled(fname, outname):
+    """Writes fname with renumbered segments in random order."""
+    rows = [l.split() for l in open(fname)
+            if l.strip() and not l.lstrip().startswith('#')]
+    rng = random.Random(7)
+    newid = dict(zip([r[0] for r in rows],
+                     map(str, rng.sample(range(10, 10**6), len(rows)))))
+    lines = [' '.join([newid[r[0]]] + r[1:6] +
+                      [newid.get(r[6], '-1')]) for r in rows]
+    rng.shuffle(lines)
+    with open(outname, 'w') as f:
+        f.write('# shuffled\n' + '\n'.join(lines) + '\n')
+
+
+def test_unordered_swc(tmp_path):
+    shuffled(swcfile, tmp_path / 'shuffled.swc')
+    moose.loadModel(swcfile, '/ordered')
+    moose.loadModel(str(tmp_path / 'shuffled.swc'), '/shuffled')
+    a = describe('/ordered')
+    b = describe('/shuffled')
+    assert len(a) > 200
+    assert a.shape == b.shape
+    assert np.allclose(a, b)
+    assert moose.exists('/shuffled/soma')
+    moose.delete('/ordered')
+    moose.delete('/shuffled')
+
+
+def test_load_swc_dir(tmp_path):
+    for name in ['b.cell', 'a cell']:
+        with open(swcfile) as src, open(tmp_path / (name + '.swc'), 'w') as f:
+            f.write(src.read())
+    (tmp_path / 'notes.txt').write_text('not a cell')
+    cells = moose.loadSwcDir(str(tmp_path), '/cells')
+    assert [c.name for c in cells] == ['a_cell', 'b.cell']
+    for c in cells:
+        assert len(moose.wildcardFind(c.path + '/#[ISA=CompartmentBase]')) \
+            == len(describe('/cells/a_cell'))
+    moose.delete('/cells')
+
+
+if __name__ == '__main__':
+    import tempfile, pathlib
+    test_unordered_swc(pathlib.Path(tempfile.mkdtemp()))
+    test_load_swc_dir(pathlib.Path(tempfile.mkdtemp()))
@@ -0,0 +1,92 @@
+# Filename: test_sweep.py
+# Description: Running variants of a model in forked worker processes.
+"""moose.sweep must give the same table vectors as running each parameter
+set in this process, and must leave the model in this process unchanged.
+Results read slowly must still be there, and stopping early must free the
+shared memory of the runs that were not read.
+
+Usage: pytest test_sweep.py
+"""
+
+import glob
+import os
+import time
+
+import numpy as np
+import pytest
+import moose
+from moose import sweep_utils
+
+
+def make_model():
+    model = moose.Neutral('/sw')
+    comps = moose.Compartment('/sw/comp', 2)
+    comps.vec.Cm = 1e-10
+    comps.vec.Rm = 1e8
+    comps.vec.Em = -0.065
+    comps.vec.initVm = -0.065
+    tabs = moose.Table('/sw/vm', 2)
+    for comp, tab in zip(comps.vec, tabs.vec):
+        moose.connect(tab, 'requestOut', comp, 'getVm')
+    return model, comps, tabs
+
+
+def test_sweep():
+    model, comps, tabs = make_model()
+    sets = [{'/sw/comp.inject': x} for x in (0.0, 1e-10, 2e-10)]
+    sets.append({('/sw/comp', 'inject'): [1e-10, 3e-10],
+                 '/sw/comp[1].Rm': 2e8})
+    results = dict(moose.sweep(sets, 0.05, '/sw/##[TYPE=Table]',
+                               processes=2))
+    assert sorted(results) == [0, 1, 2, 3]
+    assert np.allclose(comps.vec.inject, 0.0)
+    assert comps.vec[1].Rm == 1e8
+
+    paths = [t.path for t in tabs.vec]
+    for i, params in enumerate(sets):
+        sweep_utils.setParams(params)
+        moose.reinit()
+        moose.start(0.05)
+        for path in paths:
+            assert np.allclose(results[i][path], moose.element(path).vector)
+        comps.vec.inject = 0.0
+        comps.vec.Rm = 1e8
+    assert results[2][paths[0]][-1] > results[1][paths[0]][-1]
+
+    ordered = [i for i, _ in moose.sweep(sets[:2], 0.01, tabs.vec,
+                                         ordered=True)]
+    assert ordered == [0, 1]
+    moose.delete(model)
+
+
+
+def test_sweep_slow_consumer():
+    model, comps, tabs = make_model()
+    sets = [{'/sw/comp.inject': 1e-11 * i} for i in range(6)]
+    last = {}
+    for i, res in moose.sweep(sets, 0.02, tabs.vec, processes=2):
+        # The workers exit while this process is busy.
+        time.sleep(0.3)
+        last[i] = res[tabs.vec[0].path][-1]
+    assert sorted(last) == list(range(6))
+    assert all(last[i] < last[i + 1] for i in range(5))
+    moose.delete(model)
+
+
+@pytest.mark.skipif(not os.path.isdir('/dev/shm'), reason='needs /dev/shm')
+def test_sweep_stop_early():
+    model, comps, tabs = make_model()
+    before = set(glob.glob('/dev/shm/msw*'))
+    sets = [{'/sw/comp.inject': 1e-11 * i} for i in range(6)]
+    results = moose.sweep(sets, 0.02, tabs.vec, processes=2)
+    next(results)
+    time.sleep(0.5)     # Let other runs finish and leave their blocks.
+    results.close()
+    assert set(glob.glob('/dev/shm/msw*')) == before
+    moose.delete(model)
+
+
+if __name__ == '__main__':
+    test_sweep()
+    test_sweep_slow_consumer()
+    test_sweep_stop_early()
@@ -0,0 +1,102 @@
+# Filename: test_table_decimation.py
+# Description: Tables that keep one entry per block of time steps.
+"""A Table with decimation N must hold the first value, the mean, or the
+minimum and maximum, of each block of N samples of the full recording, and
+write times N * dt apart when streaming to a file, by itself or through a
+Streamer.
+
+Usage: pytest test_table_decimation.py
+"""
+
+import numpy as np
+import moose
+
+
+def test_table_decimation(tmp_path):
+    model = moose.Neutral('/dec')
+    pg = moose.PulseGen('/dec/pg')
+    pg.firstLevel, pg.firstWidth, pg.firstDelay = 1.0, 3e-3, 1e-3
+    pg.secondLevel, pg.secondWidth, pg.secondDelay = -2.0, 2e-3, 2e-3
+    pg.baseLevel = 0.5
+    tabs = {}
+    for mode in ['full', 'sample', 'mean', 'minmax']:
+        t = moose.Table('/dec/' + mode)
+        if mode != 'full':
+            t.decimation = 7
+            t.decimationMode = mode
+        moose.connect(t, 'requestOut', pg, 'getOutputValue')
+        tabs[mode] = t
+    stream = moose.Table('/dec/stream')
+    stream.decimation = 7
+    stream.datafile = str(tmp_path / 'stream.csv')
+    moose.connect(stream, 'requestOut', pg, 'getOutputValue')
+
+    moose.reinit()
+    moose.start(0.1)
+    full = np.array(tabs['full'].vector)
+    nblocks = len(full) // 7
+    blocks = full[:nblocks * 7].reshape(nblocks, 7)
+    assert nblocks > 10
+    assert np.allclose(tabs['sample'].vector, full[::7])
+    assert np.allclose(tabs['mean'].vector, blocks.mean(axis=1))
+    minmax = np.column_stack([blocks.min(axis=1), blocks.max(axis=1)])
+    assert np.allclose(tabs['minmax'].vector, minmax.ravel())
+    assert tabs['sample'].decimationMode == 'sample'
+
+    # Unknown modes are ignored.
+    tabs['mean'].decimationMode = 'median'
+    assert tabs['mean'].decimationMode == 'mean'
+
+    moose.delete(model)     # Writes the rest of the stream.
+    data = np.loadtxt(tmp_path / 'stream.csv', skiprows=1)
+    clock = moose.element('/clock')
+    dt = clock.tickDt[clock.defaultTick['Table']]
+    assert np.allclose(data[:, 1], full[::7][:len(data)])
+    assert np.allclose(np.diff(data[:, 0]), 7 * dt)
+
+
+
+def test_streamer_decimation(tmp_path):
+    model = moose.Neutral('/decs')
+    pg = moose.PulseGen('/decs/pg')
+    pg.firstLevel, pg.firstWidth, pg.firstDelay = 1.0, 3e-3, 1e-3
+    pg.baseLevel = 0.5
+    tabs = {}
+    for mode in ['full', 'sample', 'mean', 'minmax']:
+        t = moose.Table('/decs/' + mode)
+        if mode != 'full':
+            t.decimation = 5
+            t.decimationMode = mode
+        moose.connect(t, 'requestOut', pg, 'getOutputValue')
+        tabs[mode] = t
+    st = moose.Streamer('/decs/streamer')
+    st.outfile = str(tmp_path / 'streamer.csv')
+    st.addTables([tabs['sample'], tabs['mean'], tabs['minmax'],
+                  tabs['full']])
+    assert st.numTables == 4
+
+    moose.reinit()
+    # minmax tables, and tables decimated unlike the first, are dropped.
+    assert st.numTables == 2
+    moose.start(0.1)
+    full = np.array(tabs['full'].vector)
+    moose.delete(model)     # Writes the rest of the stream.
+
+    with open(tmp_path / 'streamer.csv') as f:
+        header = f.readline()
+    assert 'minmax' not in header and 'full' not in header
+    data = np.loadtxt(tmp_path / 'streamer.csv', skiprows=1)
+    clock = moose.element('/clock')
+    dt = clock.tickDt[clock.defaultTick['Table']]
+    nblocks = len(full) // 5
+    blocks = full[:nblocks * 5].reshape(nblocks, 5)
+    assert len(data) >= nblocks > 10
+    assert np.allclose(np.diff(data[:, 0]), 5 * dt)
+    assert np.allclose(data[:nblocks, 1], full[::5][:nblocks])
+    assert np.allclose(data[:nblocks, 2], blocks.mean(axis=1))
+
+
+if __name__ == '__main__':
+    import tempfile, pathlib
+    test_table_decimation(pathlib.Path(tempfile.mkdtemp()))
+    test_streamer_decimation(pathlib.Path(tempfile.mkdtemp()))
@@ -0,0 +1,67 @@
+# Filename: test_vec_bulk_set.py
+# Description: Setting a field on all entries of a vec at once.
+"""Assigning to a field of a moose.vec must set every entry, from a single
+value or from one value per entry, for numbers, numpy arrays, strings,
+ObjIds and vector-valued fields.
+
+Usage: pytest test_vec_bulk_set.py
+"""
+
+import numpy as np
+import pytest
+import moose
+
+
+def test_numeric_fields():
+    model = moose.Neutral('/vbs')
+    pools = moose.Pool('/vbs/pool', 1000)
+    vals = np.linspace(0, 1, 1000)
+    pools.vec.concInit = vals
+    assert np.allclose(pools.vec.concInit, vals)
+    pools.vec.concInit = 0.5
+    assert np.allclose(pools.vec.concInit, 0.5)
+    # Lists of ints go to double fields, float arrays to int fields.
+    pools.vec.diffConst = list(range(1000))
+    assert pools.vec[999].diffConst == 999.0
+    pools.vec.tick = -1
+    assert pools.tick == -1
+    with pytest.raises(RuntimeError):
+        pools.vec.concInit = [1.0, 2.0]
+    moose.delete(model)
+
+
+def test_string_and_objid_fields():
+    model = moose.Neutral('/vbs2')
+    strs = moose.Mstring('/vbs2/s', 4)
+    strs.vec.value = 'same'
+    assert [moose.element(s).value for s in strs.vec] == ['same'] * 4
+    names = ['a', 'b', 'c', 'd']
+    strs.vec.value = names
+    assert [moose.element(s).value for s in strs.vec] == names
+
+    cyl = moose.CylMesh('/vbs2/cyl')
+    endos = moose.EndoMesh('/vbs2/endo', 2)
+    endos.vec.surround = cyl
+    assert endos.surround == cyl
+    moose.delete(model)
+
+
+def test_vector_fields():
+    model = moose.Neutral('/vbs3')
+    stims = moose.StimulusTable('/vbs3/stim', 3)
+    stims.vec.vector = [1.0, 2.0, 3.0]
+    for s in stims.vec:
+        assert list(moose.element(s).vector) == [1.0, 2.0, 3.0]
+    rows = np.arange(12, dtype=float).reshape(3, 4)
+    stims.vec.vector = rows
+    for i, s in enumerate(stims.vec):
+        assert np.array_equal(moose.element(s).vector, rows[i])
+    stims.vec.vector = [[1.0], [2.0, 2.0], [3.0, 3.0, 3.0]]
+    assert len(stims.vec[2].vector) == 3
+    moose.delete(model)
+
+
+if __name__ == '__main__':
+    test_numeric_fields()
+    test_string_and_objid_fields()
+    test_vector_fields()
@@ -0,0 +1,107 @@
+# Filename: test_moogul_snapshot.py
+# Description: Replay history and colour updates of moogul drawables.
+"""SnapshotHistory must keep at most maxFrames frames spanning the whole
+run, halving the frames it keeps and doubling its stride each time it
+fills, in RAM or in a memory mapped file. MooDrawable.displayValues must
+only recolour the segments whose colour index changed.
+
+Usage: pytest test_moogul_snapshot.py
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip('vpython')
+from rdesigneur.moogul import SnapshotHistory, MooDrawable, NUM_CMAP
+
+
+def frame(k, numObj=3):
+    return np.arange(numObj) + 10.0 * k
+
+
+def test_history_decimates():
+    hist = SnapshotHistory(maxFrames=4)
+    for k in range(4):
+        hist.append(0.1 * k, frame(k))
+    assert len(hist) == 4 and hist.stride_ == 1
+    # The fifth frame halves the kept frames and doubles the stride.
+    hist.append(0.4, frame(4))
+    assert [round(t, 6) for t in hist.times_[:len(hist)]] == [0.0, 0.2, 0.4]
+    assert hist.stride_ == 2
+    for k in range(5, 9):
+        hist.append(0.1 * k, frame(k))
+    assert hist.stride_ == 4
+    assert len(hist) == 3
+    for i, k in enumerate([0, 4, 8]):
+        t, v = hist[i]
+        assert t == pytest.approx(0.1 * k)
+        assert np.array_equal(v, frame(k))
+    assert hist.vals_.dtype == np.float32
+    assert hist.vals_.shape == (4, 3)
+
+
+def test_history_indexing():
+    hist = SnapshotHistory(maxFrames=10)
+    with pytest.raises(IndexError):
+        hist[0]
+    for k in range(5):
+        hist.append(float(k), frame(k))
+    assert hist[-1][0] == 4.0
+    assert np.array_equal(hist[-5][1], frame(0))
+    with pytest.raises(IndexError):
+        hist[5]
+    with pytest.raises(IndexError):
+        hist[-6]
+
+
+def test_history_file(tmp_path):
+    spill = tmp_path / 'history.dat'
+    hist = SnapshotHistory(maxFrames=6, spillFile=str(spill))
+    for k in range(8):
+        hist.append(float(k), frame(k, 5))
+    assert isinstance(hist.vals_, np.memmap)
+    assert spill.stat().st_size == 6 * 5 * 4
+    assert [hist[i][0] for i in range(len(hist))] == [0.0, 2.0, 4.0, 6.0]
+    hist.vals_.flush()
+    onDisk = np.memmap(spill, dtype=np.float32, mode='r', shape=(6, 5))
+    assert np.array_equal(onDisk[3], frame(6, 5))
+
+
+class Segment:
+    """Stands in for a vpython cylinder, counting colour assignments."""
+    def __init__(self):
+        self.numSet = 0
+        self._color = None
+
+    @property
+    def color(self):
+        return self._color
+
+    @color.setter
+    def color(self, c):
+        self._color = c
+        self.numSet += 1
+
+
+def test_display_values_changed_only():
+    drawable = MooDrawable(None, 'plasma', 1, 1, 1, False, 0.0, 1.0)
+    drawable.segments = [Segment() for i in range(6)]
+    drawable.rgb = list(range(NUM_CMAP))
+
+    # Extra indices beyond the segments are ignored.
+    drawable.displayValues(np.array([0, 1, 2, 3, 4, 5, 6]))
+    assert [s.numSet for s in drawable.segments] == [1] * 6
+    assert [s.color for s in drawable.segments] == [0, 1, 2, 3, 4, 5]
+
+    drawable.displayValues(np.array([0, 9, 2, 3, 7, 5]))
+    assert [s.numSet for s in drawable.segments] == [1, 2, 1, 1, 2, 1]
+    assert drawable.segments[1].color == 9
+    assert drawable.segments[4].color == 7
+
+    drawable.displayValues(np.array([0, 9, 2, 3, 7, 5]))
+    assert [s.numSet for s in drawable.segments] == [1, 2, 1, 1, 2, 1]
+
+    # If the number of segments changes, all of them are recoloured.
+    drawable.segments.append(Segment())
+    drawable.displayValues(np.zeros(7, dtype=int))
+    assert [s.numSet for s in drawable.segments] == [2, 3, 2, 2, 3, 2, 1]
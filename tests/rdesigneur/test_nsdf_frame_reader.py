@@ -0,0 +1,59 @@
+# Filename: test_nsdf_frame_reader.py
+# Description: Prefetching frame reader used by nsdfview.
+"""NsdfFrameReader must return the same frames as direct column reads of the
+dataset, in any order, while reading it in chunk-aligned blocks and keeping
+a bounded number of them.
+
+Usage: pytest test_nsdf_frame_reader.py
+"""
+
+import numpy as np
+import pytest
+from rdesigneur.nsdfreader import NsdfFrameReader
+
+
+class ChunkedDataset:
+    """Stands in for an h5py Dataset chunked along time, logging reads."""
+    def __init__(self, data, chunks):
+        self.data = data
+        self.shape = data.shape
+        self.chunks = chunks
+        self.reads = []
+
+    def __getitem__(self, key):
+        self.reads.append((key[1].start, key[1].stop))
+        return self.data[key]
+
+
+def test_sequential_and_scrub():
+    data = np.random.default_rng(3).random((40, 1000))
+    ds = ChunkedDataset(data, (40, 30))
+    reader = NsdfFrameReader(ds, numBlocks=4)
+    assert reader.blockFrames_ % 30 == 0
+    for i in range(len(reader)):
+        assert np.array_equal(reader.getFrame(i), data[:, i])
+    for i in [999, 0, 517, 3, -1]:
+        assert np.array_equal(reader.getFrame(i), data[:, i])
+    assert len(reader.blocks_) <= 4
+    for t0, t1 in ds.reads:
+        assert t0 % 30 == 0
+    # Each block is read once on the sequential pass, and the scrub
+    # rereads only a few evicted ones.
+    numBlocks = -(-1000 // reader.blockFrames_)
+    assert len(ds.reads) <= numBlocks + 5 * (reader.lookahead_ + 1)
+    reader.close()
+
+
+def test_plain_array():
+    data = np.arange(12.0).reshape(3, 4)
+    reader = NsdfFrameReader(data)
+    assert reader.numFrames() == 4 and reader.numObj() == 3
+    assert np.array_equal(reader.getFrame(2), [2.0, 6.0, 10.0])
+    with pytest.raises(IndexError):
+        reader.getFrame(4)
+    reader.close()
+
+
+if __name__ == '__main__':
+    test_sequential_and_scrub()
+    test_plain_array()
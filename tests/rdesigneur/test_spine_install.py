@@ -0,0 +1,44 @@
+# Filename: test_spine_install.py
+# Description: Many spines installed on a ball-and-stick cell.
+"""Each spine is a shaft and head compartment on the cell, named by its
+index, joined to its dendrite and to each other, with the head on the end
+of the shaft.
+
+Usage: pytest test_spine_install.py
+"""
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+import moose
+import rdesigneur as rd
+
+
+def test_spine_install():
+    rdes = rd.rdesigneur(
+        cellProto=[['ballAndStick', 'soma', 20e-6, 20e-6, 4e-6, 500e-6, 10]],
+        spineProto=[['makeActiveSpine()', 'spine']],
+        spineDistrib=[['spine', 'dend#', '2e-6', '-1e-6']],
+    )
+    rdes.buildModel()
+    shafts = moose.wildcardFind('/model/elec/shaft#')
+    heads = moose.wildcardFind('/model/elec/head#')
+    assert len(shafts) == len(heads) > 200
+    assert not moose.exists('/library/_spineHolder')
+    names = {s.name for s in shafts}
+    assert names == {'shaft%d' % i for i in range(len(shafts))}
+
+    for shaft in shafts:
+        head = moose.element('/model/elec/head' + shaft.name[5:])
+        dend = shaft.neighbors['raxial'][0]
+        assert dend.name.startswith('dend')
+        assert head.neighbors['raxial'][0] == shaft
+        assert np.allclose([head.x0, head.y0, head.z0],
+                           [shaft.x, shaft.y, shaft.z], atol=1e-12)
+        assert shaft.length > 0 and head.length > 0
+    moose.delete('/model')
+    moose.delete('/library')
+
+
+if __name__ == '__main__':
+    test_spine_install()
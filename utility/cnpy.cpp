@@ -19,6 +19,15 @@
 #include "cnpy.hpp"
 #include <fstream>
 #include <iterator>
+#include <cstring>
+#include <algorithm>
+
+#if !defined(_WIN32)
+#include <fcntl.h>
+#include <unistd.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#endif
 
 #include "print_function.hpp"
 
@@ -164,14 +173,12 @@ void changeHeaderShape(std::fstream& fs, const size_t data_len, const size_t num
     fs.write(newHeader.c_str(), newHeader.size());
 }
 
-size_t writeHeader(std::fstream& fs, const vector<string>& colnames, const vector<size_t>& shape)
+/**
+ * @brief Header text of a numpy file, without the 8 bytes of magic string and
+ * version and the 4 bytes of header length.
+ */
+string headerString(const vector<string>& colnames, const vector<size_t>& shape)
 {
-    // Heder are always at the begining of file.
-    fs.seekp(0);
-
-    // Write the format string. 8 bytes.
-    fs.write(&__pre__[0], __pre__.size());
-
     char endianChar = cnpy2::BigEndianTest();
     const char formatChar = 'd';
 
@@ -202,6 +209,18 @@ size_t writeHeader(std::fstream& fs, const vector<string>& colnames, const vecto
     unsigned int remainder = 16 - (12 + header.size()) % 16;
     header.insert(header.end(), remainder-1, ' ');
     header += '\n';                             // Add newline. 
+    return header;
+}
+
+size_t writeHeader(std::fstream& fs, const vector<string>& colnames, const vector<size_t>& shape)
+{
+    // Heder are always at the begining of file.
+    fs.seekp(0);
+
+    // Write the format string. 8 bytes.
+    fs.write(&__pre__[0], __pre__.size());
+
+    string header = headerString(colnames, shape);
 
     // Now write the size of header. Its 4 byte long in version 2.
     uint32_t s = header.size();
@@ -284,39 +303,400 @@ void appendNumpy(const string& outfile, const vector<double>& vec, const vector<
 
 void readNumpy(const string& infile, vector<double>& data)
 {
-    cout << "Reading from " << infile << endl;
-    std::ifstream fs;
-    fs.open(infile, std::ios::in | std::ios::binary);
-
-    if(! fs.is_open())
+    NpyMap npy(infile);
+    if(! npy.isOpen())
     {
         cerr << "Could not open " << infile << endl;
         return;
     }
+    data.insert(data.end(), npy.data(), npy.data() + npy.numRows() * npy.numCols());
+}
 
-    char ch;
-    fs.get(ch);
-    size_t nBytes = 1;
-    while(ch != '\n')
+/**
+ * @brief Parse the header of a numpy file written by cnpy2, given at least
+ * its first 12 bytes in buf. Sets headerSize to the offset of the data.
+ * Returns false if the file is not a numpy file of doubles, or if buf is too
+ * short, in which case headerSize is still set when it could be read.
+ */
+bool parseHeader(const char* buf, size_t len, size_t& headerSize, string& header
+        , vector<string>& colnames, size_t& numRows)
+{
+    headerSize = 0;
+    if(len < 12 || memcmp(buf, __pre__.data(), 6) != 0)
+        return false;
+
+    size_t prefix = 0;
+    if(buf[6] == 1)
     {
-        fs.get(ch);
-        nBytes += 1;
+        uint16_t n;
+        memcpy(&n, buf + 8, 2);
+        prefix = 10;
+        headerSize = prefix + n;
+    }
+    else
+    {
+        uint32_t n;
+        memcpy(&n, buf + 8, 4);
+        prefix = 12;
+        headerSize = prefix + n;
+    }
+    if(len < headerSize)
+        return false;
+    header.assign(buf + prefix, headerSize - prefix);
+
+    // Column names and types are in ('name','<d') pairs.
+    colnames.clear();
+    size_t pos = header.find("'descr'");
+    size_t end = header.find(']', pos);
+    if(pos == string::npos || end == string::npos)
+        return false;
+    while((pos = header.find("('", pos)) < end)
+    {
+        size_t q = header.find("','", pos + 2);
+        size_t r = header.find("')", q + 3);
+        if(q == string::npos || r == string::npos)
+            return false;
+        string type = header.substr(q + 3, r - q - 3);
+        if(type != "<d" && type != "<f8")
+            return false;
+        colnames.push_back(header.substr(pos + 2, q - pos - 2));
+        pos = r;
+    }
+    if(colnames.empty())
+        return false;
+
+    size_t shapePos = header.find("'shape':");
+    size_t lbrac = header.find('(', shapePos);
+    if(shapePos == string::npos || lbrac == string::npos)
+        return false;
+    numRows = strtoul(header.c_str() + lbrac + 1, nullptr, 10);
+    return true;
+}
+
+/**
+ * @brief Replace the number of rows in header, keeping its size the same by
+ * taking the room from or giving it back to the padding.
+ */
+bool setHeaderRows(string& header, size_t numRows)
+{
+    size_t lbrac = header.find('(', header.find("'shape':"));
+    size_t rbrac = header.find(')', lbrac);
+    string newHeader = header.substr(0, lbrac + 1) + std::to_string(numRows)
+        + "," + header.substr(rbrac);
+    size_t nl = newHeader.rfind('\n');
+    while(newHeader.size() > header.size() && nl > 0 && newHeader[nl-1] == ' ')
+    {
+        newHeader.erase(nl - 1, 1);
+        nl--;
     }
+    if(newHeader.size() > header.size())
+        return false;
+    newHeader.insert(nl, header.size() - newHeader.size(), ' ');
+    header = newHeader;
+    return true;
+}
 
-    char buff[sizeof(double)];
-    double x;
+///////////////////////////////////////////////////////////////////////////////
+// NpyWriter
+///////////////////////////////////////////////////////////////////////////////
 
-    fs.seekg(nBytes, std::ios_base::beg);
-    while(! fs.eof())
+// The file grows by at least this many bytes at a time.
+static const size_t NPY_MIN_GROWTH = 1 << 20;
+
+NpyWriter::NpyWriter()
+    : numCols_(0), headerSize_(0), dataBytes_(0), capacity_(0)
+#if defined(_WIN32)
+    , fp_(nullptr)
+#else
+    , fd_(-1), map_(nullptr)
+#endif
+{
+}
+
+NpyWriter::NpyWriter(const NpyWriter& other)
+    : NpyWriter()
+{
+}
+
+NpyWriter& NpyWriter::operator=(const NpyWriter& other)
+{
+    close();
+    return *this;
+}
+
+NpyWriter::~NpyWriter()
+{
+    close();
+}
+
+bool NpyWriter::isOpen() const
+{
+#if defined(_WIN32)
+    return fp_ != nullptr;
+#else
+    return fd_ >= 0;
+#endif
+}
+
+size_t NpyWriter::numRows() const
+{
+    return numCols_ ? dataBytes_ / sizeof(double) / numCols_ : 0;
+}
+
+bool NpyWriter::open(const string& outfile, const vector<string>& colnames, bool append)
+{
+    close();
+    if(colnames.empty())
+        return false;
+
+    path_ = outfile;
+    numCols_ = colnames.size();
+    header_ = headerString(colnames, vector<size_t>{0});
+    headerSize_ = 12 + header_.size();
+    dataBytes_ = 0;
+
+    // Keep the rows of an existing file, if its columns match.
+    vector<char> existing;
+    if(append)
     {
-        fs.read(buff, sizeof(double));
-        if(fs.gcount() != 8) 
-            break;
-        memcpy(&x, buff, sizeof(double));
-        data.push_back(x);
+        std::ifstream fs(outfile, std::ios::in | std::ios::binary);
+        char buf[12];
+        if(fs.read(buf, 12))
+        {
+            size_t hsize = 0, rows = 0;
+            string header;
+            vector<string> cols;
+            parseHeader(buf, 12, hsize, header, cols, rows);
+            existing.resize(hsize);
+            fs.seekg(0);
+            if(hsize > 0 && fs.read(existing.data(), hsize)
+                    && parseHeader(existing.data(), hsize, hsize, header, cols, rows)
+                    && cols == colnames)
+            {
+                fs.seekg(0, std::ios::end);
+                size_t fileSize = fs.tellg();
+                header_ = header;
+                headerSize_ = hsize;
+                dataBytes_ = std::min(rows * numCols_ * sizeof(double)
+                        , (fileSize - hsize) / (numCols_ * sizeof(double)) * numCols_ * sizeof(double));
+            }
+            else
+                existing.clear();
+        }
     }
-    cout << endl;
-    fs.close();
+
+    string head(__pre__.begin(), __pre__.end());
+    uint32_t hlen = header_.size();
+    head.append(reinterpret_cast<const char*>(&hlen), 4);
+    head += header_;
+
+#if defined(_WIN32)
+    fp_ = fopen(outfile.c_str(), existing.empty() ? "w+b" : "r+b");
+    if(! fp_)
+    {
+        moose::showWarn("Could not open file " + outfile);
+        return false;
+    }
+    if(existing.empty())
+        fwrite(head.data(), 1, head.size(), fp_);
+    fseek(fp_, headerSize_ + dataBytes_, SEEK_SET);
+    capacity_ = headerSize_ + dataBytes_;
+#else
+    int flags = O_RDWR | O_CREAT | (existing.empty() ? O_TRUNC : 0);
+    fd_ = ::open(outfile.c_str(), flags, 0644);
+    if(fd_ < 0)
+    {
+        moose::showWarn("Could not open file " + outfile);
+        return false;
+    }
+    if(existing.empty() && pwrite(fd_, head.data(), head.size(), 0) != (ssize_t)head.size())
+    {
+        moose::showWarn("Could not write to " + outfile);
+        ::close(fd_);
+        fd_ = -1;
+        return false;
+    }
+    capacity_ = 0;
+    map_ = nullptr;
+    if(! reserve(0))
+    {
+        ::close(fd_);
+        fd_ = -1;
+        return false;
+    }
+#endif
+    return true;
+}
+
+bool NpyWriter::reserve(size_t nbytes)
+{
+    size_t need = headerSize_ + dataBytes_ + nbytes;
+#if defined(_WIN32)
+    capacity_ = std::max(capacity_, need);
+    return true;
+#else
+    if(map_ && need <= capacity_)
+        return true;
+
+    size_t newCapacity = std::max(need, std::max(2 * capacity_, headerSize_ + NPY_MIN_GROWTH));
+    if(map_)
+        munmap(map_, capacity_);
+    map_ = nullptr;
+    if(ftruncate(fd_, newCapacity) != 0)
+    {
+        moose::showWarn("Could not grow " + path_);
+        return false;
+    }
+    void* p = mmap(nullptr, newCapacity, PROT_READ | PROT_WRITE, MAP_SHARED, fd_, 0);
+    if(p == MAP_FAILED)
+    {
+        moose::showWarn("Could not map " + path_);
+        return false;
+    }
+    map_ = static_cast<char*>(p);
+    capacity_ = newCapacity;
+    return true;
+#endif
+}
+
+void NpyWriter::append(const vector<double>& data)
+{
+    if(! isOpen() || data.empty())
+        return;
+
+    size_t nbytes = sizeof(double) * data.size();
+#if defined(_WIN32)
+    fwrite(data.data(), 1, nbytes, fp_);
+#else
+    if(! reserve(nbytes))
+        return;
+    memcpy(map_ + headerSize_ + dataBytes_, data.data(), nbytes);
+#endif
+    dataBytes_ += nbytes;
+}
+
+void NpyWriter::close()
+{
+    if(! isOpen())
+        return;
+
+    if(! setHeaderRows(header_, numRows()))
+        moose::showWarn("No room left in the header of " + path_ + " to write its shape");
+
+#if defined(_WIN32)
+    fseek(fp_, 12, SEEK_SET);
+    fwrite(header_.data(), 1, header_.size(), fp_);
+    fclose(fp_);
+    fp_ = nullptr;
+#else
+    if(map_)
+    {
+        memcpy(map_ + 12, header_.data(), header_.size());
+        munmap(map_, capacity_);
+        map_ = nullptr;
+    }
+    if(ftruncate(fd_, headerSize_ + dataBytes_) != 0)
+        moose::showWarn("Could not truncate " + path_);
+    ::close(fd_);
+    fd_ = -1;
+#endif
+    capacity_ = 0;
+}
+
+///////////////////////////////////////////////////////////////////////////////
+// NpyMap
+///////////////////////////////////////////////////////////////////////////////
+
+NpyMap::NpyMap(const string& infile)
+    : numRows_(0), data_(nullptr)
+#if !defined(_WIN32)
+    , map_(nullptr), mapSize_(0)
+#endif
+{
+    size_t headerSize = 0;
+    string header;
+
+#if defined(_WIN32)
+    std::ifstream fs(infile, std::ios::in | std::ios::binary | std::ios::ate);
+    if(! fs.is_open())
+        return;
+    size_t fileSize = fs.tellg();
+    vector<char> buf(fileSize);
+    fs.seekg(0);
+    fs.read(buf.data(), fileSize);
+    if(! parseHeader(buf.data(), fileSize, headerSize, header, colnames_, numRows_))
+    {
+        colnames_.clear();
+        return;
+    }
+    const char* base = buf.data();
+#else
+    int fd = ::open(infile.c_str(), O_RDONLY);
+    if(fd < 0)
+        return;
+    struct stat st;
+    if(fstat(fd, &st) != 0 || st.st_size == 0)
+    {
+        ::close(fd);
+        return;
+    }
+    size_t fileSize = st.st_size;
+    void* p = mmap(nullptr, fileSize, PROT_READ, MAP_SHARED, fd, 0);
+    ::close(fd);
+    if(p == MAP_FAILED)
+        return;
+    map_ = p;
+    mapSize_ = fileSize;
+    const char* base = static_cast<const char*>(p);
+    if(! parseHeader(base, fileSize, headerSize, header, colnames_, numRows_))
+    {
+        colnames_.clear();
+        return;
+    }
+#endif
+
+    size_t rowBytes = colnames_.size() * sizeof(double);
+    numRows_ = std::min(numRows_, (fileSize - headerSize) / rowBytes);
+#if defined(_WIN32)
+    buffer_.resize(numRows_ * colnames_.size());
+    memcpy(buffer_.data(), base + headerSize, numRows_ * rowBytes);
+    data_ = buffer_.data();
+#else
+    data_ = reinterpret_cast<const double*>(base + headerSize);
+#endif
+}
+
+NpyMap::~NpyMap()
+{
+#if !defined(_WIN32)
+    if(map_)
+        munmap(map_, mapSize_);
+#endif
+}
+
+bool NpyMap::isOpen() const
+{
+    return ! colnames_.empty();
+}
+
+const double* NpyMap::data() const
+{
+    return data_;
+}
+
+size_t NpyMap::numRows() const
+{
+    return numRows_;
+}
+
+size_t NpyMap::numCols() const
+{
+    return colnames_.size();
+}
+
+const vector<string>& NpyMap::colnames() const
+{
+    return colnames_;
 }
 
 }                                               /* Namespace cnpy2 ends. */
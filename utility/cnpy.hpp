@@ -109,6 +109,93 @@ size_t initNumpyFile(const string& outfile, const vector<string>& colnames);
 /* ----------------------------------------------------------------------------*/
 void readNumpy(const string& infile, vector<double>& data);
 
+/* --------------------------------------------------------------------------*/
+/**
+ * @Synopsis  Numpy file which stays open while data is appended to it.
+ *
+ * appendNumpy opens the file, rewrites the header and closes it on every
+ * call. NpyWriter opens the file once, grows it in large steps and writes
+ * the data through a memory map. The shape in the header is written only
+ * when the file is closed, at which point the file is truncated to the
+ * size of the data. Until then numpy sees zero rows.
+ */
+/* ----------------------------------------------------------------------------*/
+class NpyWriter
+{
+public:
+    NpyWriter();
+    ~NpyWriter();
+
+    // The file handle is not copied; a copy starts out closed.
+    NpyWriter(const NpyWriter& other);
+    NpyWriter& operator=(const NpyWriter& other);
+
+    /**
+     * @brief Open outfile for writing. With append, the rows already in
+     * the file are kept, and the file must have been written with the same
+     * colnames. Returns false if the file could not be opened.
+     */
+    bool open(const string& outfile, const vector<string>& colnames, bool append = false);
+
+    /// Append data, row major, numcols values to a row.
+    void append(const vector<double>& data);
+
+    /// Write the shape into the header, truncate and close the file.
+    void close();
+
+    bool isOpen() const;
+    size_t numRows() const;
+
+private:
+    bool reserve(size_t nbytes);
+
+    string path_;
+    size_t numCols_;
+    size_t headerSize_;
+    size_t dataBytes_;
+    size_t capacity_;                           // Bytes, including header.
+    string header_;
+#if defined(_WIN32)
+    FILE* fp_;
+#else
+    int fd_;
+    char* map_;
+#endif
+};
+
+/* --------------------------------------------------------------------------*/
+/**
+ * @Synopsis  Read-only memory map of a numpy file written by cnpy2. The
+ * values are not copied: data() points into the mapped file.
+ */
+/* ----------------------------------------------------------------------------*/
+class NpyMap
+{
+public:
+    NpyMap(const string& infile);
+    ~NpyMap();
+
+    NpyMap(const NpyMap&) = delete;
+    NpyMap& operator=(const NpyMap&) = delete;
+
+    bool isOpen() const;
+    const double* data() const;
+    size_t numRows() const;
+    size_t numCols() const;
+    const vector<string>& colnames() const;
+
+private:
+    size_t numRows_;
+    vector<string> colnames_;
+    const double* data_;
+#if defined(_WIN32)
+    vector<double> buffer_;
+#else
+    void* map_;
+    size_t mapSize_;
+#endif
+};
+
 } // Namespace cnpy2 ends.
 
 #endif   /* ----- #ifndef cnpy_INC  ----- */
@@ -59,6 +59,36 @@ int main(int argc, const char *argv[])
 
     for (size_t i = 0; i < r2.size(); i++)
         assert(data[i%data.size()] == r2[i]);
+
+    // Persistent, memory mapped writer. Write in two sessions, the second
+    // one appending to the first.
+    datafile = "_c_data.npy";
+    cnpy2::NpyWriter w;
+    assert(w.open(datafile, cols));
+    for (size_t i = 0; i < 1000; i++)
+        w.append(data);
+    w.close();
+    assert(w.open(datafile, cols, true));
+    assert(w.numRows() == 1000 * data.size() / cols.size());
+    w.append(data);
+    w.close();
+
+    cnpy2::NpyMap m(datafile);
+    assert(m.isOpen());
+    assert(m.colnames() == cols);
+    assert(m.numCols() == cols.size());
+    assert(m.numRows() == 1001 * data.size() / cols.size());
+    for (size_t i = 0; i < m.numRows() * m.numCols(); i++)
+        assert(m.data()[i] == data[i%data.size()]);
+
+    // The writer can also append to a file written by appendNumpy.
+    assert(w.open("_b_data.npy", cols, true));
+    w.append(data);
+    w.close();
+    vector<double> r3;
+    cnpy2::readNumpy("_b_data.npy", r3);
+    assert(r3.size() == 4 * data.size());
+    cout << "NpyWriter and NpyMap OK" << endl;
     
     return 0;
 }